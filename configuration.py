@@ -1,10 +1,140 @@
+import math
+from functools import partial
+
 import numpy as np
 
+# 晶体点群与非线性系数(pm/V)，所有配置实例共享，不要原地修改
+_CRYSTAL_DB = {
+    "BBO":  {"group": "3m",     "d": {"d22": 2.2, "d31": 0.04, "d15":0.04, "d11":0.02} },
+    "KDP":  {"group": "4bar2m", "d": {"d36": 0.39, "d14": 0.39}     },
+    "DKDP": {"group": "4bar2m", "d": {"d36": 0.37, "d14": 0.37}    },
+    "CLBO": {"group": "4bar2m", "d": {"d36": 0.95, "d14": 0.95}  },
+    "LBO":  {"group": "mm2",    "d": {"d31": 1.05, "d32": 0.85, "d33": 0.05, "d15":1.05, "d24":0.85}},
+    "KTP":  {"group": "mm2",    "d": {"d31": 2.20, "d32": 3.70, "d33": 14.6, "d15": 2.2, "d24": 3.7}}
+}
+
+# Sellmeier方程信息字典 - 根据晶体和来源组织（供界面显示）
+SELLMEIER_INFO = {
+    'LBO': {
+        '福晶': """LBO (双轴晶体) - 福晶科技
+
+n_x² = 2.454140 + 0.011249/(λ² - 0.011350) - 0.014591λ² - 6.60×10⁻⁵λ⁴
+
+n_y² = 2.539070 + 0.012711/(λ² - 0.012523) - 0.018540λ² + 2.00×10⁻⁴λ⁴
+
+n_z² = 2.586179 + 0.013099/(λ² - 0.011893) - 0.017968λ² - 2.26×10⁻⁴λ⁴
+
+温度系数：
+dn_x/dT = -9.3×10⁻⁶/°C
+dn_y/dT = -13.6×10⁻⁶/°C
+dn_z/dT = -(6.3 + 2.1λ)×10⁻⁶/°C
+
+(λ单位：μm)""",
+        'Thorlabs': """LBO (双轴晶体) - Thorlabs
+
+n_x² = 2.4542 + 0.01125/(λ² - 0.01135) - 0.01388λ²
+温度项：Δn_x = (ΔT + 0.02913ΔT²) × (-3.76λ + 2.30) × 10⁻⁶
+
+n_y² = 2.5390 + 0.01277/(λ² - 0.01189) - 0.01849λ² + 4.3025×10⁻⁵λ⁴ - 2.9131×10⁻⁵λ⁶
+温度项：Δn_y = (ΔT - 0.0003289ΔT²) × (6.01λ - 19.40) × 10⁻⁶
+
+n_z² = 2.5865 + 0.01310/(λ² - 0.01223) - 0.01862λ² + 4.5778×10⁻⁵λ⁴ - 3.2526×10⁻⁵λ⁶
+温度项：Δn_z = (ΔT - 0.0007449ΔT²) × (1.50λ - 9.70) × 10⁻⁶
+
+(λ单位：μm, ΔT = T - 20°C)"""
+    },
+    
+    'BBO': {
+        '默认': """BBO (单轴晶体, n_o = n_x = n_y, n_e = n_z)
+
+n_o² = 1 + 0.90291λ²/(λ² - 0.003926) + 0.83155λ²/(λ² - 0.018786) + 0.76536λ²/(λ² - 60.01)
+
+n_e² = 1 + 1.151075λ²/(λ² - 0.007142) + 0.21803λ²/(λ² - 0.02259) + 0.656λ²/(λ² - 263)
+
+温度系数：dn_o/dT = -16.6×10⁻⁶/°C, dn_e/dT = -9.3×10⁻⁶/°C
+
+(λ单位：μm)"""
+    },
+    
+    'CLBO': {
+        '福晶': """CLBO (单轴晶体, n_o = n_x = n_y, n_e = n_z) - 福晶科技
+
+n_o² = 2.2104 + 0.01018/(λ² - 0.01424) - 0.01258λ²
+
+n_e² = 2.0588 + 0.00838/(λ² - 0.01363) - 0.00607λ²
+
+温度系数：
+dn_o/dT = (-12.48 - 0.328/λ) × 10⁻⁶ (°C⁻¹)
+dn_e/dT = (-8.36 + 0.047/λ - 0.039/λ² + 0.014/λ³) × 10⁻⁶ (°C⁻¹)
+
+(λ单位：μm, 适用范围：0.2128-1.3382 μm，参考温度：20°C)
+
+参考文献：
+Umemura, N., et al. "New data on the phase-matching properties of CsLiB6O10." Advanced Solid State Lasers. Optica Publishing Group, 1999.""",
+        'OXIDE': """CLBO (单轴晶体, n_o = n_x = n_y, n_e = n_z) - OXIDE
+
+n_o² = 2.2145 + 0.00890/(λ² - 0.02051) - 0.01413λ²
+
+n_e² = 2.0588 + 0.00866/(λ² - 0.01202) - 0.00607λ²
+
+温度系数：
+dn_o/dT = (-1.04λ² + 0.35λ - 12.91) × 10⁻⁶ (°C⁻¹)
+dn_e/dT = (3.31λ² - 2.43λ - 8.40) × 10⁻⁶ (°C⁻¹)
+
+(λ单位：μm)
+
+参考文献：
+Nobuhiro Umemura and Kiyoshi Kato, "Ultraviolet generation tunable to 0.185 µm in CsLiB6O10," Appl. Opt. 36, 6794-6796 (1997)"""
+    },
+    
+    'KTP': {
+        '默认': """KTP (双轴晶体, 福晶科技数据)
+
+n_x² = 3.0065 + 0.03901/(λ² - 0.04251) - 0.01327λ²
+
+n_y² = 3.0333 + 0.04154/(λ² - 0.04547) - 0.01408λ²
+
+n_z² = 3.3134 + 0.05694/(λ² - 0.05658) - 0.01682λ²
+
+温度系数：dn_x/dT = 1.1×10⁻⁵/°C, dn_y/dT = 1.3×10⁻⁵/°C, dn_z/dT = 1.6×10⁻⁵/°C
+
+(λ单位：μm)"""
+    },
+    
+    'KDP': {
+        '默认': """KDP (单轴晶体, n_o = n_x = n_y, n_e = n_z)
+
+n_o² = 2.259276 + 0.01008956/(λ² - 0.012942625) + 13.00522λ²/(λ² - 400)
+
+n_e² = 2.132668 + 0.008637494/(λ² - 0.012281043) + 3.2279924λ²/(λ² - 400)
+
+(λ单位：μm, 不含温度项)"""
+    },
+    
+    'DKDP': {
+        '默认': """DKDP (单轴晶体, n_o = n_x = n_y, n_e = n_z)
+
+n_o² = 1.9575544 + 0.2901391λ²/(λ² - 0.0281399) - 0.02824391λ² + 0.004977826λ⁴
+
+n_e² = 1.5057799 + 0.6276034λ²/(λ² - 0.0131558) - 0.01054063λ² + 0.002243821λ⁴
+
+(λ单位：μm, 不含温度项)"""
+    }
+}
+
 class SimulationConfig:
     """
     这个类用来存储一次模拟的所有配置信息
     支持 SHG (二次谐波) 和 SFG (和频) 两种非线性过程
     """
+    __slots__ = (
+        'crystal_name', 'process_type', 'sellmeier_source',
+        'wavelength1_nm', 'wavelength2_nm',
+        'plane', 'temperature', '_sellmeier', '_sellmeier_scalar',
+    )
+
+    crystal_db = _CRYSTAL_DB  # 共享的晶体数据库（只读，类属性，不占实例空间）
+
     def __init__(self, crystal_name, wavelength, temperature, plane, 
                  process_type='SHG', wavelength2=None, sellmeier_source='默认'):
         self.crystal_name = crystal_name  # 存储晶体名
@@ -13,38 +143,49 @@ class SimulationConfig:
         
         # 输入波长1（对SHG和SFG都是第一个输入波长）
         self.wavelength1_nm = wavelength
-        self.wavelength1_um = wavelength / 1000.0
         
         # 输入波长2（SHG时等于wavelength，SFG时为第二个输入）
         if wavelength2 is None or process_type == 'SHG':
             self.wavelength2_nm = wavelength
-            self.wavelength2_um = wavelength / 1000.0
         else:
             self.wavelength2_nm = wavelength2
-            self.wavelength2_um = wavelength2 / 1000.0
-        
-        # 计算输出波长（统一公式）
-        if process_type == 'SHG':
-            self.wavelength_out_nm = wavelength / 2
-        else:  # SFG
-            # 1/λ_out = 1/λ₁ + 1/λ₂
-            self.wavelength_out_nm = 1 / (1/self.wavelength1_nm + 1/self.wavelength2_nm)
-        self.wavelength_out_um = self.wavelength_out_nm / 1000.0
-        
-        # 保留旧的接口兼容性
-        self.wavelength_nm = wavelength
-        self.wavelength_um = wavelength / 1000.0
         
         self.plane = plane                # 存储平面
         self.temperature = temperature    # 存储温度
-        self.crystal_db = {
-            "BBO":  {"group": "3m",     "d": {"d22": 2.2, "d31": 0.04, "d15":0.04, "d11":0.02} },
-            "KDP":  {"group": "4bar2m", "d": {"d36": 0.39, "d14": 0.39}     },
-            "DKDP": {"group": "4bar2m", "d": {"d36": 0.37, "d14": 0.37}    },
-            "CLBO": {"group": "4bar2m", "d": {"d36": 0.95, "d14": 0.95}  },
-            "LBO":  {"group": "mm2",    "d": {"d31": 1.05, "d32": 0.85, "d33": 0.05, "d15":1.05, "d24":0.85}},
-            "KTP":  {"group": "mm2",    "d": {"d31": 2.20, "d32": 3.70, "d33": 14.6, "d15": 2.2, "d24": 3.7}}
-        }
+
+        # 根据sellmeier_source和crystal_name查表选择对应的方程（构造时确定一次，get_indices直接调用）
+        # 未知来源回落到该晶体的默认方程（CLBO为OXIDE，LBO为Thorlabs）
+        self._sellmeier = _SELLMEIER_KERNELS[crystal_name].get(sellmeier_source, _DEFAULT_SELLMEIER[crystal_name])
+        self._sellmeier_scalar = _SCALAR_SELLMEIER[self._sellmeier]
+
+    # 以下波长均由 wavelength1_nm / wavelength2_nm 按需换算
+    @property
+    def wavelength1_um(self):
+        return self.wavelength1_nm / 1000.0
+
+    @property
+    def wavelength2_um(self):
+        return self.wavelength2_nm / 1000.0
+
+    @property
+    def wavelength_out_nm(self):
+        """输出波长(nm)，SHG为λ/2，SFG满足 1/λ_out = 1/λ₁ + 1/λ₂"""
+        if self.process_type == 'SHG':
+            return self.wavelength1_nm / 2
+        return 1 / (1/self.wavelength1_nm + 1/self.wavelength2_nm)
+
+    @property
+    def wavelength_out_um(self):
+        return self.wavelength_out_nm / 1000.0
+
+    # 保留旧的接口兼容性：wavelength_nm/wavelength_um 即输入波长1
+    @property
+    def wavelength_nm(self):
+        return self.wavelength1_nm
+
+    @property
+    def wavelength_um(self):
+        return self.wavelength1_nm / 1000.0
 
     def get_indices(self, target_wavelength=None, target_temperature=None):
         """
@@ -58,7 +199,15 @@ class SimulationConfig:
             dict: 包含折射率的字典 {'n_x': ..., 'n_y': ..., 'n_z': ...}
                   注意: 如果输入是数组，返回的折射率也是数组
         """
+        wavelength, dtemp = self._sellmeier_inputs(target_wavelength, target_temperature)
+        if np.isscalar(wavelength) and np.isscalar(dtemp):
+            n_x, n_y, n_z = self._sellmeier_scalar(wavelength, dtemp)
+        else:
+            n_x, n_y, n_z = self._sellmeier(wavelength, dtemp)
+        return {"n_x": n_x, "n_y": n_y, "n_z": n_z}
 
+    def _sellmeier_inputs(self, target_wavelength, target_temperature):
+        """把波长(nm)和温度(°C)换算为Sellmeier方程的输入 (λ[μm], ΔT[°C])"""
         if target_wavelength is None:
             wavelength = self.wavelength_um
         else:
@@ -69,108 +218,200 @@ class SimulationConfig:
         else:
             dtemp = target_temperature - 20.0  # 温度相对于20°C的偏差
 
-        # 根据sellmeier_source和crystal_name选择对应的方程
-        if self.crystal_name == "CLBO":
-            if self.sellmeier_source == "福晶":
-                return self._get_indices_clbo_fujing(wavelength, dtemp)
-            else:  # OXIDE或默认
-                return self._get_indices_clbo_oxide(wavelength, dtemp)
-        elif self.crystal_name == "LBO":
-            if self.sellmeier_source == "福晶":
-                return self._get_indices_lbo_fujing(wavelength, dtemp)
-            else:  # Thorlabs或默认
-                return self._get_indices_lbo_thorlabs(wavelength, dtemp)
-        else:
-            # 其他晶体使用默认方程
-            return self._get_indices_default(wavelength, dtemp)
-    
-    def _get_indices_clbo_oxide(self, wavelength, dtemp):
-        """CLBO的OXIDE来源方程（原默认方程）"""
-        # 计算基础折射率（在20°C参考温度下）
-        n_o = np.sqrt(2.2145 + 0.00890 / (wavelength**2 - 0.02051) - 0.01413 * wavelength**2)
-        n_e = np.sqrt(2.0588 + 0.00866 / (wavelength**2 - 0.01202) - 0.00607 * wavelength**2)
-        
-        # 计算温度相关的折射率变化（λ单位为μm）
-        # dn_o/dT = (-1.04λ² + 0.35λ - 12.91) × 10⁻⁶ (°C⁻¹)
-        # dn_e/dT = (3.31λ² - 2.43λ - 8.40) × 10⁻⁶ (°C⁻¹)
-        dn_o_dT = (-1.04 * wavelength**2 + 0.35 * wavelength - 12.91) * 1e-6
-        dn_e_dT = (3.31 * wavelength**2 - 2.43 * wavelength - 8.40) * 1e-6
-        
-        # 应用温度修正
-        n_x = n_o + dn_o_dT * dtemp
-        n_y = n_o + dn_o_dT * dtemp
-        n_z = n_e + dn_e_dT * dtemp
-        
-        return {"n_x": n_x, "n_y": n_y, "n_z": n_z}
-    
-    def _get_indices_clbo_fujing(self, wavelength, dtemp):
-        """CLBO的福晶来源方程"""
-        # 计算基础折射率（在20°C参考温度下）
-        n_o = np.sqrt(2.2104 + 0.01018 / (wavelength**2 - 0.01424) - 0.01258 * wavelength**2)
-        n_e = np.sqrt(2.0588 + 0.00838 / (wavelength**2 - 0.01363) - 0.00607 * wavelength**2)
-        
-        # 计算温度相关的折射率变化（λ单位为μm，有效范围 0.2128~1.3382 μm）
-        # dn_o/dT = (-12.48 - 0.328/λ) × 10^-6 (°C^-1)
-        # dn_e/dT = (-8.36 + 0.047/λ - 0.039/λ² + 0.014/λ³) × 10^-6 (°C^-1)
-        dn_o_dT = (-12.48 - 0.328 / wavelength) * 1e-6
-        dn_e_dT = (-8.36 + 0.047 / wavelength - 0.039 / wavelength**2 + 0.014 / wavelength**3) * 1e-6
-        
-        # CLBO是单轴晶体，no对应x和y，ne对应z
-        n_x = n_o + dn_o_dT * dtemp
-        n_y = n_o + dn_o_dT * dtemp
-        n_z = n_e + dn_e_dT * dtemp
-        return {"n_x": n_x, "n_y": n_y, "n_z": n_z}
-    
-    def _get_indices_lbo_thorlabs(self, wavelength, dtemp):
-        """LBO的Thorlabs来源方程（原默认方程）"""
-        n_x = np.sqrt(2.4542 + 0.01125 / (wavelength**2 - 0.01135) - 0.01388 * wavelength**2) + ((dtemp + 29.13e-3 * dtemp**2) * ((-3.76 * wavelength + 2.30) * 1e-6))
-        n_y = np.sqrt(2.5390 + 0.01277 / (wavelength**2 - 0.01189) - 0.01849 * wavelength**2 + (4.3025e-5) * wavelength**4 - (2.9131e-5) * wavelength**6) +((dtemp - (32.89e-4) * dtemp**2) * (6.01 * wavelength - 19.40) * 1e-6)
-        n_z = np.sqrt(2.5865 + 0.01310 / (wavelength**2 - 0.01223) - 0.01862 * wavelength**2 + (4.5778e-5) * wavelength**4 - 3.2526e-5 * wavelength**6) + ((dtemp - (74.49e-4) * dtemp**2) * (1.50 * wavelength - 9.70)* 1e-6)
-        return {"n_x": n_x, "n_y": n_y, "n_z": n_z}
-    
-    def _get_indices_lbo_fujing(self, wavelength, dtemp):
-        """LBO的福晶来源方程"""
-        n_x_sq = 2.454140 + 0.011249 / (wavelength**2 - 0.011350) - 0.014591 * wavelength**2 - 6.60e-5 * wavelength**4
-        n_y_sq = 2.539070 + 0.012711 / (wavelength**2 - 0.012523) - 0.018540 * wavelength**2 + 2.00e-4 * wavelength**4
-        n_z_sq = 2.586179 + 0.013099 / (wavelength**2 - 0.011893) - 0.017968 * wavelength**2 - 2.26e-4 * wavelength**4
-        
-        n_x = np.sqrt(n_x_sq)
-        n_y = np.sqrt(n_y_sq)
-        n_z = np.sqrt(n_z_sq)
-        
-        # 应用温度系数（图3提供的）
-        # dnx/dT = -9.3×10⁻⁶
-        # dny/dT = -13.6×10⁻⁶
-        # dnz/dT = (-6.3-2.1λ)×10⁻⁶，λ单位是μm
-        n_x = n_x - 9.3e-6 * dtemp
-        n_y = n_y - 13.6e-6 * dtemp
-        n_z = n_z - (6.3 + 2.1 * wavelength) * 1e-6 * dtemp
-        
-        return {"n_x": n_x, "n_y": n_y, "n_z": n_z}
-    
-    def _get_indices_default(self, wavelength, dtemp):
-        """其他晶体的默认Sellmeier方程"""
-        if self.crystal_name == "BBO":
-            n_x = np.sqrt((0.90291 * wavelength**2) / (wavelength**2 - 0.003926) + (0.83155 * wavelength**2) / (wavelength**2 - 0.018786) + (0.76536 * wavelength**2) / (wavelength**2 - 60.01) + 1) - 16.6e-6 * dtemp
-            n_y = n_x
-            n_z = np.sqrt((1.151075 * wavelength**2) / (wavelength**2 - 0.007142) + (0.21803 * wavelength**2) / (wavelength**2 - 0.02259) + (0.656 * wavelength**2) / (wavelength**2 - 263) + 1) - 9.3e-6 * dtemp
-        
-        elif self.crystal_name == "KTP":
-            #福晶官网数据
-            n_x = np.sqrt(3.0065 + 0.03901 / (wavelength**2 - 0.04251) - 0.01327 * wavelength**2) + 1.1e-5 * dtemp
-            n_y = np.sqrt(3.0333 + 0.04154 / (wavelength**2 - 0.04547) - 0.01408 * wavelength**2) + 1.3e-5 * dtemp
-            n_z = np.sqrt(3.3134 + 0.05694 / (wavelength**2 - 0.05658) - 0.01682 * wavelength**2) + 1.6e-5 * dtemp    
+        return wavelength, dtemp
 
-        elif self.crystal_name == "KDP":
-            n_x = np.sqrt(2.259276 + 0.01008956 / (wavelength**2 - 0.012942625) + (13.00522 * wavelength**2) / (wavelength**2 - 400))
-            n_y = n_x
-            n_z = np.sqrt(2.132668 + 0.008637494 / (wavelength**2 - 0.012281043) + (3.2279924 * wavelength**2) / (wavelength**2 - 400))
 
-        elif self.crystal_name == "DKDP":
-            n_x = np.sqrt(1.9575544 + (0.2901391 * wavelength**2) / (wavelength**2 - 0.0281399) - 0.02824391 * wavelength**2 + 0.004977826 * wavelength**4)
-            n_y = n_x
-            n_z = np.sqrt(1.5057799 + (0.6276034 * wavelength**2) / (wavelength**2 - 0.0131558) - 0.01054063 * wavelength**2 + 0.002243821 * wavelength**4)
+# ============================================================================
+# Sellmeier方程
+# 每个函数接收 (λ[μm], ΔT[°C])，返回 (n_x, n_y, n_z)；标量与数组输入均可
+# ============================================================================
 
+def _clbo_oxide(wavelength, dtemp, sqrt=np.sqrt):
+    """CLBO的OXIDE来源方程（原默认方程）"""
+    w2 = wavelength * wavelength
 
-        return {"n_x": n_x, "n_y": n_y, "n_z": n_z}
+    # 计算基础折射率（在20°C参考温度下）
+    n_o = sqrt(2.2145 + 0.00890 / (w2 - 0.02051) - 0.01413 * w2)
+    n_e = sqrt(2.0588 + 0.00866 / (w2 - 0.01202) - 0.00607 * w2)
+
+    # 计算温度相关的折射率变化（λ单位为μm）
+    # dn_o/dT = (-1.04λ² + 0.35λ - 12.91) × 10⁻⁶ (°C⁻¹)
+    # dn_e/dT = (3.31λ² - 2.43λ - 8.40) × 10⁻⁶ (°C⁻¹)
+    dn_o_dT = (wavelength * (-1.04 * wavelength + 0.35) - 12.91) * 1e-6
+    dn_e_dT = (wavelength * (3.31 * wavelength - 2.43) - 8.40) * 1e-6
+
+    # 应用温度修正
+    n_x = n_o + dn_o_dT * dtemp
+    n_y = n_o + dn_o_dT * dtemp
+    n_z = n_e + dn_e_dT * dtemp
+
+    return n_x, n_y, n_z
+
+
+def _clbo_fujing(wavelength, dtemp, sqrt=np.sqrt):
+    """CLBO的福晶来源方程"""
+    w2 = wavelength * wavelength
+
+    # 计算基础折射率（在20°C参考温度下）
+    n_o = sqrt(2.2104 + 0.01018 / (w2 - 0.01424) - 0.01258 * w2)
+    n_e = sqrt(2.0588 + 0.00838 / (w2 - 0.01363) - 0.00607 * w2)
+
+    # 计算温度相关的折射率变化（λ单位为μm，有效范围 0.2128~1.3382 μm）
+    # dn_o/dT = (-12.48 - 0.328/λ) × 10^-6 (°C^-1)
+    # dn_e/dT = (-8.36 + 0.047/λ - 0.039/λ² + 0.014/λ³) × 10^-6 (°C^-1)
+    inv_w = 1.0 / wavelength
+    dn_o_dT = (-12.48 - 0.328 * inv_w) * 1e-6
+    dn_e_dT = (-8.36 + inv_w * (0.047 + inv_w * (-0.039 + 0.014 * inv_w))) * 1e-6
+
+    # CLBO是单轴晶体，no对应x和y，ne对应z
+    n_x = n_o + dn_o_dT * dtemp
+    n_y = n_o + dn_o_dT * dtemp
+    n_z = n_e + dn_e_dT * dtemp
+    return n_x, n_y, n_z
+
+
+def _lbo_thorlabs(wavelength, dtemp, sqrt=np.sqrt):
+    """LBO的Thorlabs来源方程（原默认方程）"""
+    # 多项式部分按λ²的Horner形式展开: -D·λ² + E·λ⁴ - F·λ⁶ = λ²·(-D + λ²·(E - F·λ²))
+    w2 = wavelength * wavelength
+    n_x = sqrt(2.4542 + 0.01125 / (w2 - 0.01135) - 0.01388 * w2) + (dtemp * (1 + 29.13e-3 * dtemp) * ((-3.76 * wavelength + 2.30) * 1e-6))
+    n_y = sqrt(2.5390 + 0.01277 / (w2 - 0.01189) + w2 * (-0.01849 + w2 * (4.3025e-5 - 2.9131e-5 * w2))) + (dtemp * (1 - 32.89e-4 * dtemp) * (6.01 * wavelength - 19.40) * 1e-6)
+    n_z = sqrt(2.5865 + 0.01310 / (w2 - 0.01223) + w2 * (-0.01862 + w2 * (4.5778e-5 - 3.2526e-5 * w2))) + (dtemp * (1 - 74.49e-4 * dtemp) * (1.50 * wavelength - 9.70) * 1e-6)
+    return n_x, n_y, n_z
+
+
+# LBO（福晶）: n² = A + B/(λ² - C) + λ²·(D + E·λ²)，三行依次为 x, y, z 轴
+_LBO_FUJING_COEFFS = np.array([
+    #  A         B         C         D          E
+    [2.454140, 0.011249, 0.011350, -0.014591, -6.60e-5],
+    [2.539070, 0.012711, 0.012523, -0.018540,  2.00e-4],
+    [2.586179, 0.013099, 0.011893, -0.017968, -2.26e-4],
+])
+_LBO_FUJING_ROWS = tuple(map(tuple, _LBO_FUJING_COEFFS.tolist()))
+
+
+def _lbo_fujing(wavelength, dtemp):
+    """LBO的福晶来源方程"""
+    w2 = wavelength * wavelength
+    A, B, C, D, E = _axis_columns(_LBO_FUJING_COEFFS, np.ndim(w2))
+    n_sq = A + B / (w2 - C) + w2 * (D + E * w2)
+    n_x, n_y, n_z = np.sqrt(n_sq, out=n_sq)  # 原地开方，少分配一个 (3, N) 临时数组
+
+    # 应用温度系数（图3提供的）
+    # dnx/dT = -9.3×10⁻⁶
+    # dny/dT = -13.6×10⁻⁶
+    # dnz/dT = (-6.3-2.1λ)×10⁻⁶，λ单位是μm
+    n_x = n_x - 9.3e-6 * dtemp
+    n_y = n_y - 13.6e-6 * dtemp
+    n_z = n_z - (6.3 + 2.1 * wavelength) * 1e-6 * dtemp
+
+    return n_x, n_y, n_z
+
+
+def _lbo_fujing_scalar(wavelength, dtemp):
+    """_lbo_fujing的标量版本，逐轴用math计算，避免小数组运算的开销"""
+    w2 = wavelength * wavelength
+    n_x, n_y, n_z = (_sqrt_scalar(A + B / (w2 - C) + w2 * (D + E * w2)) for A, B, C, D, E in _LBO_FUJING_ROWS)
+    n_x = n_x - 9.3e-6 * dtemp
+    n_y = n_y - 13.6e-6 * dtemp
+    n_z = n_z - (6.3 + 2.1 * wavelength) * 1e-6 * dtemp
+    return n_x, n_y, n_z
+
+
+def _bbo(wavelength, dtemp, sqrt=np.sqrt):
+    """BBO的默认Sellmeier方程"""
+    # a·λ²/(λ² - b) = a + a·b/(λ² - b)：常数部分在编译期合并，每项只剩一次减法和一次除法，且各项互不依赖
+    w2 = wavelength * wavelength
+    n_x = sqrt((1 + 0.90291 + 0.83155 + 0.76536) + ((0.90291 * 0.003926) / (w2 - 0.003926) + (0.83155 * 0.018786) / (w2 - 0.018786)) + (0.76536 * 60.01) / (w2 - 60.01)) - 16.6e-6 * dtemp
+    n_y = n_x
+    n_z = sqrt((1 + 1.151075 + 0.21803 + 0.656) + ((1.151075 * 0.007142) / (w2 - 0.007142) + (0.21803 * 0.02259) / (w2 - 0.02259)) + (0.656 * 263) / (w2 - 263)) - 9.3e-6 * dtemp
+    return n_x, n_y, n_z
+
+
+# KTP（福晶官网数据）: n = √(A + B/(λ² - C) - D·λ²) + dn/dT·ΔT，三行依次为 x, y, z 轴
+_KTP_COEFFS = np.array([
+    #  A       B        C        D        dn/dT
+    [3.0065, 0.03901, 0.04251, 0.01327, 1.1e-5],
+    [3.0333, 0.04154, 0.04547, 0.01408, 1.3e-5],
+    [3.3134, 0.05694, 0.05658, 0.01682, 1.6e-5],
+])
+_KTP_ROWS = tuple(map(tuple, _KTP_COEFFS.tolist()))
+
+
+def _ktp(wavelength, dtemp):
+    """KTP的默认Sellmeier方程（福晶官网数据）"""
+    w2 = wavelength * wavelength
+    A, B, C, D, dn_dT = _axis_columns(_KTP_COEFFS, max(np.ndim(w2), np.ndim(dtemp)))
+    n_sq = A + B / (w2 - C) - D * w2
+    n_x, n_y, n_z = np.sqrt(n_sq, out=n_sq) + dn_dT * dtemp  # 原地开方，少分配一个临时数组
+    return n_x, n_y, n_z
+
+
+def _ktp_scalar(wavelength, dtemp):
+    """_ktp的标量版本，逐轴用math计算，避免小数组运算的开销"""
+    w2 = wavelength * wavelength
+    n_x, n_y, n_z = (_sqrt_scalar(A + B / (w2 - C) - D * w2) + dn_dT * dtemp for A, B, C, D, dn_dT in _KTP_ROWS)
+    return n_x, n_y, n_z
+
+
+def _kdp(wavelength, dtemp, sqrt=np.sqrt):
+    """KDP的默认Sellmeier方程（不含温度项）"""
+    # 同_bbo，a·λ²/(λ² - 400) 改写为 a + 400a/(λ² - 400)，两个有理项互不依赖
+    w2 = wavelength * wavelength
+    n_x = sqrt((2.259276 + 13.00522) + (0.01008956 / (w2 - 0.012942625) + (13.00522 * 400) / (w2 - 400)))
+    n_y = n_x
+    n_z = sqrt((2.132668 + 3.2279924) + (0.008637494 / (w2 - 0.012281043) + (3.2279924 * 400) / (w2 - 400)))
+    return n_x, n_y, n_z
+
+
+def _dkdp(wavelength, dtemp, sqrt=np.sqrt):
+    """DKDP的默认Sellmeier方程（不含温度项）"""
+    # 有理项改写同_bbo，与多项式项 λ²·(D + E·λ²) 互不依赖，最后再与常数相加
+    w2 = wavelength * wavelength
+    n_x = sqrt((1.9575544 + 0.2901391) + ((0.2901391 * 0.0281399) / (w2 - 0.0281399) + w2 * (-0.02824391 + 0.004977826 * w2)))
+    n_y = n_x
+    n_z = sqrt((1.5057799 + 0.6276034) + ((0.6276034 * 0.0131558) / (w2 - 0.0131558) + w2 * (-0.01054063 + 0.002243821 * w2)))
+    return n_x, n_y, n_z
+
+
+def _sqrt_scalar(x):
+    """标量平方根；与np.sqrt一致，负数返回nan而不是抛出异常"""
+    return math.sqrt(x) if x >= 0 else math.nan
+
+
+def _axis_columns(coeffs, ndim):
+    """把 (3, k) 的系数表拆成 k 列，每列形状为 (3, 1, ...)，可与 ndim 维的输入广播（返回视图，不复制）"""
+    return coeffs.T[(Ellipsis,) + (np.newaxis,) * ndim]
+
+
+# 晶体 -> 方程来源 -> Sellmeier函数，来源名称与SELLMEIER_INFO一致
+_SELLMEIER_KERNELS = {
+    "BBO": {"默认": _bbo},
+    "KDP": {"默认": _kdp},
+    "DKDP": {"默认": _dkdp},
+    "CLBO": {"福晶": _clbo_fujing, "OXIDE": _clbo_oxide},
+    "LBO": {"福晶": _lbo_fujing, "Thorlabs": _lbo_thorlabs},
+    "KTP": {"默认": _ktp},
+}
+
+# 来源未指定或未知时使用的方程
+_DEFAULT_SELLMEIER = {
+    "BBO": _bbo,
+    "KDP": _kdp,
+    "DKDP": _dkdp,
+    "CLBO": _clbo_oxide,
+    "LBO": _lbo_thorlabs,
+    "KTP": _ktp,
+}
 
+# 标量输入（λ和ΔT都是标量）时使用的版本：math.sqrt比np.sqrt处理单个数快得多
+_SCALAR_SELLMEIER = {
+    _clbo_oxide: partial(_clbo_oxide, sqrt=_sqrt_scalar),
+    _clbo_fujing: partial(_clbo_fujing, sqrt=_sqrt_scalar),
+    _lbo_thorlabs: partial(_lbo_thorlabs, sqrt=_sqrt_scalar),
+    _lbo_fujing: _lbo_fujing_scalar,
+    _bbo: partial(_bbo, sqrt=_sqrt_scalar),
+    _ktp: _ktp_scalar,
+    _kdp: partial(_kdp, sqrt=_sqrt_scalar),
+    _dkdp: partial(_dkdp, sqrt=_sqrt_scalar),
+}
@@ -3,13 +3,11 @@
 功能：相位匹配计算、3D可视化、接受带宽分析
 """
 
+import math
 import numpy as np
-import matplotlib.pyplot as plt
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-from simulation import Solver
-from configuration import SimulationConfig  
+from simulation import Solver, DISPLAY_MODE_TABLE
+from configuration import SimulationConfig, SELLMEIER_INFO
 
 # ============================================================================
 # 页面配置与样式
@@ -73,113 +71,59 @@ CRYSTAL_TYPES = {
     'DKDP': 'uniaxial'   # 单轴
 }
 
-# Sellmeier方程信息字典 - 根据晶体和来源组织
-SELLMEIER_INFO = {
-    'LBO': {
-        '福晶': """LBO (双轴晶体) - 福晶科技
-
-n_x² = 2.454140 + 0.011249/(λ² - 0.011350) - 0.014591λ² - 6.60×10⁻⁵λ⁴
-
-n_y² = 2.539070 + 0.012711/(λ² - 0.012523) - 0.018540λ² + 2.00×10⁻⁴λ⁴
-
-n_z² = 2.586179 + 0.013099/(λ² - 0.011893) - 0.017968λ² - 2.26×10⁻⁴λ⁴
-
-温度系数：
-dn_x/dT = -9.3×10⁻⁶/°C
-dn_y/dT = -13.6×10⁻⁶/°C
-dn_z/dT = -(6.3 + 2.1λ)×10⁻⁶/°C
-
-(λ单位：μm)""",
-        'Thorlabs': """LBO (双轴晶体) - Thorlabs
-
-n_x² = 2.4542 + 0.01125/(λ² - 0.01135) - 0.01388λ²
-温度项：Δn_x = (ΔT + 0.02913ΔT²) × (-3.76λ + 2.30) × 10⁻⁶
-
-n_y² = 2.5390 + 0.01277/(λ² - 0.01189) - 0.01849λ² + 4.3025×10⁻⁵λ⁴ - 2.9131×10⁻⁵λ⁶
-温度项：Δn_y = (ΔT - 0.0003289ΔT²) × (6.01λ - 19.40) × 10⁻⁶
-
-n_z² = 2.5865 + 0.01310/(λ² - 0.01223) - 0.01862λ² + 4.5778×10⁻⁵λ⁴ - 3.2526×10⁻⁵λ⁶
-温度项：Δn_z = (ΔT - 0.0007449ΔT²) × (1.50λ - 9.70) × 10⁻⁶
-
-(λ单位：μm, ΔT = T - 20°C)"""
-    },
-    
-    'BBO': {
-        '默认': """BBO (单轴晶体, n_o = n_x = n_y, n_e = n_z)
-
-n_o² = 1 + 0.90291λ²/(λ² - 0.003926) + 0.83155λ²/(λ² - 0.018786) + 0.76536λ²/(λ² - 60.01)
-
-n_e² = 1 + 1.151075λ²/(λ² - 0.007142) + 0.21803λ²/(λ² - 0.02259) + 0.656λ²/(λ² - 263)
-
-温度系数：dn_o/dT = -16.6×10⁻⁶/°C, dn_e/dT = -9.3×10⁻⁶/°C
-
-(λ单位：μm)"""
-    },
-    
-    'CLBO': {
-        '福晶': """CLBO (单轴晶体, n_o = n_x = n_y, n_e = n_z) - 福晶科技
-
-n_o² = 2.2104 + 0.01018/(λ² - 0.01424) - 0.01258λ²
-
-n_e² = 2.0588 + 0.00838/(λ² - 0.01363) - 0.00607λ²
-
-温度系数：
-dn_o/dT = (-12.48 - 0.328/λ) × 10⁻⁶ (°C⁻¹)
-dn_e/dT = (-8.36 + 0.047/λ - 0.039/λ² + 0.014/λ³) × 10⁻⁶ (°C⁻¹)
-
-(λ单位：μm, 适用范围：0.2128-1.3382 μm，参考温度：20°C)
-
-参考文献：
-Umemura, N., et al. "New data on the phase-matching properties of CsLiB6O10." Advanced Solid State Lasers. Optica Publishing Group, 1999.""",
-        'OXIDE': """CLBO (单轴晶体, n_o = n_x = n_y, n_e = n_z) - OXIDE
-
-n_o² = 2.2145 + 0.00890/(λ² - 0.02051) - 0.01413λ²
-
-n_e² = 2.0588 + 0.00866/(λ² - 0.01202) - 0.00607λ²
-
-温度系数：
-dn_o/dT = (-1.04λ² + 0.35λ - 12.91) × 10⁻⁶ (°C⁻¹)
-dn_e/dT = (3.31λ² - 2.43λ - 8.40) × 10⁻⁶ (°C⁻¹)
-
-(λ单位：μm)
-
-参考文献：
-Nobuhiro Umemura and Kiyoshi Kato, "Ultraviolet generation tunable to 0.185 µm in CsLiB6O10," Appl. Opt. 36, 6794-6796 (1997)"""
-    },
-    
-    'KTP': {
-        '默认': """KTP (双轴晶体, 福晶科技数据)
-
-n_x² = 3.0065 + 0.03901/(λ² - 0.04251) - 0.01327λ²
-
-n_y² = 3.0333 + 0.04154/(λ² - 0.04547) - 0.01408λ²
-
-n_z² = 3.3134 + 0.05694/(λ² - 0.05658) - 0.01682λ²
-
-温度系数：dn_x/dT = 1.1×10⁻⁵/°C, dn_y/dT = 1.3×10⁻⁵/°C, dn_z/dT = 1.6×10⁻⁵/°C
-
-(λ单位：μm)"""
-    },
-    
-    'KDP': {
-        '默认': """KDP (单轴晶体, n_o = n_x = n_y, n_e = n_z)
-
-n_o² = 2.259276 + 0.01008956/(λ² - 0.012942625) + 13.00522λ²/(λ² - 400)
-
-n_e² = 2.132668 + 0.008637494/(λ² - 0.012281043) + 3.2279924λ²/(λ² - 400)
-
-(λ单位：μm, 不含温度项)"""
-    },
-    
-    'DKDP': {
-        '默认': """DKDP (单轴晶体, n_o = n_x = n_y, n_e = n_z)
-
-n_o² = 1.9575544 + 0.2901391λ²/(λ² - 0.0281399) - 0.02824391λ² + 0.004977826λ⁴
-
-n_e² = 1.5057799 + 0.6276034λ²/(λ² - 0.0131558) - 0.01054063λ² + 0.002243821λ⁴
+# 温度匹配（非临界相位匹配）的模式模板：按 (过程类型, 传播轴) 组织
+# 光沿某主轴传播时，只能沿另外两个主轴偏振；SHG中两束输入光波长相同
+MODE_TEMPLATES = {
+    ('SHG', 'X'): (
+        "𝐘 ({w1}) + 𝐘 ({w1}) → 𝐙 ({wout}) (Type I)",
+        "𝐙 ({w1}) + 𝐙 ({w1}) → 𝐘 ({wout}) (Type I)",
+        "𝐘 ({w1}) + 𝐙 ({w1}) → 𝐙 ({wout}) (Type II)",
+        "𝐘 ({w1}) + 𝐙 ({w1}) → 𝐘 ({wout}) (Type II)",
+    ),
+    ('SHG', 'Y'): (
+        "𝐗 ({w1}) + 𝐗 ({w1}) → 𝐙 ({wout}) (Type I)",
+        "𝐙 ({w1}) + 𝐙 ({w1}) → 𝐗 ({wout}) (Type I)",
+        "𝐗 ({w1}) + 𝐙 ({w1}) → 𝐙 ({wout}) (Type II)",
+        "𝐗 ({w1}) + 𝐙 ({w1}) → 𝐗 ({wout}) (Type II)",
+    ),
+    ('SHG', 'Z'): (
+        "𝐗 ({w1}) + 𝐗 ({w1}) → 𝐘 ({wout}) (Type I)",
+        "𝐘 ({w1}) + 𝐘 ({w1}) → 𝐗 ({wout}) (Type I)",
+        "𝐗 ({w1}) + 𝐘 ({w1}) → 𝐘 ({wout}) (Type II)",
+        "𝐗 ({w1}) + 𝐘 ({w1}) → 𝐗 ({wout}) (Type II)",
+    ),
+    ('SFG', 'X'): (
+        "𝐘 ({w1}) + 𝐘 ({w2}) → 𝐙 ({wout}) (Type I)",
+        "𝐙 ({w1}) + 𝐙 ({w2}) → 𝐘 ({wout}) (Type I)",
+        "𝐘 ({w1}) + 𝐙 ({w2}) → 𝐙 ({wout}) (Type II)",
+        "𝐙 ({w1}) + 𝐘 ({w2}) → 𝐙 ({wout}) (Type II)",
+        "𝐘 ({w1}) + 𝐙 ({w2}) → 𝐘 ({wout}) (Type II)",
+        "𝐙 ({w1}) + 𝐘 ({w2}) → 𝐘 ({wout}) (Type II)",
+    ),
+    ('SFG', 'Y'): (
+        "𝐗 ({w1}) + 𝐗 ({w2}) → 𝐙 ({wout}) (Type I)",
+        "𝐙 ({w1}) + 𝐙 ({w2}) → 𝐗 ({wout}) (Type I)",
+        "𝐗 ({w1}) + 𝐙 ({w2}) → 𝐙 ({wout}) (Type II)",
+        "𝐙 ({w1}) + 𝐗 ({w2}) → 𝐙 ({wout}) (Type II)",
+        "𝐗 ({w1}) + 𝐙 ({w2}) → 𝐗 ({wout}) (Type II)",
+        "𝐙 ({w1}) + 𝐗 ({w2}) → 𝐗 ({wout}) (Type II)",
+    ),
+    ('SFG', 'Z'): (
+        "𝐗 ({w1}) + 𝐗 ({w2}) → 𝐘 ({wout}) (Type I)",
+        "𝐘 ({w1}) + 𝐘 ({w2}) → 𝐗 ({wout}) (Type I)",
+        "𝐗 ({w1}) + 𝐘 ({w2}) → 𝐘 ({wout}) (Type II)",
+        "𝐘 ({w1}) + 𝐗 ({w2}) → 𝐘 ({wout}) (Type II)",
+        "𝐗 ({w1}) + 𝐘 ({w2}) → 𝐗 ({wout}) (Type II)",
+        "𝐘 ({w1}) + 𝐗 ({w2}) → 𝐗 ({wout}) (Type II)",
+    ),
+}
 
-(λ单位：μm, 不含温度项)"""
-    }
+# 各平面中垂直于平面的轴（即O光偏振方向），与 Solver.plane_config 中的 key_static 对应
+# plane_config: XY→('n_z',n_x,n_y), XZ→('n_y',n_z,n_x), YZ→('n_x',n_z,n_y)
+PLANE_STATIC_AXIS = {
+    'XY': '𝐙',
+    'XZ': '𝐘',
+    'YZ': '𝐗'
 }
 
 # 侧边栏：参数输入
@@ -319,16 +263,801 @@ with st.sidebar:
 # 初始化计算核心
 # ============================================================================
 
-try:
-    user_config = SimulationConfig(
+@st.cache_resource
+def build_config(crystal_name, wavelength_nm, temperature, plane, process_type, wavelength2_nm, sellmeier_source):
+    """按输入参数缓存配置对象，避免每次rerun重新构建（返回的对象被共享，不要原地修改）"""
+    return SimulationConfig(
         crystal_name=crystal_name, 
         wavelength=wavelength_nm, 
         temperature=temperature, 
         plane=plane,
-        process_type=process_type_code,
+        process_type=process_type,
         wavelength2=wavelength2_nm,
         sellmeier_source=sellmeier_source
-    ) 
+    )
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def acceptance_bandwidth(kind, config_args, target_mode, theta_critical, step, res):
+    """
+    按输入参数缓存接受带宽的计算结果，相同设置重复计算时直接复用
+    
+    参数:
+        kind (str): 'angle' / 'wavelength' / 'temperature'，对应 Solver.acceptance_<kind>
+        config_args (tuple): build_config 的位置参数
+        theta_critical (float): target_mode 的临界角(度)
+    
+    返回:
+        Solver.acceptance_<kind> 的返回值，其中的图已渲染为PNG字节（见 figure_png）
+    """
+    import matplotlib.pyplot as plt
+    solver = Solver(build_config(*config_args))
+    fig, *values = getattr(solver, f'acceptance_{kind}')({target_mode: theta_critical}, target_mode, step=step, res=res)
+    png = figure_png(fig)
+    plt.close(fig)
+    return (png, *values)
+
+def figure_png(fig):
+    """
+    将matplotlib图渲染为PNG字节（与st.pyplot相同的 bbox_inches='tight', dpi=200），
+    结果存入session_state后用st.image显示，页面重跑时不再重新栅格化
+    
+    图宽约2000像素，st.image 默认宽度（原始宽度、不超过容器）即铺满所在列，
+    因此不传 use_container_width（requirements 允许的旧版 Streamlit 不支持，新版已弃用）
+    """
+    import io
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', bbox_inches='tight', dpi=200)
+    return buffer.getvalue()
+
+def unit_sphere_mesh(u, v):
+    """单位球面网格 (cos u·sin v, sin u·sin v, cos v)，形状均为 (len(u), len(v))，与np.outer结果相同"""
+    sin_v = np.sin(v)
+    return (np.cos(u)[:, np.newaxis] * sin_v,
+            np.sin(u)[:, np.newaxis] * sin_v,
+            np.broadcast_to(np.cos(v), (np.size(u), np.size(v))))
+
+def ellipsoid_mesh(n_x, n_y, n_z, unit_sphere):
+    """把单位球面网格按三个主折射率缩放为折射率椭球的 (x, y, z) 坐标
+    
+    用float64计算后转为float32，只用于绘图，精度足够且传给浏览器的数据量减半
+    """
+    sphere_x, sphere_y, sphere_z = unit_sphere
+    return ((n_x * sphere_x).astype(np.float32),
+            (n_y * sphere_y).astype(np.float32),
+            (n_z * sphere_z).astype(np.float32))
+
+def norm3(x, y, z):
+    """三维矢量的长度（标量运算，比对3元素数组调用np.linalg.norm快得多）"""
+    return math.sqrt(x * x + y * y + z * z)
+
+def grid_triangles(n_u, n_v):
+    """把 (n_u, n_v) 网格的每个小四边形拆成两个三角形，返回Mesh3d用的顶点索引 (i, j, k)（按ravel后的顺序）"""
+    index = np.arange(n_u * n_v).reshape(n_u, n_v)
+    a, b = index[:-1, :-1].ravel(), index[:-1, 1:].ravel()
+    c, d = index[1:, :-1].ravel(), index[1:, 1:].ravel()
+    return np.concatenate([a, a]), np.concatenate([b, d]), np.concatenate([d, c])
+
+@st.cache_resource
+def axis_traces():
+    """3D图中固定不变的坐标轴参考线及X/Y/Z标注轨迹（go.Figure(data=...)会复制轨迹，可在多个图之间共用）"""
+    import plotly.graph_objects as go
+
+    axis_length = 3.5  # 固定长度用于示意图
+    
+    # X轴(红)、Y轴(绿)、Z轴/光轴(蓝)：合并为一条轨迹，轴之间用nan断开，颜色逐点指定
+    axis_nan = [np.nan]
+    axis_line_trace = go.Scatter3d(
+        x=[-axis_length, axis_length] + axis_nan + [0, 0] + axis_nan + [0, 0],
+        y=[0, 0] + axis_nan + [-axis_length, axis_length] + axis_nan + [0, 0],
+        z=[0, 0] + axis_nan + [0, 0] + axis_nan + [-axis_length, axis_length],
+        mode='lines',
+        line=dict(color=['red'] * 3 + ['green'] * 3 + ['blue'] * 2, width=4),
+        name='坐标轴',
+        showlegend=False,
+        hoverinfo='skip'
+    )
+    
+    # X/Y/Z轴标注（合并为一条文字轨迹，颜色逐点指定）
+    axis_label_pos = axis_length * 1.15
+    axis_label_trace = go.Scatter3d(
+        x=[axis_label_pos, 0, 0], y=[0, axis_label_pos, 0], z=[0, 0, axis_label_pos],
+        mode='text',
+        text=['X', 'Y', 'Z'],
+        textfont=dict(size=18, color=['red', 'green', 'blue'], family='Arial Black'),
+        showlegend=False,
+        hoverinfo='skip'
+    )
+
+    return axis_line_trace, axis_label_trace
+
+# 截面椭圆的采样角度及其正余弦（固定网格，只算一次）
+# 900×700画布上64个点已足够平滑（弦高误差约为半径的0.12%）
+ELLIPSE_ANGLES = np.linspace(0, 2*np.pi, 64)
+ELLIPSE_COS = np.cos(ELLIPSE_ANGLES)
+ELLIPSE_SIN = np.sin(ELLIPSE_ANGLES)
+
+# 3D图中不随输入变化的布局设置（标题文字和scene标注在build_3d_figure中补充）
+LAYOUT_3D = dict(
+    scene=dict(
+        xaxis_title='X',
+        yaxis_title='Y',
+        zaxis_title='Z',
+        aspectmode='data',  # 保证坐标轴比例一致
+        camera=dict(
+            eye=dict(x=1.5, y=1.5, z=1.5)  # 设置视角
+        ),
+        bgcolor='rgba(240, 240, 250, 0.9)'  # 浅色背景
+    ),
+    uirevision='3d_pm_view',  # 固定值：重新生成图时保留用户调整过的视角和图例状态
+    width=900,
+    height=700,
+    margin=dict(r=20, l=10, b=10, t=50),
+    title=dict(
+        x=0.5,
+        xanchor='center',
+        font=dict(size=18)
+    ),
+    showlegend=True,
+    legend=dict(x=0.7, y=0.95)
+)
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def build_3d_figure(target_mode_3d, crystal_name, process_type, plane, phi, theta_critical, e_wave_data,
+                    wavelength1_nm, wavelength2_nm, wavelength_out_nm, indices_w1, indices_w2, indices_out):
+    """
+    构建3D折射率椭球示意图，按输入参数缓存，相同输入的rerun直接复用已生成的图
+    
+    参数:
+        target_mode_3d (str): 要可视化的相位匹配模式
+        theta_critical (float): 该模式的临界角(度)，nan表示不匹配
+        e_wave_data (tuple): 该模式中E光的 ((波长nm, 走离角°), ...)，来自 Solver.mode_meta 的 'e_beams'
+        indices_w1/indices_w2/indices_out (tuple): 各光的 (n_x, n_y, n_z)，SHG时indices_w2不使用
+    
+    返回:
+        go.Figure（被缓存共享，不要原地修改）
+    """
+    import plotly.graph_objects as go
+
+    n_x_w1, n_y_w1, n_z_w1 = indices_w1
+    if process_type == 'SFG':
+        n_x_w2, n_y_w2, n_z_w2 = indices_w2
+    n_x_out, n_y_out, n_z_out = indices_out
+
+    # region 1. 缩放系数与标签设置
+    # === 使用真实折射率值，不进行缩放 ===
+    scale_w1_x = n_x_w1
+    scale_w1_y = n_y_w1
+    scale_w1_z = n_z_w1
+    
+    if process_type == 'SFG':
+        scale_w2_x = n_x_w2
+        scale_w2_y = n_y_w2
+        scale_w2_z = n_z_w2
+    
+    scale_out_x = n_x_out
+    scale_out_y = n_y_out
+    scale_out_z = n_z_out
+    
+    # 确定标签文本和颜色
+    if process_type == 'SHG':
+        input1_label = f'基频光 (ω) {wavelength1_nm:.1f}nm'
+        output_label = f'倍频光 (2ω) {wavelength_out_nm:.1f}nm'
+    else:  # SFG
+        input1_label = f'输入光1 (ω₁) {wavelength1_nm:.1f}nm'
+        input2_label = f'输入光2 (ω₂) {wavelength2_nm:.1f}nm'
+        output_label = f'和频光 (ω₃) {wavelength_out_nm:.1f}nm'
+        
+        # 确定哪束光波长更短，用于颜色分配
+        if wavelength2_nm < wavelength1_nm:
+            # λ2更短
+            short_wave_label = input2_label
+            long_wave_label = input1_label
+            short_wave_color_start = 'rgb(255, 215, 0)'  # 金黄色
+            short_wave_color_end = 'rgb(255, 235, 100)'
+            long_wave_color_start = 'rgb(255, 80, 80)'
+            long_wave_color_end = 'rgb(255, 150, 150)'
+            short_indices = (n_x_w2, n_y_w2, n_z_w2)
+            long_indices = (n_x_w1, n_y_w1, n_z_w1)
+        else:
+            # λ1更短
+            short_wave_label = input1_label
+            long_wave_label = input2_label
+            short_wave_color_start = 'rgb(255, 215, 0)'  # 金黄色
+            short_wave_color_end = 'rgb(255, 235, 100)'
+            long_wave_color_start = 'rgb(255, 80, 80)'
+            long_wave_color_end = 'rgb(255, 150, 150)'
+            short_indices = (n_x_w1, n_y_w1, n_z_w1)
+            long_indices = (n_x_w2, n_y_w2, n_z_w2)
+    # endregion
+
+    # region 2. 生成折射率椭球
+    # 创建球坐标系的网格 (theta: 0到π, phi: 0到2π)，示意图用30×30已足够光滑
+    u = np.linspace(0, 2 * np.pi, 30)
+    v = np.linspace(0, np.pi, 30)
+    
+    # 单位球面网格只算一次，各椭球按自己的主折射率缩放
+    unit_sphere = unit_sphere_mesh(u, v)
+    
+    # 生成输入光1折射率椭球的坐标
+    x_w1, y_w1, z_w1 = ellipsoid_mesh(scale_w1_x, scale_w1_y, scale_w1_z, unit_sphere)
+    
+    # SFG: 生成输入光2折射率椭球的坐标
+    if process_type == 'SFG':
+        x_w2, y_w2, z_w2 = ellipsoid_mesh(scale_w2_x, scale_w2_y, scale_w2_z, unit_sphere)
+
+    # 生成输出光折射率椭球的坐标
+    x_out, y_out, z_out = ellipsoid_mesh(scale_out_x, scale_out_y, scale_out_z, unit_sphere)
+    # endregion
+    
+    # region 3. 添加折射率椭球
+    # 椭球用Mesh3d绘制，三个椭球共用同一组网格三角剖分
+    tri_i, tri_j, tri_k = grid_triangles(np.size(u), np.size(v))
+    traces = []  # 所有轨迹先收集起来，最后一次性构建Figure
+    scene_annotations = []  # 单个文字标签用scene注释，不必为每个标签单独建一条轨迹
+    
+    # SHG模式：红色输入光
+    if process_type == 'SHG':
+        traces.append(go.Mesh3d(
+            x=x_w1.ravel(), y=y_w1.ravel(), z=z_w1.ravel(),
+            i=tri_i, j=tri_j, k=tri_k,
+            intensity=z_w1.ravel(),  # 沿z方向渐变着色，与原Surface的效果一致
+            colorscale=[[0, 'rgb(255, 80, 80)'], [1, 'rgb(255, 150, 150)']],
+            showscale=False,
+            opacity=0.25,
+            name=input1_label,
+            hovertemplate=f'{input1_label}<br>n_x={n_x_w1:.4f}<br>n_y={n_y_w1:.4f}<br>n_z={n_z_w1:.4f}<extra></extra>'
+        ))
+    
+    # SFG模式：添加两束输入光，短波长用黄色
+    if process_type == 'SFG':
+        # 短波长光（黄色）
+        if wavelength1_nm < wavelength2_nm:
+            short_x, short_y, short_z = x_w1, y_w1, z_w1
+            long_x, long_y, long_z = x_w2, y_w2, z_w2
+        else:
+            short_x, short_y, short_z = x_w2, y_w2, z_w2
+            long_x, long_y, long_z = x_w1, y_w1, z_w1
+        
+        # 添加短波长光椭球（黄色）
+        traces.append(go.Mesh3d(
+            x=short_x.ravel(), y=short_y.ravel(), z=short_z.ravel(),
+            i=tri_i, j=tri_j, k=tri_k,
+            intensity=short_z.ravel(),  # 沿z方向渐变着色，与原Surface的效果一致
+            colorscale=[[0, short_wave_color_start], [1, short_wave_color_end]],
+            showscale=False,
+            opacity=0.25,
+            name=short_wave_label,
+            hovertemplate=f'{short_wave_label}<br>n_x={short_indices[0]:.4f}<br>n_y={short_indices[1]:.4f}<br>n_z={short_indices[2]:.4f}<extra></extra>'
+        ))
+        
+        # 添加长波长光椭球（红色）
+        traces.append(go.Mesh3d(
+            x=long_x.ravel(), y=long_y.ravel(), z=long_z.ravel(),
+            i=tri_i, j=tri_j, k=tri_k,
+            intensity=long_z.ravel(),  # 沿z方向渐变着色，与原Surface的效果一致
+            colorscale=[[0, long_wave_color_start], [1, long_wave_color_end]],
+            showscale=False,
+            opacity=0.25,
+            name=long_wave_label,
+            hovertemplate=f'{long_wave_label}<br>n_x={long_indices[0]:.4f}<br>n_y={long_indices[1]:.4f}<br>n_z={long_indices[2]:.4f}<extra></extra>'
+        ))
+
+    # 添加输出光椭球（蓝色）
+    traces.append(go.Mesh3d(
+        x=x_out.ravel(), y=y_out.ravel(), z=z_out.ravel(),
+        i=tri_i, j=tri_j, k=tri_k,
+        intensity=z_out.ravel(),  # 沿z方向渐变着色，与原Surface的效果一致
+        colorscale=[[0, 'rgb(50, 100, 255)'], [1, 'rgb(100, 150, 255)']],
+        showscale=False,
+        opacity=0.25,
+        name=output_label,
+        hovertemplate=f'{output_label}<br>n_x={n_x_out:.4f}<br>n_y={n_y_out:.4f}<br>n_z={n_z_out:.4f}<extra></extra>'
+    ))
+    # endregion
+
+    # region 4. 添加坐标轴
+    # 坐标轴参考线及标注（固定不变，已缓存）
+    traces.extend(axis_traces())
+    # endregion
+
+    # region 5. 添加k矢量和S矢量
+    # === 添加临界角下的 k 矢量和 S 矢量 (示意图) ===
+    if not np.isnan(theta_critical):
+        vector_length = 2.8  # 矢量长度
+        
+        # 根据所选平面确定实际的 theta 和 phi
+        # 球坐标: theta是与Z轴夹角, phi是在XY平面投影与X轴夹角
+        if plane == "XY":
+            # XY平面: 计算得到的临界角是phi, 用户输入的是theta
+            theta_rad = np.deg2rad(phi)  # 用户输入的theta
+            phi_rad = np.deg2rad(theta_critical)  # 计算得到的phi
+            display_theta = phi
+            display_phi = theta_critical
+        else:  # XZ 或 YZ 平面
+            # XZ/YZ平面: 计算得到的临界角是theta, 用户输入的是phi
+            theta_rad = np.deg2rad(theta_critical)  # 计算得到的theta
+            phi_rad = np.deg2rad(phi)  # 用户输入的phi
+            display_theta = theta_critical
+            display_phi = phi
+        
+        # θ、φ的三角函数只算一次，后面的k矢量、S矢量和角度弧线都复用（标量用math比np快）
+        sin_th, cos_th = math.sin(theta_rad), math.cos(theta_rad)
+        sin_ph, cos_ph = math.sin(phi_rad), math.cos(phi_rad)
+        
+        # === 输入光1的k和S矢量 ===
+        # 使用标准球坐标转笛卡尔坐标公式
+        k1_x = vector_length * sin_th * cos_ph
+        k1_y = vector_length * sin_th * sin_ph
+        k1_z = vector_length * cos_th
+        
+        # 绘制 k 矢量 (波矢量) - 金黄色箭头
+        k1_label = 'k矢量'
+        traces.append(go.Scatter3d(
+            x=[0, k1_x], y=[0, k1_y], z=[0, k1_z],
+            mode='lines',
+            line=dict(color='gold', width=5),
+            name=f'{k1_label} (θ={display_theta:.2f}°, φ={display_phi:.1f}°)',
+            showlegend=True,
+            hovertemplate=f'{k1_label}<br>θ=%.2f°<br>φ=%.1f°<extra></extra>' % (display_theta, display_phi)
+        ))
+        
+        # 使用 Cone 绘制 k 矢量箭头
+        traces.append(go.Cone(
+            x=[k1_x], y=[k1_y], z=[k1_z],
+            u=[k1_x*0.1], v=[k1_y*0.1], w=[k1_z*0.1],
+            colorscale=[[0, 'gold'], [1, 'gold']],
+            showscale=False,
+            sizemode="absolute",
+            sizeref=0.12,
+            name=f'{k1_label}箭头',
+            showlegend=False
+        ))
+        
+        # 在k矢量旁边添加标注（放在更外侧）
+        traces.append(go.Scatter3d(
+            x=[k1_x*1], y=[k1_y*1], z=[k1_z*2],
+            mode='text',
+            text=['k'],
+            textfont=dict(size=16, color='gold', family='Arial Black'),
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        
+        # === 绘制所有E光的S矢量 ===
+        # 为不同的S矢量使用不同的颜色
+        s_colors = ['darkorange', 'purple', 'green']
+        s_vectors = []  # [(s_x, s_y, s_z, color, wavelength_nm, walkoff_deg), ...]，走离角弧线复用
+        
+        # 一次算出所有E光的S矢量方向（走离角夸大3倍以便观察），平面只判断一次
+        exaggerated_walkoff_rad = np.deg2rad(np.array([walkoff_deg for _, walkoff_deg in e_wave_data]) * 3)
+        if plane in ["XZ", "YZ"]:
+            # 走离发生在θ方向
+            s_theta_rad = theta_rad - exaggerated_walkoff_rad
+            sin_s_th = np.sin(s_theta_rad)
+            s_xs = vector_length * sin_s_th * cos_ph
+            s_ys = vector_length * sin_s_th * sin_ph
+            s_zs = vector_length * np.cos(s_theta_rad)
+        else:  # XY平面：走离发生在φ方向
+            s_phi_rad = phi_rad - exaggerated_walkoff_rad
+            s_xs = vector_length * sin_th * np.cos(s_phi_rad)
+            s_ys = vector_length * sin_th * np.sin(s_phi_rad)
+            s_zs = np.full(len(e_wave_data), vector_length * cos_th)
+        
+        for idx, (wavelength_nm, walkoff_deg) in enumerate(e_wave_data):
+            s_x, s_y, s_z = s_xs[idx], s_ys[idx], s_zs[idx]
+            
+            # 选择颜色
+            color = s_colors[idx % len(s_colors)]
+            s_vectors.append((s_x, s_y, s_z, color, wavelength_nm, walkoff_deg))
+            
+            # 绘制S矢量线条
+            s_label = f'S ({wavelength_nm:.0f})'
+            traces.append(go.Scatter3d(
+                x=[0, s_x], y=[0, s_y], z=[0, s_z],
+                mode='lines',
+                line=dict(color=color, width=5),
+                name=s_label,
+                showlegend=True,
+                hovertemplate=f'{s_label}<br>实际走离角={walkoff_deg:.4f}°<extra></extra>'
+            ))
+            
+            # 绘制S矢量箭头
+            traces.append(go.Cone(
+                x=[s_x], y=[s_y], z=[s_z],
+                u=[s_x*0.1], v=[s_y*0.1], w=[s_z*0.1],
+                colorscale=[[0, color], [1, color]],
+                showscale=False,
+                sizemode="absolute",
+                sizeref=0.12,
+                name=f'{s_label}箭头',
+                showlegend=False
+            ))
+            
+            # 在S矢量旁边添加标注（都放在内侧但错开）
+            s_text = f'S\n({wavelength_nm:.0f})'
+            label_distance = 1.05 + idx * 0.05  # 每个S矢量的标注距离稍微递增
+            traces.append(go.Scatter3d(
+                x=[s_x*label_distance], y=[s_y*label_distance], z=[s_z*label_distance],
+                mode='text',
+                text=[s_text],
+                textfont=dict(size=12, color=color, family='Arial Black'),
+                showlegend=False,
+                hoverinfo='skip'
+            ))
+    # endregion
+        
+    # region 6. 添加角度标注 (走离角、theta角、phi角)
+        # === 用弧线标注所有E光的走离角（k矢量和S矢量之间的角度）===
+        k_length = norm3(k1_x, k1_y, k1_z)
+        k_norm = np.array([k1_x / k_length, k1_y / k_length, k1_z / k_length])  # 归一化k方向
+        
+        for idx, (s_x, s_y, s_z, color, wavelength_nm, walkoff_deg) in enumerate(s_vectors):
+            # 归一化S方向（S矢量位置沿用上面绘制时的结果）
+            s_length = norm3(s_x, s_y, s_z)
+            s_norm = np.array([s_x / s_length, s_y / s_length, s_z / s_length])
+            
+            # 计算从k到S的弧线（使用球面线性插值）
+            # 为不同的E光使用不同的弧线半径和颜色
+            arc_radius_base = 1.5
+            arc_radius_walkoff = arc_radius_base - idx * 0.2  # 每个E光的弧线半径递减
+            n_points_walkoff = 25
+            
+            # 使用球面线性插值 (slerp) 一次生成k到S之间的全部弧线点
+            t = np.arange(n_points_walkoff)[:, np.newaxis] / (n_points_walkoff - 1)
+            theta_interp = np.arccos(np.clip(np.dot(k_norm, s_norm), -1, 1))
+            if theta_interp > 1e-6:  # 避免除零
+                sin_theta = math.sin(theta_interp)
+                a = np.sin((1 - t) * theta_interp) / sin_theta
+                b = np.sin(t * theta_interp) / sin_theta
+                interp_directions = a * k_norm + b * s_norm
+            else:
+                interp_directions = np.tile(k_norm, (n_points_walkoff, 1))
+            
+            # 归一化并缩放到弧线半径
+            interp_directions = interp_directions / np.linalg.norm(interp_directions, axis=1, keepdims=True)
+            walkoff_arc_x, walkoff_arc_y, walkoff_arc_z = arc_radius_walkoff * interp_directions.T
+            
+            # 绘制弧线
+            traces.append(go.Scatter3d(
+                x=walkoff_arc_x, y=walkoff_arc_y, z=walkoff_arc_z,
+                mode='lines',
+                line=dict(color=color, width=3),
+                name=f'走离角弧线({wavelength_nm:.0f}nm)',
+                showlegend=False,
+                hoverinfo='skip'
+            ))
+            
+            # 走离角标注文字位置（弧线中点）
+            mid_direction = (k_norm + s_norm) / 2
+            mid_direction = mid_direction / norm3(*mid_direction)
+            text_x = mid_direction[0] * (arc_radius_walkoff + 0.3)
+            text_y = mid_direction[1] * (arc_radius_walkoff + 0.3)
+            text_z = mid_direction[2] * (arc_radius_walkoff + 0.3)
+            
+            traces.append(go.Scatter3d(
+                x=[text_x], y=[text_y], z=[text_z],
+                mode='text',
+                text=[f'ρ={walkoff_deg:.4f}°'],
+                textfont=dict(size=11, color=color, family='Arial Black'),
+                showlegend=False,
+                hoverinfo='skip'
+            ))
+        
+        # === 用弧线标注theta角（Z轴与k矢量的夹角）===
+        arc_radius_theta = 0.8  # 弧线半径
+        n_points = 30  # 弧线点数
+        theta_arc = np.linspace(0, theta_rad, n_points)
+        
+        # 弧线在从Z轴到k矢量的平面上
+        sin_theta_arc = np.sin(theta_arc)
+        arc_theta_x = arc_radius_theta * sin_theta_arc * cos_ph
+        arc_theta_y = arc_radius_theta * sin_theta_arc * sin_ph
+        arc_theta_z = arc_radius_theta * np.cos(theta_arc)
+        
+        traces.append(go.Scatter3d(
+            x=arc_theta_x, y=arc_theta_y, z=arc_theta_z,
+            mode='lines',
+            line=dict(color='blue', width=3),
+            name='θ角弧线',
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        
+        # theta角度标注文字
+        theta_label_r = 1.0
+        theta_label_theta = theta_rad / 2
+        theta_label_x = theta_label_r * math.sin(theta_label_theta) * cos_ph
+        theta_label_y = theta_label_r * math.sin(theta_label_theta) * sin_ph
+        theta_label_z = theta_label_r * math.cos(theta_label_theta)
+        
+        traces.append(go.Scatter3d(
+            x=[theta_label_x], y=[theta_label_y], z=[theta_label_z],
+            mode='text',
+            text=[f'θ={display_theta:.2f}°'],
+            textfont=dict(size=12, color='blue', family='Arial'),
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        
+        # === 绘制k矢量在XY平面上的投影 ===
+        k_proj_x = k1_x
+        k_proj_y = k1_y
+        k_proj_z = 0
+        
+        # 从k矢量到其投影的虚线
+        traces.append(go.Scatter3d(
+            x=[k1_x, k_proj_x], y=[k1_y, k_proj_y], z=[k1_z, k_proj_z],
+            mode='lines',
+            line=dict(color='gray', width=2, dash='dot'),
+            name='k投影线',
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        
+        # k矢量在XY平面上的投影线（从原点到投影点）
+        traces.append(go.Scatter3d(
+            x=[0, k_proj_x], y=[0, k_proj_y], z=[0, 0],
+            mode='lines',
+            line=dict(color='purple', width=3, dash='dash'),
+            name='k在XY平面投影',
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        
+        # === 用弧线标注phi角（X轴与投影的夹角，在XY平面上）===
+        arc_radius_phi = 0.6  # 弧线半径
+        phi_arc = np.linspace(0, phi_rad, n_points)
+        
+        # 弧线在XY平面上
+        arc_phi_x = arc_radius_phi * np.cos(phi_arc)
+        arc_phi_y = arc_radius_phi * np.sin(phi_arc)
+        arc_phi_z = np.zeros(n_points)  # 完全在XY平面内（z=0）
+        
+        traces.append(go.Scatter3d(
+            x=arc_phi_x, y=arc_phi_y, z=arc_phi_z,
+            mode='lines',
+            line=dict(color='green', width=3),
+            name='φ角弧线',
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        
+        # phi角度标注文字
+        phi_label_r = 0.75
+        phi_label_phi = phi_rad / 2
+        phi_label_x = phi_label_r * math.cos(phi_label_phi)
+        phi_label_y = phi_label_r * math.sin(phi_label_phi)
+        phi_label_z = 0
+        
+        traces.append(go.Scatter3d(
+            x=[phi_label_x], y=[phi_label_y], z=[phi_label_z],
+            mode='text',
+            text=[f'φ={display_phi:.2f}°'],
+            textfont=dict(size=12, color='green', family='Arial'),
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        # endregion
+        
+        # region 7. 绘制晶体长方体
+        # === 绘制晶体长方体（端面垂直于k矢量）===
+        # k矢量方向的单位向量
+        k_unit = k_norm
+        
+        # 晶体参数
+        crystal_length = 2.5  # 晶体长度（沿k方向）
+        crystal_width = 0.8   # 晶体宽度
+        crystal_height = 0.8  # 晶体高度
+        
+        # 晶体中心位置（后端面在原点，所以中心在 crystal_length/2 位置）
+        crystal_center_distance = crystal_length / 2  # 晶体中心距原点的距离
+        crystal_center = k_unit * crystal_center_distance
+        
+        # 构建与k垂直的两个正交向量（作为晶体的宽度和高度方向）
+        # 选择一个不与k平行的向量
+        if abs(k_unit[2]) < 0.9:
+            v1 = np.array([0, 0, 1])
+        else:
+            v1 = np.array([1, 0, 0])
+        
+        # 通过叉乘得到两个正交向量
+        v2 = np.cross(k_unit, v1)
+        v2 = v2 / norm3(*v2)  # 归一化
+        v3 = np.cross(k_unit, v2)  # k_unit与v2是正交单位向量，叉乘结果已是单位向量，无需再归一化
+        
+        # 定义长方体的8个顶点（相对于中心）
+        # 顶点定义：沿k方向 ±crystal_length/2，沿v2方向 ±crystal_width/2，沿v3方向 ±crystal_height/2
+        # 符号表按 (k, v2, v3) 顺序排列，与下面边的顶点编号对应
+        vertex_signs = np.array([[-1, -1, -1], [-1, -1, 1], [-1, 1, -1], [-1, 1, 1],
+                                 [1, -1, -1], [1, -1, 1], [1, 1, -1], [1, 1, 1]])
+        half_sizes = np.array([crystal_length, crystal_width, crystal_height]) / 2
+        box_basis = np.stack([k_unit, v2, v3]) * half_sizes[:, None]  # 每行: 半边长 × 方向
+        vertices = crystal_center + vertex_signs @ box_basis  # (8, 3)
+        
+        # 定义长方体的12条边（连接顶点）
+        edges = [
+            [0, 1], [2, 3], [4, 5], [6, 7],  # 平行于k的边
+            [0, 2], [1, 3], [4, 6], [5, 7],  # 平行于v2的边
+            [0, 4], [1, 5], [2, 6], [3, 7]   # 平行于v3的边
+        ]
+        
+        # 绘制长方体的边框：12条边合并为一条轨迹，边与边之间用nan断开
+        edge_points = np.full((len(edges), 3, 3), np.nan)  # (边, 起点/终点/断点, xyz)
+        edge_points[:, 0] = vertices[[edge[0] for edge in edges]]
+        edge_points[:, 1] = vertices[[edge[1] for edge in edges]]
+        edge_points = edge_points.reshape(-1, 3)[:-1]  # 去掉末尾多余的断点
+        traces.append(go.Scatter3d(
+            x=edge_points[:, 0],
+            y=edge_points[:, 1],
+            z=edge_points[:, 2],
+            mode='lines',
+            line=dict(color='cyan', width=3),
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        
+        # 绘制晶体的两个端面（用半透明平面）
+        # 前端面（靠近k矢量方向）
+        front_center = crystal_center + (crystal_length / 2) * k_unit
+        # 后端面（远离k矢量方向）
+        back_center = crystal_center - (crystal_length / 2) * k_unit
+        
+        # 两个端面合并为一个Mesh3d：每个端面4个角点、2个三角形
+        # 角点按 (v2, v3) 方向符号依次绕一圈: (-,-) (+,-) (+,+) (-,+)
+        face_signs = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]])
+        face_offsets = (face_signs[:, :1] * (crystal_width / 2) * v2
+                        + face_signs[:, 1:] * (crystal_height / 2) * v3)  # (4, 3)
+        face_vertices = np.concatenate([front_center + face_offsets, back_center + face_offsets])  # (8, 3)
+        
+        traces.append(go.Mesh3d(
+            x=face_vertices[:, 0], y=face_vertices[:, 1], z=face_vertices[:, 2],
+            i=[0, 0, 4, 4], j=[1, 2, 5, 6], k=[2, 3, 6, 7],
+            color='cyan',
+            opacity=0.3,
+            name='晶体端面',
+            hoverinfo='skip',
+            showlegend=False
+        ))
+        # endregion
+        
+        # region 8. 绘制截面椭圆
+        # === 绘制垂直于k矢量的截面与折射率椭球的交线（椭圆）===
+        # 截面位置在原点（晶体后端面）
+        cross_section_center = np.array([0.0, 0.0, 0.0])
+        
+        # 在截面上绘制折射率椭球的交线（椭圆）
+        # 截面内各采样方向（所有椭圆共用）: direction = cos(angle) * v2 + sin(angle) * v3
+        directions = ELLIPSE_COS[:, None] * v2 + ELLIPSE_SIN[:, None] * v3  # (N, 3)
+        
+        # 绘制输入光和输出光的椭圆（两者对比）
+        # 每个椭圆: (标签, 缩放尺寸x/y/z, 椭圆颜色, 半轴虚线及标注颜色, 标注偏移, 线宽)
+        # 颜色和标注偏移在这里按光束直接确定，后面不再按波长数值反查
+        red = ('rgba(255, 80, 80, 0.4)', 'rgb(255, 80, 80)')    # 长波长 - 红色
+        yellow = ('rgba(255, 215, 0, 0.4)', 'rgb(255, 215, 0)')  # 短波长 - 黄色
+        blue = ('rgba(50, 100, 255, 0.4)', 'rgb(50, 100, 255)')  # 输出光 - 蓝色
+        ellipses_to_draw = []
+        
+        # SHG模式：输入光1使用红色
+        if process_type == 'SHG':
+            ellipses_to_draw.append((f'{wavelength1_nm:.0f}', scale_w1_x, scale_w1_y, scale_w1_z, *red, v2 * 0.3, 6))
+        
+        # SFG模式：根据波长判断颜色，两束输入光的标注分别向 ±v2 方向错开
+        elif process_type == 'SFG':
+            input1_colors, input2_colors = (yellow, red) if wavelength1_nm < wavelength2_nm else (red, yellow)
+            ellipses_to_draw.append((f'{wavelength1_nm:.0f}', scale_w1_x, scale_w1_y, scale_w1_z, *input1_colors, v2 * 0.3, 6))
+            ellipses_to_draw.append((f'{wavelength2_nm:.0f}', scale_w2_x, scale_w2_y, scale_w2_z, *input2_colors, -v2 * 0.3, 6))
+        
+        # 输出光使用蓝色，标注向v3方向错开
+        ellipses_to_draw.append((f'{wavelength_out_nm:.0f}', scale_out_x, scale_out_y, scale_out_z, *blue, v3 * 0.3, 6))
+        
+        # 计算椭圆上的点
+        # 使用缩放后的椭球尺寸: (x/scale_x)^2 + (y/scale_y)^2 + (z/scale_z)^2 = 1
+        # 垂直于k的平面通过原点，法向量为k_unit
+        # 沿每个采样方向找到椭球表面的点（所有椭圆、所有方向一次性计算）
+        # 参数方程: P = t * direction
+        # 代入椭球方程求t: (t*dx/scale_x)^2 + (t*dy/scale_y)^2 + (t*dz/scale_z)^2 = 1
+        ellipse_scales = np.array([ellipse[1:4] for ellipse in ellipses_to_draw])  # (椭圆数, 3)
+        inv_n_squared_all = ((directions[None, :, :] / ellipse_scales[:, None, :])**2).sum(axis=-1)  # (椭圆数, N)
+        
+        # 长轴和短轴用解析解，不受采样间隔影响：椭球矩阵 diag(1/scale²) 投影到截面基 (v2, v3) 上得到2×2矩阵，
+        # 其特征值λ对应半轴长 1/√λ，特征向量给出半轴方向（特征值升序，第0个为长轴）
+        section_basis = np.stack([v2, v3])  # (2, 3)
+        section_matrices = (section_basis * (1.0 / ellipse_scales**2)[:, None, :]) @ section_basis.T  # (椭圆数, 2, 2)
+        eigvals_all, eigvecs_all = np.linalg.eigh(section_matrices)
+        # 特征向量的符号不唯一，统一取方向角在[0, π)内的一侧，使a/b标注的位置确定
+        # 半轴恰好沿v2时v3分量只剩舍入误差，按0处理
+        v3_component = np.where(np.abs(eigvecs_all[:, 1, :]) < 1e-12, 0.0, eigvecs_all[:, 1, :])
+        flip = (v3_component < 0) | ((v3_component == 0) & (eigvecs_all[:, 0, :] < 0))
+        eigvecs_all = np.where(flip[:, None, :], -eigvecs_all, eigvecs_all)
+        semi_axes_all = 1.0 / np.sqrt(eigvals_all)  # (椭圆数, 2): [长半轴, 短半轴]
+        axis_directions_all = np.swapaxes(eigvecs_all, 1, 2) @ section_basis  # (椭圆数, 2, 3): [长轴方向, 短轴方向]
+        
+        # 长轴、短轴虚线样式相同，每个椭圆合并为一条轨迹 [-a, +a, nan, -b, +b]，所有椭圆的端点一次算好
+        half_axes_all = semi_axes_all[:, :, None] * axis_directions_all  # (椭圆数, 2, 3)
+        axis_lines_all = np.full((len(ellipses_to_draw), 5, 3), np.nan)
+        axis_lines_all[:, 0::3] = cross_section_center - half_axes_all
+        axis_lines_all[:, 1::3] = cross_section_center + half_axes_all
+        axis_lines_all = np.ascontiguousarray(axis_lines_all.transpose(0, 2, 1))  # (椭圆数, 3, 5)，x/y/z各为连续的一行
+        
+        for (label, _, _, _, color, axis_color, label_offset, width), inv_n_squared, semi_axes, axis_lines in zip(
+                ellipses_to_draw, inv_n_squared_all, semi_axes_all, axis_lines_all):
+            valid = inv_n_squared > 1e-10  # 避免除零
+            valid_directions = directions
+            if not valid.all():  # 通常所有方向都有效，此时不必按掩码另复制一份
+                valid_directions = directions[valid]
+                inv_n_squared = inv_n_squared[valid]
+            radii = 1.0 / np.sqrt(inv_n_squared)  # 每个方向的半径值
+            # 按 (3, N) 存放：x/y/z 各自是连续的一行，交给Plotly编码时不必再从 (N, 3) 中按列拷出
+            ellipse_xyz = cross_section_center[:, None] + radii * valid_directions.T
+            
+            if radii.size > 0:
+                # 绘制椭圆交线
+                traces.append(go.Scatter3d(
+                    x=ellipse_xyz[0],
+                    y=ellipse_xyz[1],
+                    z=ellipse_xyz[2],
+                    mode='lines',
+                    line=dict(color=color, width=width),
+                    name=f'{label}截面椭圆',
+                    showlegend=True
+                ))
+                
+                # === 长轴和短轴 ===
+                major_radius, minor_radius = semi_axes
+                major_point = axis_lines[:, 1]      # 长轴正端点
+                minor_point_neg = axis_lines[:, 3]  # 短轴负端点
+                
+                # 绘制长轴、短轴虚线
+                traces.append(go.Scatter3d(
+                    x=axis_lines[0],
+                    y=axis_lines[1],
+                    z=axis_lines[2],
+                    mode='lines',
+                    line=dict(color=axis_color, width=3, dash='dash'),
+                    name=f'{label}长轴/短轴',
+                    showlegend=False,
+                    hoverinfo='skip'
+                ))
+                
+                # 标注长轴值 - 不同光源的标注按label_offset分散
+                major_label_pos = major_point * 1.15 + label_offset
+                scene_annotations.append(dict(
+                    x=major_label_pos[0], y=major_label_pos[1], z=major_label_pos[2],
+                    text=f'a={major_radius:.3f}',
+                    showarrow=False,
+                    font=dict(size=10, color=axis_color, family='Arial')
+                ))
+                
+                # 标注短轴值 - 使用相同的偏移方向
+                minor_label_pos = minor_point_neg * 1.05 + label_offset
+                scene_annotations.append(dict(
+                    x=minor_label_pos[0], y=minor_label_pos[1], z=minor_label_pos[2],
+                    text=f'b={minor_radius:.3f}',
+                    showarrow=False,
+                    font=dict(size=10, color=axis_color, family='Arial')
+                ))
+        # endregion
+
+    # region 9. 设置图形布局
+    # 固定布局取自LAYOUT_3D，只补上随输入变化的标题和标注，构建Figure时一次性传入
+    fig = go.Figure(data=traces, layout=dict(
+        LAYOUT_3D,
+        scene=dict(LAYOUT_3D['scene'], annotations=scene_annotations),
+        title=dict(
+            LAYOUT_3D['title'],
+            text=f'{crystal_name} 晶体折射率椭球示意图<br><sub>相位匹配模式: {target_mode_3d} | X,Y,Z为晶体光学主轴</sub>'
+        )
+    ))
+    # endregion
+
+    return fig
+
+try:
+    config_args = (
+        crystal_name, wavelength_nm, temperature, plane,
+        process_type_code, wavelength2_nm, sellmeier_source
+    )
+    user_config = build_config(*config_args)
     simulation = Solver(user_config)
 
 except Exception as e:
@@ -347,8 +1076,8 @@ if 'has_run' not in st.session_state:
 if st.button("运行", type="primary", use_container_width=True):
 
     # 每次运行前清除旧结果
-    keys_to_clear = ['res_angle_fig', 'res_wave_fig', 'res_temp_fig', 'temp_match_result', 
-                     'ncpm_res_temp_fig', 'ncpm_res_wl_fig', 'ncpm_res_ang_results', 'ncpm_res_ang_planes',
+    keys_to_clear = ['res_angle_png', 'res_wave_png', 'res_temp_png', 'temp_match_result', 
+                     'ncpm_res_temp_png', 'ncpm_res_wl_png', 'ncpm_res_ang_results', 'ncpm_res_ang_planes',
                      'all_bandwidths_calculated', 'ncpm_all_calculated']
     for key in keys_to_clear:
         if key in st.session_state:
@@ -362,6 +1091,7 @@ if st.button("运行", type="primary", use_container_width=True):
                 st.session_state.theta_dict = simulation.criticalangle()
                 # 2. 计算走离角
                 st.session_state.walkoff_dict = simulation.walkoff_angle(st.session_state.theta_dict, phi)
+                st.session_state.mode_meta_dict = simulation.mode_meta  # 各模式的波长/偏振/E光走离角（3D图用）
                 # 3. 计算有效非线性系数
                 st.session_state.d_eff_dict = simulation.d_eff(st.session_state.theta_dict, phi)
                 # 标记运行完成
@@ -370,73 +1100,19 @@ if st.button("运行", type="primary", use_container_width=True):
             else:
                 # 温度匹配计算 - 对所选传播轴的所有模式进行计算
                 # 生成该传播轴的所有可能模式
-                all_modes_for_axis = []
-                
                 if process_type_code == 'SHG':
-                    λω = f"{wavelength_nm:.0f}nm"
-                    λ2ω = f"{wavelength_nm/2:.0f}nm"
-                    
-                    if fixed_axis_sidebar == 'X':
-                        # X轴传播：可用偏振Y, Z
-                        all_modes_for_axis = [
-                            f"𝐘 ({λω}) + 𝐘 ({λω}) → 𝐙 ({λ2ω}) (Type I)",
-                            f"𝐙 ({λω}) + 𝐙 ({λω}) → 𝐘 ({λ2ω}) (Type I)",
-                            f"𝐘 ({λω}) + 𝐙 ({λω}) → 𝐙 ({λ2ω}) (Type II)",
-                            f"𝐘 ({λω}) + 𝐙 ({λω}) → 𝐘 ({λ2ω}) (Type II)"
-                        ]
-                    elif fixed_axis_sidebar == 'Y':
-                        # Y轴传播：可用偏振X, Z
-                        all_modes_for_axis = [
-                            f"𝐗 ({λω}) + 𝐗 ({λω}) → 𝐙 ({λ2ω}) (Type I)",
-                            f"𝐙 ({λω}) + 𝐙 ({λω}) → 𝐗 ({λ2ω}) (Type I)",
-                            f"𝐗 ({λω}) + 𝐙 ({λω}) → 𝐙 ({λ2ω}) (Type II)",
-                            f"𝐗 ({λω}) + 𝐙 ({λω}) → 𝐗 ({λ2ω}) (Type II)"
-                        ]
-                    else:  # Z
-                        # Z轴传播：可用偏振X, Y
-                        all_modes_for_axis = [
-                            f"𝐗 ({λω}) + 𝐗 ({λω}) → 𝐘 ({λ2ω}) (Type I)",
-                            f"𝐘 ({λω}) + 𝐘 ({λω}) → 𝐗 ({λ2ω}) (Type I)",
-                            f"𝐗 ({λω}) + 𝐘 ({λω}) → 𝐘 ({λ2ω}) (Type II)",
-                            f"𝐗 ({λω}) + 𝐘 ({λω}) → 𝐗 ({λ2ω}) (Type II)"
-                        ]
+                    λ1 = λ2 = f"{wavelength_nm:.0f}nm"
+                    λout = f"{wavelength_nm/2:.0f}nm"
                 else:  # SFG
                     λ1 = f"{wavelength_nm:.0f}nm"
                     λ2 = f"{wavelength2_nm:.0f}nm"
                     λout = f"{1/(1/wavelength_nm + 1/wavelength2_nm):.0f}nm"
-                    
-                    if fixed_axis_sidebar == 'X':
-                        # X轴传播：可用偏振Y, Z
-                        all_modes_for_axis = [
-                            f"𝐘 ({λ1}) + 𝐘 ({λ2}) → 𝐙 ({λout}) (Type I)",
-                            f"𝐙 ({λ1}) + 𝐙 ({λ2}) → 𝐘 ({λout}) (Type I)",
-                            f"𝐘 ({λ1}) + 𝐙 ({λ2}) → 𝐙 ({λout}) (Type II)",
-                            f"𝐙 ({λ1}) + 𝐘 ({λ2}) → 𝐙 ({λout}) (Type II)",
-                            f"𝐘 ({λ1}) + 𝐙 ({λ2}) → 𝐘 ({λout}) (Type II)",
-                            f"𝐙 ({λ1}) + 𝐘 ({λ2}) → 𝐘 ({λout}) (Type II)"
-                        ]
-                    elif fixed_axis_sidebar == 'Y':
-                        # Y轴传播：可用偏振X, Z
-                        all_modes_for_axis = [
-                            f"𝐗 ({λ1}) + 𝐗 ({λ2}) → 𝐙 ({λout}) (Type I)",
-                            f"𝐙 ({λ1}) + 𝐙 ({λ2}) → 𝐗 ({λout}) (Type I)",
-                            f"𝐗 ({λ1}) + 𝐙 ({λ2}) → 𝐙 ({λout}) (Type II)",
-                            f"𝐙 ({λ1}) + 𝐗 ({λ2}) → 𝐙 ({λout}) (Type II)",
-                            f"𝐗 ({λ1}) + 𝐙 ({λ2}) → 𝐗 ({λout}) (Type II)",
-                            f"𝐙 ({λ1}) + 𝐗 ({λ2}) → 𝐗 ({λout}) (Type II)"
-                        ]
-                    else:  # Z
-                        # Z轴传播：可用偏振X, Y
-                        all_modes_for_axis = [
-                            f"𝐗 ({λ1}) + 𝐗 ({λ2}) → 𝐘 ({λout}) (Type I)",
-                            f"𝐘 ({λ1}) + 𝐘 ({λ2}) → 𝐗 ({λout}) (Type I)",
-                            f"𝐗 ({λ1}) + 𝐘 ({λ2}) → 𝐘 ({λout}) (Type II)",
-                            f"𝐘 ({λ1}) + 𝐗 ({λ2}) → 𝐘 ({λout}) (Type II)",
-                            f"𝐗 ({λ1}) + 𝐘 ({λ2}) → 𝐗 ({λout}) (Type II)",
-                            f"𝐘 ({λ1}) + 𝐗 ({λ2}) → 𝐗 ({λout}) (Type II)"
-                        ]
+                all_modes_for_axis = [
+                    template.format(w1=λ1, w2=λ2, wout=λout)
+                    for template in MODE_TEMPLATES[(process_type_code, fixed_axis_sidebar)]
+                ]
                 
-                # 对每个模式进行温度匹配计算
+                # 对每个模式进行温度匹配计算（界面只用表格中的数值结果，不画图）
                 temp_match_results = {}
                 for mode in all_modes_for_axis:
                     try:
@@ -444,7 +1120,8 @@ if st.button("运行", type="primary", use_container_width=True):
                             mode, 
                             temperature_range=(temp_min_sidebar, temp_max_sidebar), 
                             temp_step=temp_step_sidebar, 
-                            fixed_axis=fixed_axis_sidebar
+                            fixed_axis=fixed_axis_sidebar,
+                            plot=False
                         )
                         temp_match_results[mode] = result
                     except Exception as e:
@@ -486,10 +1163,18 @@ if st.session_state.has_run:
     
         theta_dict = st.session_state.theta_dict
         walkoff_dict = st.session_state.walkoff_dict
+        mode_meta_dict = st.session_state.mode_meta_dict
         d_eff_dict = st.session_state.d_eff_dict
         
         # 准备表格数据
-        table_data = []
+        # 按列收集 (dict of lists)，比逐行构造 dict 再交给 DataFrame 快
+        table_cols = {
+            "匹配模式": [],
+            "临界角": [],
+            "走离角 [负值代表远离Z轴(XZ,YZ)或X轴(XY)]": [],
+            "有效非线性系数(pm/V)": []
+        }
+        col_mode, col_angle, col_walkoff, col_d_eff = table_cols.values()
         valid_modes = [] # 记录有效的模式，后面画图用
         
         for mode in theta_dict:
@@ -505,15 +1190,14 @@ if st.session_state.has_run:
                 walkoff_str = "-"
                 d_eff_str = "-"
                 
-            table_data.append({
-                "匹配模式": mode,
-                "临界角": pm_angle_str,
-                "走离角 [负值代表远离Z轴(XZ,YZ)或X轴(XY)]": walkoff_str,
-                "有效非线性系数(pm/V)": d_eff_str
-            })
+            col_mode.append(mode)
+            col_angle.append(pm_angle_str)
+            col_walkoff.append(walkoff_str)
+            col_d_eff.append(d_eff_str)
         
-        # 展示表格
-        df = pd.DataFrame(table_data)
+        # 展示表格（pandas/plotly/matplotlib 都在实际用到的分支里再导入，减少冷启动时间）
+        import pandas as pd
+        df = pd.DataFrame(table_cols, copy=False)
         st.dataframe(
             df, 
             use_container_width=True, 
@@ -542,905 +1226,64 @@ if st.session_state.has_run:
             with col_sel:
                 target_mode_3d = st.selectbox("👉 请选择要可视化的模式:", valid_modes, key='mode_3d')
 
-            # 生成3D图按钮
-            if st.button("生成3D图", type="secondary", key="btn_3d"):
-                # --- 创建3D折射率椭球示意图 (夸大视觉效果) ---
-                fig = go.Figure()
-
-            # region 1. 数据获取和缩放系数设置
-            # 获取输入光1的折射率
-            indices_w1 = user_config.get_indices(user_config.wavelength1_nm)
-            n_x_w1 = indices_w1['n_x']
-            n_y_w1 = indices_w1['n_y']
-            n_z_w1 = indices_w1['n_z']
-            
-            # 获取输入光2的折射率（SFG需要）
-            if user_config.process_type == 'SFG':
-                indices_w2 = user_config.get_indices(user_config.wavelength2_nm)
-                n_x_w2 = indices_w2['n_x']
-                n_y_w2 = indices_w2['n_y']
-                n_z_w2 = indices_w2['n_z']
-
-            # 获取输出光的折射率
-            indices_out = user_config.get_indices(user_config.wavelength_out_nm)
-            n_x_out = indices_out['n_x']
-            n_y_out = indices_out['n_y']
-            n_z_out = indices_out['n_z']
-
-            # === 使用真实折射率值，不进行缩放 ===
-            scale_w1_x = n_x_w1
-            scale_w1_y = n_y_w1
-            scale_w1_z = n_z_w1
-            
-            if user_config.process_type == 'SFG':
-                scale_w2_x = n_x_w2
-                scale_w2_y = n_y_w2
-                scale_w2_z = n_z_w2
-            
-            scale_out_x = n_x_out
-            scale_out_y = n_y_out
-            scale_out_z = n_z_out
-            
-            # 确定标签文本和颜色
-            if user_config.process_type == 'SHG':
-                input1_label = f'基频光 (ω) {user_config.wavelength1_nm:.1f}nm'
-                output_label = f'倍频光 (2ω) {user_config.wavelength_out_nm:.1f}nm'
-            else:  # SFG
-                input1_label = f'输入光1 (ω₁) {user_config.wavelength1_nm:.1f}nm'
-                input2_label = f'输入光2 (ω₂) {user_config.wavelength2_nm:.1f}nm'
-                output_label = f'和频光 (ω₃) {user_config.wavelength_out_nm:.1f}nm'
-                
-                # 确定哪束光波长更短，用于颜色分配
-                if user_config.wavelength2_nm < user_config.wavelength1_nm:
-                    # λ2更短
-                    short_wave_label = input2_label
-                    long_wave_label = input1_label
-                    short_wave_color_start = 'rgb(255, 215, 0)'  # 金黄色
-                    short_wave_color_end = 'rgb(255, 235, 100)'
-                    long_wave_color_start = 'rgb(255, 80, 80)'
-                    long_wave_color_end = 'rgb(255, 150, 150)'
-                    short_indices = (n_x_w2, n_y_w2, n_z_w2)
-                    long_indices = (n_x_w1, n_y_w1, n_z_w1)
-                else:
-                    # λ1更短
-                    short_wave_label = input1_label
-                    long_wave_label = input2_label
-                    short_wave_color_start = 'rgb(255, 215, 0)'  # 金黄色
-                    short_wave_color_end = 'rgb(255, 235, 100)'
-                    long_wave_color_start = 'rgb(255, 80, 80)'
-                    long_wave_color_end = 'rgb(255, 150, 150)'
-                    short_indices = (n_x_w1, n_y_w1, n_z_w1)
-                    long_indices = (n_x_w2, n_y_w2, n_z_w2)
-            # endregion
-
-            # region 2. 生成折射率椭球
-            # 创建球坐标系的网格 (theta: 0到π, phi: 0到2π)
-            u = np.linspace(0, 2 * np.pi, 50)
-            v = np.linspace(0, np.pi, 50)
-            
-            # 生成输入光1折射率椭球的坐标
-            x_w1 = scale_w1_x * np.outer(np.cos(u), np.sin(v))
-            y_w1 = scale_w1_y * np.outer(np.sin(u), np.sin(v))
-            z_w1 = scale_w1_z * np.outer(np.ones(np.size(u)), np.cos(v))
-            
-            # SFG: 生成输入光2折射率椭球的坐标
-            if user_config.process_type == 'SFG':
-                x_w2 = scale_w2_x * np.outer(np.cos(u), np.sin(v))
-                y_w2 = scale_w2_y * np.outer(np.sin(u), np.sin(v))
-                z_w2 = scale_w2_z * np.outer(np.ones(np.size(u)), np.cos(v))
-
-            # 生成输出光折射率椭球的坐标
-            x_out = scale_out_x * np.outer(np.cos(u), np.sin(v))
-            y_out = scale_out_y * np.outer(np.sin(u), np.sin(v))
-            z_out = scale_out_z * np.outer(np.ones(np.size(u)), np.cos(v))
-            
-            # region 3. 创建3D图
-            fig = go.Figure()
-            
-            # SHG模式：红色输入光
-            if user_config.process_type == 'SHG':
-                fig.add_trace(go.Surface(
-                    x=x_w1, y=y_w1, z=z_w1,
-                    colorscale=[[0, 'rgb(255, 80, 80)'], [1, 'rgb(255, 150, 150)']],
-                    showscale=False,
-                    opacity=0.25,
-                    name=input1_label,
-                    hovertemplate=f'{input1_label}<br>n_x={n_x_w1:.4f}<br>n_y={n_y_w1:.4f}<br>n_z={n_z_w1:.4f}<extra></extra>',
-                    contours={"x": {"show": False}, "y": {"show": False}, "z": {"show": False}},
-                    hidesurface=False
-                ))
-            
-            # SFG模式：添加两束输入光，短波长用黄色
-            if user_config.process_type == 'SFG':
-                # 短波长光（黄色）
-                if user_config.wavelength1_nm < user_config.wavelength2_nm:
-                    short_x, short_y, short_z = x_w1, y_w1, z_w1
-                    long_x, long_y, long_z = x_w2, y_w2, z_w2
-                else:
-                    short_x, short_y, short_z = x_w2, y_w2, z_w2
-                    long_x, long_y, long_z = x_w1, y_w1, z_w1
-                
-                # 添加短波长光椭球（黄色）
-                fig.add_trace(go.Surface(
-                    x=short_x, y=short_y, z=short_z,
-                    colorscale=[[0, short_wave_color_start], [1, short_wave_color_end]],
-                    showscale=False,
-                    opacity=0.25,
-                    name=short_wave_label,
-                    hovertemplate=f'{short_wave_label}<br>n_x={short_indices[0]:.4f}<br>n_y={short_indices[1]:.4f}<br>n_z={short_indices[2]:.4f}<extra></extra>',
-                    contours={"x": {"show": False}, "y": {"show": False}, "z": {"show": False}},
-                    hidesurface=False
-                ))
-                
-                # 添加长波长光椭球（红色）
-                fig.add_trace(go.Surface(
-                    x=long_x, y=long_y, z=long_z,
-                    colorscale=[[0, long_wave_color_start], [1, long_wave_color_end]],
-                    showscale=False,
-                    opacity=0.25,
-                    name=long_wave_label,
-                    hovertemplate=f'{long_wave_label}<br>n_x={long_indices[0]:.4f}<br>n_y={long_indices[1]:.4f}<br>n_z={long_indices[2]:.4f}<extra></extra>',
-                    contours={"x": {"show": False}, "y": {"show": False}, "z": {"show": False}},
-                    hidesurface=False
-                ))
-
-            # 添加输出光椭球（蓝色）
-            fig.add_trace(go.Surface(
-                x=x_out, y=y_out, z=z_out,
-                colorscale=[[0, 'rgb(50, 100, 255)'], [1, 'rgb(100, 150, 255)']],
-                showscale=False,
-                opacity=0.25,
-                name=output_label,
-                hovertemplate=f'{output_label}<br>n_x={n_x_out:.4f}<br>n_y={n_y_out:.4f}<br>n_z={n_z_out:.4f}<extra></extra>',
-                contours={"x": {"show": False}, "y": {"show": False}, "z": {"show": False}},
-                hidesurface=False
-            ))
-            # endregion
-
-            # region 3. 添加坐标轴
-            # 添加坐标轴参考线
-            axis_length = 3.5  # 固定长度用于示意图
-            
-            # X轴 (红色)
-            fig.add_trace(go.Scatter3d(
-                x=[-axis_length, axis_length], y=[0, 0], z=[0, 0],
-                mode='lines',
-                line=dict(color='red', width=4),
-                name='X轴',
-                showlegend=True
-            ))
-            
-            # X轴标注
-            fig.add_trace(go.Scatter3d(
-                x=[axis_length * 1.15], y=[0], z=[0],
-                mode='text',
-                text=['X'],
-                textfont=dict(size=18, color='red', family='Arial Black'),
-                showlegend=False,
-                hoverinfo='skip'
-            ))
-            
-            # Y轴 (绿色)
-            fig.add_trace(go.Scatter3d(
-                x=[0, 0], y=[-axis_length, axis_length], z=[0, 0],
-                mode='lines',
-                line=dict(color='green', width=4),
-                name='Y轴',
-                showlegend=True
-            ))
-            
-            # Y轴标注
-            fig.add_trace(go.Scatter3d(
-                x=[0], y=[axis_length * 1.15], z=[0],
-                mode='text',
-                text=['Y'],
-                textfont=dict(size=18, color='green', family='Arial Black'),
-                showlegend=False,
-                hoverinfo='skip'
-            ))
-            
-            # Z轴/光轴 (蓝色)
-            fig.add_trace(go.Scatter3d(
-                x=[0, 0], y=[0, 0], z=[-axis_length, axis_length],
-                mode='lines',
-                line=dict(color='blue', width=4),
-                name='Z轴',
-                showlegend=True
-            ))
+            # 3D图按输入缓存（见build_3d_figure），输入变化时自动重新生成，无需额外按钮
+            # 先检查临界角，不匹配时不构建任何轨迹（valid_modes已过滤掉NaN，这里只作保护）
+            theta_critical_3d = theta_dict[target_mode_3d]
+            if np.isnan(theta_critical_3d):
+                st.warning(f"模式 {target_mode_3d} 没有相位匹配解，无法生成3D图。")
+                st.session_state.pop('3d_fig', None)  # 不显示其他模式留下的旧图
+            elif '3d_fig' in st.session_state and st.session_state.get('3d_state_key') == (target_mode_3d, phi, config_args):
+                # 本次运行结果的该模式已按当前参数生成过3D图（点击"运行"会清除），无关的重跑直接复用，不再取折射率/构图
+                pass
+            else:
+                # region 1. 数据获取
+                # 获取输入光1的折射率
+                indices_w1 = user_config.get_indices(user_config.wavelength1_nm)
+                n_x_w1 = indices_w1['n_x']
+                n_y_w1 = indices_w1['n_y']
+                n_z_w1 = indices_w1['n_z']
             
-            # Z轴标注
-            fig.add_trace(go.Scatter3d(
-                x=[0], y=[0], z=[axis_length * 1.15],
-                mode='text',
-                text=['Z'],
-                textfont=dict(size=18, color='blue', family='Arial Black'),
-                showlegend=False,
-                hoverinfo='skip'
-            ))
-            # endregion
-
-            # endregion
-
-            # region 3. 添加k矢量和S矢量
-            # === 添加临界角下的 k 矢量和 S 矢量 (示意图) ===
-            theta_critical = theta_dict[target_mode_3d]
-            if not np.isnan(theta_critical):
-                vector_length = 2.8  # 矢量长度
-                
-                # 根据所选平面确定实际的 theta 和 phi
-                # 球坐标: theta是与Z轴夹角, phi是在XY平面投影与X轴夹角
-                if user_config.plane == "XY":
-                    # XY平面: 计算得到的临界角是phi, 用户输入的是theta
-                    theta_rad = np.deg2rad(phi)  # 用户输入的theta
-                    phi_rad = np.deg2rad(theta_critical)  # 计算得到的phi
-                    display_theta = phi
-                    display_phi = theta_critical
-                else:  # XZ 或 YZ 平面
-                    # XZ/YZ平面: 计算得到的临界角是theta, 用户输入的是phi
-                    theta_rad = np.deg2rad(theta_critical)  # 计算得到的theta
-                    phi_rad = np.deg2rad(phi)  # 用户输入的phi
-                    display_theta = theta_critical
-                    display_phi = phi
-                
-                # === 输入光1的k和S矢量 ===
-                # 使用标准球坐标转笛卡尔坐标公式
-                k1_x = vector_length * np.sin(theta_rad) * np.cos(phi_rad)
-                k1_y = vector_length * np.sin(theta_rad) * np.sin(phi_rad)
-                k1_z = vector_length * np.cos(theta_rad)
-                
-                # 获取走离角字符串并提取所有E光的信息
-                walkoff_str = walkoff_dict[target_mode_3d]
-                # walkoff_str格式示例: "𝐎 (0°) | 𝐄 (-0.5272° / -9.2020 mrad) | 𝐄 (-0.5268° / -9.1949 mrad)"
-                # target_mode_3d格式示例: "𝐎 (1064) + 𝐄 (1064) → 𝐄 (532) (Type-I)"
-                # 顺序：输入光1 | 输入光2 | 输出光
-                import re
-                
-                # 打印调试信息
-                print(f"DEBUG: target_mode_3d = {target_mode_3d}")
-                print(f"DEBUG: walkoff_str = {walkoff_str}")
-                
-                # === 从target_mode_3d中提取所有波长 ===
-                # 分割输入和输出部分
-                mode_parts = target_mode_3d.split('→')
-                input_part = mode_parts[0].strip()  # "𝐎 (1064) + 𝐄 (1064)" 或 "𝐎 (1064)"
-                output_part = mode_parts[1].strip() if len(mode_parts) > 1 else ""  # "𝐄 (532) (Type-I)"
-                
-                # 提取所有波长（按顺序：输入光1, 输入光2, 输出光）
-                wavelengths_list = []
-                
-                # 处理输入光
-                if '+' in input_part:  # SFG模式：两个输入光
-                    input_beams = input_part.split('+')
-                    for beam in input_beams:
-                        wl_match = re.search(r'\((\d+)nm\)', beam)
-                        if wl_match:
-                            wavelengths_list.append(int(wl_match.group(1)))
-                else:  # SHG模式：一个输入光（两束相同）
-                    wl_match = re.search(r'\((\d+)nm\)', input_part)
-                    if wl_match:
-                        wavelength = int(wl_match.group(1))
-                        wavelengths_list.append(wavelength)
-                        wavelengths_list.append(wavelength)
-                
-                # 处理输出光（去除Type-I/Type-II后缀）
-                output_clean = output_part.split('(Type')[0].strip() if '(Type' in output_part else output_part
-                wl_match = re.search(r'\((\d+)nm\)', output_clean)
-                if wl_match:
-                    wavelengths_list.append(int(wl_match.group(1)))
-                
-                print(f"DEBUG: 从mode提取的波长列表 = {wavelengths_list}")
-                
-                # === 从walkoff_str提取偏振和走离角 ===
-                beams = walkoff_str.split('|')
-                
-                # 构建E光数据列表，匹配波长和走离角
-                e_wave_data = []  # [(wavelength_nm, walkoff_deg), ...]
-                
-                for idx, beam_str in enumerate(beams):
-                    beam_str = beam_str.strip()
-                    # 检查是否为E光
-                    if '𝐄' in beam_str:
-                        # 提取走离角
-                        match = re.search(r'([+-]?\d+\.\d+)°', beam_str)
-                        if match and idx < len(wavelengths_list):
-                            walkoff_deg = float(match.group(1))
-                            wavelength = wavelengths_list[idx]
-                            e_wave_data.append((wavelength, walkoff_deg))
-                            print(f"DEBUG: 第{idx+1}个光是E光, 波长={wavelength}nm, 走离角={walkoff_deg}°")
-                
-                print(f"DEBUG: e_wave_data = {e_wave_data}")
-                
-                # 绘制 k 矢量 (波矢量) - 金黄色箭头
-                k1_label = 'k矢量'
-                fig.add_trace(go.Scatter3d(
-                    x=[0, k1_x], y=[0, k1_y], z=[0, k1_z],
-                    mode='lines',
-                    line=dict(color='gold', width=5),
-                    name=f'{k1_label} (θ={display_theta:.2f}°, φ={display_phi:.1f}°)',
-                    showlegend=True,
-                    hovertemplate=f'{k1_label}<br>θ=%.2f°<br>φ=%.1f°<extra></extra>' % (display_theta, display_phi)
-                ))
-                
-                # 使用 Cone 绘制 k 矢量箭头
-                fig.add_trace(go.Cone(
-                    x=[k1_x], y=[k1_y], z=[k1_z],
-                    u=[k1_x*0.1], v=[k1_y*0.1], w=[k1_z*0.1],
-                    colorscale=[[0, 'gold'], [1, 'gold']],
-                    showscale=False,
-                    sizemode="absolute",
-                    sizeref=0.12,
-                    name=f'{k1_label}箭头',
-                    showlegend=False
-                ))
-                
-                # 在k矢量旁边添加标注（放在更外侧）
-                fig.add_trace(go.Scatter3d(
-                    x=[k1_x*1], y=[k1_y*1], z=[k1_z*2],
-                    mode='text',
-                    text=['k'],
-                    textfont=dict(size=16, color='gold', family='Arial Black'),
-                    showlegend=False,
-                    hoverinfo='skip'
-                ))
-                
-                # === 绘制所有E光的S矢量 ===
-                # 为不同的S矢量使用不同的颜色
-                s_colors = ['darkorange', 'purple', 'green']
-                
-                print(f"DEBUG: 准备绘制 {len(e_wave_data)} 个E光的S矢量")
-                
-                for idx, (wavelength_nm, walkoff_deg) in enumerate(e_wave_data):
-                    print(f"DEBUG: 绘制第{idx+1}个S矢量: 波长={wavelength_nm}nm, 走离角={walkoff_deg}°")
-                    
-                    # 计算S矢量方向（走离角夸大3倍以便观察）
-                    exaggerated_walkoff_rad = np.deg2rad(walkoff_deg * 3)
-                    
-                    # 根据平面确定走离方向
-                    if user_config.plane in ["XZ", "YZ"]:
-                        s_theta_rad = theta_rad - exaggerated_walkoff_rad
-                        s_x = vector_length * np.sin(s_theta_rad) * np.cos(phi_rad)
-                        s_y = vector_length * np.sin(s_theta_rad) * np.sin(phi_rad)
-                        s_z = vector_length * np.cos(s_theta_rad)
-                    else:  # XY平面
-                        s_phi_rad = phi_rad - exaggerated_walkoff_rad
-                        s_x = vector_length * np.sin(theta_rad) * np.cos(s_phi_rad)
-                        s_y = vector_length * np.sin(theta_rad) * np.sin(s_phi_rad)
-                        s_z = vector_length * np.cos(theta_rad)
-                    
-                    # 选择颜色
-                    color = s_colors[idx % len(s_colors)]
-                    
-                    # 绘制S矢量线条
-                    s_label = f'S ({wavelength_nm:.0f})'
-                    fig.add_trace(go.Scatter3d(
-                        x=[0, s_x], y=[0, s_y], z=[0, s_z],
-                        mode='lines',
-                        line=dict(color=color, width=5),
-                        name=s_label,
-                        showlegend=True,
-                        hovertemplate=f'{s_label}<br>实际走离角={walkoff_deg:.4f}°<extra></extra>'
-                    ))
-                    
-                    # 绘制S矢量箭头
-                    fig.add_trace(go.Cone(
-                        x=[s_x], y=[s_y], z=[s_z],
-                        u=[s_x*0.1], v=[s_y*0.1], w=[s_z*0.1],
-                        colorscale=[[0, color], [1, color]],
-                        showscale=False,
-                        sizemode="absolute",
-                        sizeref=0.12,
-                        name=f'{s_label}箭头',
-                        showlegend=False
-                    ))
-                    
-                    # 在S矢量旁边添加标注（都放在内侧但错开）
-                    s_text = f'S\n({wavelength_nm:.0f})'
-                    label_distance = 1.05 + idx * 0.05  # 每个S矢量的标注距离稍微递增
-                    fig.add_trace(go.Scatter3d(
-                        x=[s_x*label_distance], y=[s_y*label_distance], z=[s_z*label_distance],
-                        mode='text',
-                        text=[s_text],
-                        textfont=dict(size=12, color=color, family='Arial Black'),
-                        showlegend=False,
-                        hoverinfo='skip'
-                    ))
-            # endregion
-                
-            # region 4. 添加角度标注 (走离角、theta角、phi角)
-                # === 用弧线标注所有E光的走离角（k矢量和S矢量之间的角度）===
-                print(f"DEBUG: 准备绘制 {len(e_wave_data)} 个走离角弧线")
-                
-                for idx, (wavelength_nm, walkoff_deg) in enumerate(e_wave_data):
-                    print(f"DEBUG: 绘制第{idx+1}个走离角弧线: 波长={wavelength_nm}nm, 走离角={walkoff_deg}°")
-                    
-                    # 重新计算该E光的S矢量位置
-                    exaggerated_walkoff_rad = np.deg2rad(walkoff_deg * 3)
-                    
-                    if user_config.plane in ["XZ", "YZ"]:
-                        s_theta_rad = theta_rad - exaggerated_walkoff_rad
-                        s_x = vector_length * np.sin(s_theta_rad) * np.cos(phi_rad)
-                        s_y = vector_length * np.sin(s_theta_rad) * np.sin(phi_rad)
-                        s_z = vector_length * np.cos(s_theta_rad)
-                    else:
-                        s_phi_rad = phi_rad - exaggerated_walkoff_rad
-                        s_x = vector_length * np.sin(theta_rad) * np.cos(s_phi_rad)
-                        s_y = vector_length * np.sin(theta_rad) * np.sin(s_phi_rad)
-                        s_z = vector_length * np.cos(theta_rad)
-                    
-                    # 归一化k和S方向
-                    k_norm = np.array([k1_x, k1_y, k1_z]) / np.linalg.norm([k1_x, k1_y, k1_z])
-                    s_norm = np.array([s_x, s_y, s_z]) / np.linalg.norm([s_x, s_y, s_z])
-                    
-                    # 计算从k到S的弧线（使用球面线性插值）
-                    # 为不同的E光使用不同的弧线半径和颜色
-                    arc_radius_base = 1.5
-                    arc_radius_walkoff = arc_radius_base - idx * 0.2  # 每个E光的弧线半径递减
-                    n_points_walkoff = 25
-                    color = s_colors[idx % len(s_colors)]
-                    
-                    # 使用球面线性插值生成k到S之间的弧线点
-                    walkoff_arc_x = []
-                    walkoff_arc_y = []
-                    walkoff_arc_z = []
-                    
-                    for i in range(n_points_walkoff):
-                        t = i / (n_points_walkoff - 1)
-                        # 球面线性插值 (slerp)
-                        theta_interp = np.arccos(np.clip(np.dot(k_norm, s_norm), -1, 1))
-                        if theta_interp > 1e-6:  # 避免除零
-                            sin_theta = np.sin(theta_interp)
-                            a = np.sin((1 - t) * theta_interp) / sin_theta
-                            b = np.sin(t * theta_interp) / sin_theta
-                            interp_direction = a * k_norm + b * s_norm
-                        else:
-                            interp_direction = k_norm
-                        
-                        # 归一化并缩放到弧线半径
-                        interp_direction = interp_direction / np.linalg.norm(interp_direction)
-                        walkoff_arc_x.append(arc_radius_walkoff * interp_direction[0])
-                        walkoff_arc_y.append(arc_radius_walkoff * interp_direction[1])
-                        walkoff_arc_z.append(arc_radius_walkoff * interp_direction[2])
-                    
-                    # 绘制弧线
-                    fig.add_trace(go.Scatter3d(
-                        x=walkoff_arc_x, y=walkoff_arc_y, z=walkoff_arc_z,
-                        mode='lines',
-                        line=dict(color=color, width=3),
-                        name=f'走离角弧线({wavelength_nm:.0f}nm)',
-                        showlegend=False,
-                        hoverinfo='skip'
-                    ))
-                    
-                    # 走离角标注文字位置（弧线中点）
-                    mid_direction = (k_norm + s_norm) / 2
-                    mid_direction = mid_direction / np.linalg.norm(mid_direction)
-                    text_x = mid_direction[0] * (arc_radius_walkoff + 0.3)
-                    text_y = mid_direction[1] * (arc_radius_walkoff + 0.3)
-                    text_z = mid_direction[2] * (arc_radius_walkoff + 0.3)
-                    
-                    fig.add_trace(go.Scatter3d(
-                        x=[text_x], y=[text_y], z=[text_z],
-                        mode='text',
-                        text=[f'ρ={walkoff_deg:.4f}°'],
-                        textfont=dict(size=11, color=color, family='Arial Black'),
-                        showlegend=False,
-                        hoverinfo='skip'
-                    ))
-                
-                # === 用弧线标注theta角（Z轴与k矢量的夹角）===
-                arc_radius_theta = 0.8  # 弧线半径
-                n_points = 30  # 弧线点数
-                theta_arc = np.linspace(0, theta_rad, n_points)
-                
-                # 弧线在从Z轴到k矢量的平面上
-                arc_theta_x = arc_radius_theta * np.sin(theta_arc) * np.cos(phi_rad)
-                arc_theta_y = arc_radius_theta * np.sin(theta_arc) * np.sin(phi_rad)
-                arc_theta_z = arc_radius_theta * np.cos(theta_arc)
-                
-                fig.add_trace(go.Scatter3d(
-                    x=arc_theta_x, y=arc_theta_y, z=arc_theta_z,
-                    mode='lines',
-                    line=dict(color='blue', width=3),
-                    name='θ角弧线',
-                    showlegend=False,
-                    hoverinfo='skip'
-                ))
-                
-                # theta角度标注文字
-                theta_label_r = 1.0
-                theta_label_theta = theta_rad / 2
-                theta_label_x = theta_label_r * np.sin(theta_label_theta) * np.cos(phi_rad)
-                theta_label_y = theta_label_r * np.sin(theta_label_theta) * np.sin(phi_rad)
-                theta_label_z = theta_label_r * np.cos(theta_label_theta)
-                
-                fig.add_trace(go.Scatter3d(
-                    x=[theta_label_x], y=[theta_label_y], z=[theta_label_z],
-                    mode='text',
-                    text=[f'θ={display_theta:.2f}°'],
-                    textfont=dict(size=12, color='blue', family='Arial'),
-                    showlegend=False,
-                    hoverinfo='skip'
-                ))
-                
-                # === 绘制k矢量在XY平面上的投影 ===
-                k_proj_x = k1_x
-                k_proj_y = k1_y
-                k_proj_z = 0
-                
-                # 从k矢量到其投影的虚线
-                fig.add_trace(go.Scatter3d(
-                    x=[k1_x, k_proj_x], y=[k1_y, k_proj_y], z=[k1_z, k_proj_z],
-                    mode='lines',
-                    line=dict(color='gray', width=2, dash='dot'),
-                    name='k投影线',
-                    showlegend=False,
-                    hoverinfo='skip'
-                ))
-                
-                # k矢量在XY平面上的投影线（从原点到投影点）
-                fig.add_trace(go.Scatter3d(
-                    x=[0, k_proj_x], y=[0, k_proj_y], z=[0, 0],
-                    mode='lines',
-                    line=dict(color='purple', width=3, dash='dash'),
-                    name='k在XY平面投影',
-                    showlegend=False,
-                    hoverinfo='skip'
-                ))
-                
-                # === 用弧线标注phi角（X轴与投影的夹角，在XY平面上）===
-                arc_radius_phi = 0.6  # 弧线半径
-                phi_arc = np.linspace(0, phi_rad, n_points)
-                
-                # 弧线在XY平面上
-                arc_phi_x = arc_radius_phi * np.cos(phi_arc)
-                arc_phi_y = arc_radius_phi * np.sin(phi_arc)
-                arc_phi_z = np.zeros(n_points)  # 完全在XY平面内（z=0）
-                
-                fig.add_trace(go.Scatter3d(
-                    x=arc_phi_x, y=arc_phi_y, z=arc_phi_z,
-                    mode='lines',
-                    line=dict(color='green', width=3),
-                    name='φ角弧线',
-                    showlegend=False,
-                    hoverinfo='skip'
-                ))
-                
-                # phi角度标注文字
-                phi_label_r = 0.75
-                phi_label_phi = phi_rad / 2
-                phi_label_x = phi_label_r * np.cos(phi_label_phi)
-                phi_label_y = phi_label_r * np.sin(phi_label_phi)
-                phi_label_z = 0
-                
-                fig.add_trace(go.Scatter3d(
-                    x=[phi_label_x], y=[phi_label_y], z=[phi_label_z],
-                    mode='text',
-                    text=[f'φ={display_phi:.2f}°'],
-                    textfont=dict(size=12, color='green', family='Arial'),
-                    showlegend=False,
-                    hoverinfo='skip'
-                ))
-                # endregion
-                
-                # region 5. 绘制晶体长方体
-                # === 绘制晶体长方体（端面垂直于k矢量）===
-                # k矢量方向的单位向量
-                k_unit = np.array([k1_x, k1_y, k1_z]) / np.linalg.norm([k1_x, k1_y, k1_z])
-                
-                # 晶体参数
-                crystal_length = 2.5  # 晶体长度（沿k方向）
-                crystal_width = 0.8   # 晶体宽度
-                crystal_height = 0.8  # 晶体高度
-                
-                # 晶体中心位置（后端面在原点，所以中心在 crystal_length/2 位置）
-                crystal_center_distance = crystal_length / 2  # 晶体中心距原点的距离
-                crystal_center = k_unit * crystal_center_distance
-                
-                # 构建与k垂直的两个正交向量（作为晶体的宽度和高度方向）
-                # 选择一个不与k平行的向量
-                if abs(k_unit[2]) < 0.9:
-                    v1 = np.array([0, 0, 1])
-                else:
-                    v1 = np.array([1, 0, 0])
-                
-                # 通过叉乘得到两个正交向量
-                v2 = np.cross(k_unit, v1)
-                v2 = v2 / np.linalg.norm(v2)  # 归一化
-                v3 = np.cross(k_unit, v2)
-                v3 = v3 / np.linalg.norm(v3)  # 归一化
-                
-                # 定义长方体的8个顶点（相对于中心）
-                # 顶点定义：沿k方向 ±crystal_length/2，沿v2方向 ±crystal_width/2，沿v3方向 ±crystal_height/2
-                vertices = []
-                for i in [-1, 1]:
-                    for j in [-1, 1]:
-                        for k in [-1, 1]:
-                            vertex = (crystal_center + 
-                                    i * (crystal_length / 2) * k_unit + 
-                                    j * (crystal_width / 2) * v2 + 
-                                    k * (crystal_height / 2) * v3)
-                            vertices.append(vertex)
-                
-                vertices = np.array(vertices)
-                
-                # 定义长方体的12条边（连接顶点）
-                edges = [
-                    [0, 1], [2, 3], [4, 5], [6, 7],  # 平行于k的边
-                    [0, 2], [1, 3], [4, 6], [5, 7],  # 平行于v2的边
-                    [0, 4], [1, 5], [2, 6], [3, 7]   # 平行于v3的边
-                ]
-                
-                # 绘制长方体的边框
-                for edge in edges:
-                    v_start = vertices[edge[0]]
-                    v_end = vertices[edge[1]]
-                    fig.add_trace(go.Scatter3d(
-                        x=[v_start[0], v_end[0]],
-                        y=[v_start[1], v_end[1]],
-                        z=[v_start[2], v_end[2]],
-                        mode='lines',
-                        line=dict(color='cyan', width=3),
-                        showlegend=False,
-                        hoverinfo='skip'
-                    ))
-                
-                # 绘制晶体的两个端面（用半透明平面）
-                # 前端面（靠近k矢量方向）
-                front_center = crystal_center + (crystal_length / 2) * k_unit
-                # 后端面（远离k矢量方向）
-                back_center = crystal_center - (crystal_length / 2) * k_unit
-                
-                # 创建端面的网格点
-                face_u = np.linspace(-crystal_width/2, crystal_width/2, 5)
-                face_v = np.linspace(-crystal_height/2, crystal_height/2, 5)
-                face_u, face_v = np.meshgrid(face_u, face_v)
-                
-                # 前端面
-                front_face_x = front_center[0] + face_u * v2[0] + face_v * v3[0]
-                front_face_y = front_center[1] + face_u * v2[1] + face_v * v3[1]
-                front_face_z = front_center[2] + face_u * v2[2] + face_v * v3[2]
-                
-                fig.add_trace(go.Surface(
-                    x=front_face_x, y=front_face_y, z=front_face_z,
-                    colorscale=[[0, 'rgba(0, 255, 255, 0.3)'], [1, 'rgba(0, 255, 255, 0.3)']],
-                    showscale=False,
-                    opacity=0.3,
-                    name='晶体前端面',
-                    hoverinfo='skip',
-                    contours={"x": {"show": False}, "y": {"show": False}, "z": {"show": False}}
-                ))
-                
-                # 后端面
-                back_face_x = back_center[0] + face_u * v2[0] + face_v * v3[0]
-                back_face_y = back_center[1] + face_u * v2[1] + face_v * v3[1]
-                back_face_z = back_center[2] + face_u * v2[2] + face_v * v3[2]
-                
-                fig.add_trace(go.Surface(
-                    x=back_face_x, y=back_face_y, z=back_face_z,
-                    colorscale=[[0, 'rgba(0, 255, 255, 0.3)'], [1, 'rgba(0, 255, 255, 0.3)']],
-                    showscale=False,
-                    opacity=0.3,
-                    name='晶体后端面',
-                    hoverinfo='skip',
-                    contours={"x": {"show": False}, "y": {"show": False}, "z": {"show": False}}
-                ))
-                # endregion
-                
-                # region 6. 绘制截面椭圆
-                # === 绘制垂直于k矢量的截面与折射率椭球的交线（椭圆）===
-                # 截面位置在原点（晶体后端面）
-                cross_section_center = np.array([0.0, 0.0, 0.0])
-                
-                # 在截面上绘制折射率椭球的交线（椭圆）
-                n_ellipse_points = 150
-                angles = np.linspace(0, 2*np.pi, n_ellipse_points)
-                
-                # 绘制输入光和输出光的椭圆（两者对比）
-                ellipses_to_draw = []
-                
-                # SHG模式：输入光1使用红色
-                if user_config.process_type == 'SHG':
-                    input1_color = 'rgba(255, 80, 80, 0.4)'
-                    ellipses_to_draw.append((f'{user_config.wavelength1_nm:.0f}', scale_w1_x, scale_w1_y, scale_w1_z, input1_color, 6))
-                
-                # SFG模式：根据波长判断颜色
-                elif user_config.process_type == 'SFG':
-                    # 输入光1的颜色
-                    if user_config.wavelength1_nm < user_config.wavelength2_nm:
-                        input1_color = 'rgba(255, 215, 0, 0.4)'  # 短波长 - 黄色
-                        input2_color = 'rgba(255, 80, 80, 0.4)'   # 长波长 - 红色
-                    else:
-                        input1_color = 'rgba(255, 80, 80, 0.4)'   # 长波长 - 红色
-                        input2_color = 'rgba(255, 215, 0, 0.4)'  # 短波长 - 黄色
-                    
-                    ellipses_to_draw.append((f'{user_config.wavelength1_nm:.0f}', scale_w1_x, scale_w1_y, scale_w1_z, input1_color, 6))
-                    ellipses_to_draw.append((f'{user_config.wavelength2_nm:.0f}', scale_w2_x, scale_w2_y, scale_w2_z, input2_color, 6))
-                
-                # 输出光使用蓝色
-                ellipses_to_draw.append((f'{user_config.wavelength_out_nm:.0f}', scale_out_x, scale_out_y, scale_out_z, 'rgba(50, 100, 255, 0.4)', 6))
-                
-                for label, scale_x, scale_y, scale_z, color, width in ellipses_to_draw:
-                    # 计算椭圆上的点
-                    # 使用缩放后的椭球尺寸: (x/scale_x)^2 + (y/scale_y)^2 + (z/scale_z)^2 = 1
-                    # 垂直于k的平面通过原点，法向量为k_unit
-                    
-                    ellipse_points = []
-                    radii = []  # 存储每个方向的半径值
-                    for angle in angles:
-                        # 在垂直于k的平面上选择一个方向
-                        direction_in_plane = np.cos(angle) * v2 + np.sin(angle) * v3
-                        
-                        # 沿着这个方向找到椭球表面的点
-                        # 参数方程: P = t * direction_in_plane
-                        # 代入椭球方程求t: (t*dx/scale_x)^2 + (t*dy/scale_y)^2 + (t*dz/scale_z)^2 = 1
-                        dx, dy, dz = direction_in_plane
-                        inv_n_squared = (dx/scale_x)**2 + (dy/scale_y)**2 + (dz/scale_z)**2
-                        
-                        if inv_n_squared > 1e-10:  # 避免除零
-                            t = 1.0 / np.sqrt(inv_n_squared)
-                            point = cross_section_center + t * direction_in_plane
-                            ellipse_points.append(point)
-                            radii.append(t)
-                    
-                    if len(ellipse_points) > 0:
-                        ellipse_points = np.array(ellipse_points)
-                        radii = np.array(radii)
-                        
-                        # 绘制椭圆交线
-                        fig.add_trace(go.Scatter3d(
-                            x=ellipse_points[:, 0],
-                            y=ellipse_points[:, 1],
-                            z=ellipse_points[:, 2],
-                            mode='lines',
-                            line=dict(color=color, width=width),
-                            name=f'{label}截面椭圆',
-                            showlegend=True
-                        ))
-                        
-                        # === 找到长轴和短轴 ===
-                        max_radius_idx = np.argmax(radii)
-                        min_radius_idx = np.argmin(radii)
-                        
-                        major_radius = radii[max_radius_idx]
-                        minor_radius = radii[min_radius_idx]
-                        
-                        major_angle = angles[max_radius_idx]
-                        minor_angle = angles[min_radius_idx]
-                        
-                        # 长轴方向
-                        major_direction = np.cos(major_angle) * v2 + np.sin(major_angle) * v3
-                        major_point = cross_section_center + major_radius * major_direction
-                        major_point_neg = cross_section_center - major_radius * major_direction
-                        
-                        # 短轴方向
-                        minor_direction = np.cos(minor_angle) * v2 + np.sin(minor_angle) * v3
-                        minor_point = cross_section_center + minor_radius * minor_direction
-                        minor_point_neg = cross_section_center - minor_radius * minor_direction
-                        
-                        # 绘制长轴虚线
-                        # 根据波长选择颜色（label现在是波长）
-                        wavelength_val = float(label.replace('nm', ''))
-                        if user_config.process_type == 'SHG':
-                            # SHG: 基频光用红色，倍频光用蓝色
-                            axis_color = 'rgb(255, 80, 80)' if wavelength_val == user_config.wavelength1_nm else 'rgb(50, 100, 255)'
-                        else:  # SFG
-                            # 输入光1的颜色
-                            if wavelength_val == user_config.wavelength1_nm:
-                                axis_color = 'rgb(255, 215, 0)' if user_config.wavelength1_nm < user_config.wavelength2_nm else 'rgb(255, 80, 80)'
-                            elif wavelength_val == user_config.wavelength2_nm:
-                                axis_color = 'rgb(255, 215, 0)' if user_config.wavelength2_nm < user_config.wavelength1_nm else 'rgb(255, 80, 80)'
-                            else:  # 和频光用蓝色
-                                axis_color = 'rgb(50, 100, 255)'
-                        
-                        fig.add_trace(go.Scatter3d(
-                            x=[major_point_neg[0], major_point[0]],
-                            y=[major_point_neg[1], major_point[1]],
-                            z=[major_point_neg[2], major_point[2]],
-                            mode='lines',
-                            line=dict(color=axis_color, width=3, dash='dash'),
-                            name=f'{label}长轴',
-                            showlegend=False,
-                            hoverinfo='skip'
-                        ))
-                        
-                        # 绘制短轴虚线
-                        fig.add_trace(go.Scatter3d(
-                            x=[minor_point_neg[0], minor_point[0]],
-                            y=[minor_point_neg[1], minor_point[1]],
-                            z=[minor_point_neg[2], minor_point[2]],
-                            mode='lines',
-                            line=dict(color=axis_color, width=3, dash='dash'),
-                            name=f'{label}短轴',
-                            showlegend=False,
-                            hoverinfo='skip'
-                        ))
-                        
-                        # 标注长轴值 - 根据不同光源分散标注位置
-                        # 波长值已经在上面解析
-                        if wavelength_val == user_config.wavelength1_nm:
-                            offset_a = v2 * 0.3
-                        elif wavelength_val == user_config.wavelength2_nm:
-                            offset_a = -v2 * 0.3
-                        else:  # 输出光/倍频光
-                            offset_a = v3 * 0.3
-                        
-                        major_label_pos = major_point * 1.15
-                        fig.add_trace(go.Scatter3d(
-                            x=[major_label_pos[0] + offset_a[0]],
-                            y=[major_label_pos[1] + offset_a[1]],
-                            z=[major_label_pos[2] + offset_a[2]],
-                            mode='text',
-                            text=[f'a={major_radius:.3f}'],
-                            textfont=dict(size=10, color=axis_color, family='Arial'),
-                            showlegend=False,
-                            hoverinfo='skip'
-                        ))
-                        
-                        # 标注短轴值 - 使用相应的偏移方向
-                        if wavelength_val == user_config.wavelength1_nm:
-                            offset_b = v2 * 0.3
-                        elif wavelength_val == user_config.wavelength2_nm:
-                            offset_b = -v2 * 0.3
-                        else:  # 输出光/倍频光
-                            offset_b = v3 * 0.3
-                        
-                        minor_label_pos = minor_point_neg * 1.05
-                        fig.add_trace(go.Scatter3d(
-                            x=[minor_label_pos[0] + offset_b[0]],
-                            y=[minor_label_pos[1] + offset_b[1]],
-                            z=[minor_label_pos[2] + offset_b[2]],
-                            mode='text',
-                            text=[f'b={minor_radius:.3f}'],
-                            textfont=dict(size=10, color=axis_color, family='Arial'),
-                            showlegend=False,
-                            hoverinfo='skip'
-                        ))
+                # 获取输入光2的折射率（SFG需要）
+                n_x_w2 = n_y_w2 = n_z_w2 = None
+                if user_config.process_type == 'SFG':
+                    indices_w2 = user_config.get_indices(user_config.wavelength2_nm)
+                    n_x_w2 = indices_w2['n_x']
+                    n_y_w2 = indices_w2['n_y']
+                    n_z_w2 = indices_w2['n_z']
+
+                # 获取输出光的折射率
+                indices_out = user_config.get_indices(user_config.wavelength_out_nm)
+                n_x_out = indices_out['n_x']
+                n_y_out = indices_out['n_y']
+                n_z_out = indices_out['n_z']
                 # endregion
 
-            # region 7. 设置图形布局和保存
-
-            fig.update_layout(
-                scene = dict(
-                    xaxis_title='X',
-                    yaxis_title='Y',
-                    zaxis_title='Z',
-                    aspectmode='data',  # 保证坐标轴比例一致
-                    camera=dict(
-                        eye=dict(x=1.5, y=1.5, z=1.5)  # 设置视角
-                    ),
-                    bgcolor='rgba(240, 240, 250, 0.9)'  # 浅色背景
-                ),
-                width=900,
-                height=700,
-                margin=dict(r=20, l=10, b=10, t=50),
-                title=dict(
-                    text=f'{user_config.crystal_name} 晶体折射率椭球示意图<br><sub>相位匹配模式: {target_mode_3d} | X,Y,Z为晶体光学主轴</sub>',
-                    x=0.5,
-                    xanchor='center',
-                    font=dict(size=18)
-                ),
-                showlegend=True,
-                legend=dict(x=0.7, y=0.95)
-            )
-            
-            # 保存到session_state
-            st.session_state['3d_fig'] = fig
-            st.session_state['3d_config'] = {
-                'n_x_w': n_x_w1, 'n_y_w': n_y_w1, 'n_z_w': n_z_w1,
-                'n_x_out': n_x_out, 'n_y_out': n_y_out, 'n_z_out': n_z_out,
-                'wavelength1_nm': user_config.wavelength1_nm,
-                'wavelength_out_nm': user_config.wavelength_out_nm,
-                'process_type': user_config.process_type
-            }
+                fig = build_3d_figure(
+                    target_mode_3d, user_config.crystal_name, user_config.process_type, user_config.plane, phi,
+                    theta_critical_3d, mode_meta_dict[target_mode_3d]['e_beams'],
+                    user_config.wavelength1_nm, user_config.wavelength2_nm, user_config.wavelength_out_nm,
+                    (n_x_w1, n_y_w1, n_z_w1), (n_x_w2, n_y_w2, n_z_w2), (n_x_out, n_y_out, n_z_out)
+                )
+
+                # 保存到session_state
+                st.session_state['3d_fig'] = fig
+                st.session_state['3d_state_key'] = (target_mode_3d, phi, config_args)
+                st.session_state['3d_config'] = {
+                    'n_x_w': n_x_w1, 'n_y_w': n_y_w1, 'n_z_w': n_z_w1,
+                    'n_x_out': n_x_out, 'n_y_out': n_y_out, 'n_z_out': n_z_out,
+                    'wavelength1_nm': user_config.wavelength1_nm,
+                    'wavelength_out_nm': user_config.wavelength_out_nm,
+                    'process_type': user_config.process_type
+                }
             
-            # SFG模式：额外保存第二束光信息
-            if user_config.process_type == 'SFG':
-                st.session_state['3d_config'].update({
-                    'n_x_w1': n_x_w1, 'n_y_w1': n_y_w1, 'n_z_w1': n_z_w1,
-                    'n_x_w2': n_x_w2, 'n_y_w2': n_y_w2, 'n_z_w2': n_z_w2,
-                    'wavelength2_nm': user_config.wavelength2_nm
-                })
-            # endregion
+                # SFG模式：额外保存第二束光信息
+                if user_config.process_type == 'SFG':
+                    st.session_state['3d_config'].update({
+                        'n_x_w1': n_x_w1, 'n_y_w1': n_y_w1, 'n_z_w1': n_z_w1,
+                        'n_x_w2': n_x_w2, 'n_y_w2': n_y_w2, 'n_z_w2': n_z_w2,
+                        'wavelength2_nm': user_config.wavelength2_nm
+                    })
+                # endregion
         
         # region 8. 显示保存的3D图
         if '3d_fig' in st.session_state:
@@ -1476,41 +1319,21 @@ if st.session_state.has_run:
             else:
                 col1, col2, col3 = st.columns(3)
                 
-                # 确定哪束光更短
-                if config['wavelength2_nm'] < config['wavelength1_nm']:
-                    # λ2更短
-                    with col1:
-                        st.error(f"**输入光1 ({config['wavelength1_nm']:.1f} nm)**")
-                        st.write(f"n_x = {config['n_x_w1']:.5f}")
-                        st.write(f"n_y = {config['n_y_w1']:.5f}")
-                        st.write(f"n_z = {config['n_z_w1']:.5f}")
-                    with col2:
-                        st.warning(f"**输入光2 ({config['wavelength2_nm']:.1f} nm)**")
-                        st.write(f"n_x = {config['n_x_w2']:.5f}")
-                        st.write(f"n_y = {config['n_y_w2']:.5f}")
-                        st.write(f"n_z = {config['n_z_w2']:.5f}")
-                    with col3:
-                        st.info(f"**输出光 ({config['wavelength_out_nm']:.1f} nm)**")
-                        st.write(f"n_x = {config['n_x_out']:.5f}")
-                        st.write(f"n_y = {config['n_y_out']:.5f}")
-                        st.write(f"n_z = {config['n_z_out']:.5f}")
-                else:
-                    # λ1更短
-                    with col1:
-                        st.error(f"**输入光2 ({config['wavelength2_nm']:.1f} nm)**")
-                        st.write(f"n_x = {config['n_x_w2']:.5f}")
-                        st.write(f"n_y = {config['n_y_w2']:.5f}")
-                        st.write(f"n_z = {config['n_z_w2']:.5f}")
-                    with col2:
-                        st.warning(f"**输入光1 ({config['wavelength1_nm']:.1f} nm)**")
-                        st.write(f"n_x = {config['n_x_w1']:.5f}")
-                        st.write(f"n_y = {config['n_y_w1']:.5f}")
-                        st.write(f"n_z = {config['n_z_w1']:.5f}")
-                    with col3:
-                        st.info(f"**输出光 ({config['wavelength_out_nm']:.1f} nm)**")
-                        st.write(f"n_x = {config['n_x_out']:.5f}")
-                        st.write(f"n_y = {config['n_y_out']:.5f}")
-                        st.write(f"n_z = {config['n_z_out']:.5f}")
+                # 长波长输入光在左（红色），短波长输入光在中间（黄色），输出光在右（蓝色）
+                beam1 = ('输入光1', config['wavelength1_nm'], 'w1')
+                beam2 = ('输入光2', config['wavelength2_nm'], 'w2')
+                long_beam, short_beam = (beam1, beam2) if config['wavelength2_nm'] < config['wavelength1_nm'] else (beam2, beam1)
+                columns = (
+                    (col1, st.error, long_beam),
+                    (col2, st.warning, short_beam),
+                    (col3, st.info, ('输出光', config['wavelength_out_nm'], 'out')),
+                )
+                for col, header, (name, wavelength_nm_col, suffix) in columns:
+                    with col:
+                        header(f"**{name} ({wavelength_nm_col:.1f} nm)**")
+                        st.write(f"n_x = {config['n_x_' + suffix]:.5f}")
+                        st.write(f"n_y = {config['n_y_' + suffix]:.5f}")
+                        st.write(f"n_z = {config['n_z_' + suffix]:.5f}")
 
          # endregion
 
@@ -1558,27 +1381,33 @@ if st.session_state.has_run:
             if st.button("一键计算所有带宽", key="btn_calc_all", type="primary", use_container_width=True):
                 with st.spinner("正在计算所有带宽..."):
                     try:
+                        # 三种带宽分别按各自的扫描设置缓存，只改了其中一项设置时其余两项直接复用
+                        theta_bandwidth = theta_dict[target_mode_bandwidth]
+                        
                         # 计算角度带宽
-                        fig_ang, val_mrad, val_deg = simulation.acceptance_angle(
-                            theta_dict, target_mode_bandwidth, step=scan_step_angle, res=scan_res_angle
+                        png_ang, val_mrad, val_deg = acceptance_bandwidth(
+                            'angle', config_args, target_mode_bandwidth, theta_bandwidth,
+                            scan_step_angle, scan_res_angle
                         )
-                        st.session_state['res_angle_fig'] = fig_ang
+                        st.session_state['res_angle_png'] = png_ang
                         st.session_state['res_angle_val_mrad'] = val_mrad
                         st.session_state['res_angle_val_deg'] = val_deg
                         
                         # 计算波长带宽
-                        fig_wav, val_nm, val_ghz = simulation.acceptance_wavelength(
-                            theta_dict, target_mode_bandwidth, step=scan_step_wave, res=scan_res_wave
+                        png_wav, val_nm, val_ghz = acceptance_bandwidth(
+                            'wavelength', config_args, target_mode_bandwidth, theta_bandwidth,
+                            scan_step_wave, scan_res_wave
                         )
-                        st.session_state['res_wave_fig'] = fig_wav
+                        st.session_state['res_wave_png'] = png_wav
                         st.session_state['res_wave_val_nm'] = val_nm
                         st.session_state['res_wave_val_ghz'] = val_ghz
                         
                         # 计算温度带宽
-                        fig_temp, val_temp = simulation.acceptance_temperature(
-                            theta_dict, target_mode_bandwidth, step=scan_step_temp, res=scan_res_temp
+                        png_temp, val_temp = acceptance_bandwidth(
+                            'temperature', config_args, target_mode_bandwidth, theta_bandwidth,
+                            scan_step_temp, scan_res_temp
                         )
-                        st.session_state['res_temp_fig'] = fig_temp
+                        st.session_state['res_temp_png'] = png_temp
                         st.session_state['res_temp_val_temp'] = val_temp
                         
                         st.session_state['all_bandwidths_calculated'] = True
@@ -1593,20 +1422,20 @@ if st.session_state.has_run:
                 col_all1, col_all2, col_all3 = st.columns(3)
                 
                 with col_all1:
-                    if 'res_angle_fig' in st.session_state:
-                        st.pyplot(st.session_state['res_angle_fig'])
+                    if 'res_angle_png' in st.session_state:
+                        st.image(st.session_state['res_angle_png'])
                         st.metric("角度带宽 (FWHM)", f"{st.session_state['res_angle_val_mrad']:.4f} mrad·cm")
                         st.caption(f"约 {st.session_state['res_angle_val_deg']:.4f}°·cm")
                 
                 with col_all2:
-                    if 'res_wave_fig' in st.session_state:
-                        st.pyplot(st.session_state['res_wave_fig'])
+                    if 'res_wave_png' in st.session_state:
+                        st.image(st.session_state['res_wave_png'])
                         st.metric("波长带宽 (FWHM)", f"{st.session_state['res_wave_val_nm']:.4f} nm·cm")
                         st.caption(f"频率: {st.session_state['res_wave_val_ghz']:.2f} GHz·cm")
                 
                 with col_all3:
-                    if 'res_temp_fig' in st.session_state:
-                        st.pyplot(st.session_state['res_temp_fig'])
+                    if 'res_temp_png' in st.session_state:
+                        st.image(st.session_state['res_temp_png'])
                         st.metric("温度带宽 (FWHM)", f"{st.session_state['res_temp_val_temp']:.4f} K·cm")
 
     else:
@@ -1649,6 +1478,7 @@ if st.session_state.has_run:
                     })
             
             # 展示表格
+            import pandas as pd
             df = pd.DataFrame(table_data)
             st.dataframe(
                 df, 
@@ -1705,36 +1535,47 @@ if st.session_state.has_run:
                     ang_step_bw = st.slider("步数", 100, 5000, 1000, key="ang_step_bw")
                     ang_res_bw = st.number_input("精度 (mrad)", 0.001, 1.0, 0.001, step=0.001, format="%.3f", key="ang_res_bw")
                 
-                # 需要临时修改配置的温度为匹配温度
-                original_temp = simulation.cfg.temperature
-                simulation.cfg.temperature = matching_temp
+                # 带宽分析需要在匹配温度下进行
+                # user_config被缓存并在多次rerun间共享，这里单独构建一份配置，避免修改共享对象
+                ncpm_simulation = Solver(SimulationConfig(
+                    crystal_name=crystal_name,
+                    wavelength=wavelength_nm,
+                    temperature=matching_temp,
+                    plane=plane,
+                    process_type=process_type_code,
+                    wavelength2=wavelength2_nm,
+                    sellmeier_source=sellmeier_source
+                ))
                 
                 # 一键计算所有带宽按钮
                 if st.button("一键计算所有带宽", key="btn_calc_all_ncpm", type="primary", use_container_width=True):
+                    import matplotlib.pyplot as plt
                     with st.spinner("正在计算所有带宽..."):
                         try:
                             fake_theta_dict = {selected_mode_for_bandwidth: 0.0}
                             
                             # 计算温度带宽
-                            fig_temp, acc_temp = simulation.acceptance_temperature(
+                            fig_temp, acc_temp = ncpm_simulation.acceptance_temperature(
                                 fake_theta_dict, selected_mode_for_bandwidth, 
                                 step=temp_step_bw, res=temp_res_bw
                             )
-                            st.session_state['ncpm_res_temp_fig'] = fig_temp
+                            st.session_state['ncpm_res_temp_png'] = figure_png(fig_temp)
+                            plt.close(fig_temp)
                             st.session_state['ncpm_res_temp_val'] = acc_temp
                             
                             # 计算波长带宽
-                            fig_wl, acc_wl, acc_bw = simulation.acceptance_wavelength(
+                            fig_wl, acc_wl, acc_bw = ncpm_simulation.acceptance_wavelength(
                                 fake_theta_dict, selected_mode_for_bandwidth,
                                 step=wl_step_bw, res=wl_res_bw
                             )
-                            st.session_state['ncpm_res_wl_fig'] = fig_wl
+                            st.session_state['ncpm_res_wl_png'] = figure_png(fig_wl)
+                            plt.close(fig_wl)
                             st.session_state['ncpm_res_wl_val'] = acc_wl
                             st.session_state['ncpm_res_wl_bw'] = acc_bw
                             
                             # 计算角度带宽（俯仰和偏航两个方向）
                             # 需要将XYZ模式转换为OE模式，因为XYZ模式不考虑角度变化
-                            original_plane = simulation.cfg.plane
+                            original_plane = ncpm_simulation.cfg.plane
                             
                             # 从XYZ模式中提取输入和输出的偏振方向
                             mode_parts = selected_mode_for_bandwidth.split('→')
@@ -1758,112 +1599,111 @@ if st.session_state.has_run:
                             
                             # 分别计算两个平面的角度带宽
                             angle_results = {}
+                            # 再次点击时复用上次的角度带宽图（点击"运行"会清除）
+                            previous_angle_results = st.session_state.get('ncpm_res_ang_results', {})
+                            # 按 (输入是否O光, 输出是否O光) 缓存重建的OE模式字符串，两个平面O/E分配相同时直接复用
+                            oe_modes = {}
+                            
+                            # 偏移角（弧度），两个平面共用；theta只依赖|offset|时（关于offset=0对称）只需用到 offset ≤ 0 的前半段
+                            angle_offset = np.arange(-ang_step_bw, ang_step_bw) * (ang_res_bw * 1e-3)
+                            abs_offset_half = np.abs(angle_offset[:ang_step_bw + 1])
                             
                             for plane in planes:
                                 # 设置平面并更新对应的轴配置
-                                simulation.cfg.plane = plane
-                                simulation.key_static, simulation.key_cos, simulation.key_sin = simulation.plane_config[plane]
+                                ncpm_simulation.cfg.plane = plane
+                                ncpm_simulation.key_static, ncpm_simulation.key_cos, ncpm_simulation.key_sin = ncpm_simulation.plane_config[plane]
                                 
                                 # 根据平面确定哪个偏振方向是O光（垂直于平面）、哪个是E光（在平面内）
-                                # plane_config: XY→('n_z',n_x,n_y), XZ→('n_y',n_z,n_x), YZ→('n_x',n_z,n_y)
-                                # key_static是垂直于平面的轴（O光方向）
-                                plane_to_static_axis = {
-                                    'XY': '𝐙',
-                                    'XZ': '𝐘',
-                                    'YZ': '𝐗'
-                                }
-                                o_light_axis = plane_to_static_axis[plane] # 获取O光对应的轴
+                                o_light_axis = PLANE_STATIC_AXIS[plane]
                                 
                                 # 确定输入光的偏振类型
                                 input_is_o = (input_pol == o_light_axis)
                                 # 确定输出光的偏振类型
                                 output_is_o = (output_pol == o_light_axis)
                                 
-                                # 构建该平面对应的OE模式
-                                input_oe = '𝐎' if input_is_o else '𝐄'
-                                output_oe = '𝐎' if output_is_o else '𝐄'
-                                
-                                # 重建OE模式字符串（保留波长信息）
-                                oe_mode = selected_mode_for_bandwidth.replace(input_pol, input_oe).replace(output_pol, output_oe)
-
-                                # 角度带宽计算：根据平面和传播轴确定theta的计算方式
-                                angle_offset = np.arange(-ang_step_bw, ang_step_bw) * ang_res_bw * 1e-3  # 偏移角（弧度）
-                                
-                                # 确定theta的基准值和计算方式
-                                # Z轴传播时：offset为theta，XZ平面phi为0，YZ平面phi为pi/2
-                                # Y轴传播时：XY平面时phi为pi/2 - offset，YZ平面时theta为pi/2 - offset，phi为pi/2；
-                                # X轴传播时：XY平面时phi为offset，XZ平面时theta为 pi/2 - offset，phi为0；
-                                if fixed_axis == 'X':
-                                    # X轴传播
-                                    if plane == 'XY':
-                                        # XY平面：phi = offset
-                                        theta_axis = np.abs(angle_offset)
-                                    elif plane == 'XZ':
-                                        # XZ平面：theta = pi/2 - offset
-                                        theta_axis = np.pi / 2 - angle_offset
-                                elif fixed_axis == 'Y':
-                                    # Y轴传播
-                                    if plane == 'XY':
-                                        # XY平面：phi = pi/2 - offset
-                                        theta_axis = np.pi/2 - np.abs(angle_offset)
-                                    elif plane == 'YZ':
-                                        # YZ平面：theta = pi/2 - offset
-                                        theta_axis = np.pi / 2 - angle_offset
+                                # 构建该平面对应的OE模式，重建OE模式字符串（保留波长信息）
+                                oe_key = (input_is_o, output_is_o)
+                                if oe_key not in oe_modes:
+                                    input_oe = '𝐎' if input_is_o else '𝐄'
+                                    output_oe = '𝐎' if output_is_o else '𝐄'
+                                    oe_modes[oe_key] = selected_mode_for_bandwidth.replace(input_pol, input_oe).replace(output_pol, output_oe)
+                                oe_mode = oe_modes[oe_key]
+
+                                # 三束光都是O光时Δn与角度无关，效率曲线为常数：只计算一次，不必在角度轴上逐点求值
+                                if input_is_o and output_is_o:
+                                    efficiency = np.full(angle_offset.shape, ncpm_simulation.conversion_efficiency(ncpm_simulation.delta_n(oe_mode)))
                                 else:
-                                    # Z轴传播
-                                    if plane == 'XZ':
-                                        # XZ平面：theta = offset
-                                        theta_axis = np.abs(angle_offset)
-                                    elif plane == 'YZ':
-                                        # YZ平面：phi = pi/2 + offset
-                                        theta_axis = np.abs(angle_offset)
+                                    # 角度带宽计算：根据平面和传播轴确定theta的计算方式
+                                    # 确定theta的基准值和计算方式
+                                    # Z轴传播时：offset为theta，XZ平面phi为0，YZ平面phi为pi/2
+                                    # Y轴传播时：XY平面时phi为pi/2 - offset，YZ平面时theta为pi/2 - offset，phi为pi/2；
+                                    # X轴传播时：XY平面时phi为offset，XZ平面时theta为 pi/2 - offset，phi为0；
+                                    # delta_n 只通过 cos²θ、sin²θ 依赖θ，θ = ±offset 与 θ = pi/2 ± offset 的曲线都关于offset=0对称，
+                                    # 因此各平面都只需在 |offset| = step·res, ..., 0 上计算，另一半镜像得到
+                                    if fixed_axis == 'X':
+                                        # X轴传播
+                                        if plane == 'XY':
+                                            # XY平面：phi = offset
+                                            theta_half = abs_offset_half
+                                        elif plane == 'XZ':
+                                            # XZ平面：theta = pi/2 - offset
+                                            theta_half = np.pi/2 - abs_offset_half
+                                    elif fixed_axis == 'Y':
+                                        # Y轴传播
+                                        if plane == 'XY':
+                                            # XY平面：phi = pi/2 - offset
+                                            theta_half = np.pi/2 - abs_offset_half
+                                        elif plane == 'YZ':
+                                            # YZ平面：theta = pi/2 - offset
+                                            theta_half = np.pi/2 - abs_offset_half
+                                    else:
+                                        # Z轴传播
+                                        if plane == 'XZ':
+                                            # XZ平面：theta = offset
+                                            theta_half = abs_offset_half
+                                        elif plane == 'YZ':
+                                            # YZ平面：phi = pi/2 + offset
+                                            theta_half = abs_offset_half
                                 
-                                # 使用OE模式计算每个角度的delta_n
-                                delta_n_array = np.array([
-                                    simulation.delta_n(oe_mode, theta=t)
-                                    for t in theta_axis
-                                ])
-                                angle_axis = angle_offset
+                                    # 使用OE模式对半个角度轴一次性计算delta_n（delta_n对theta逐元素运算）
+                                    delta_n_half = ncpm_simulation.delta_n(oe_mode, theta=theta_half)
+                                    # offset = -step..0 直接取用，offset = 1..step-1 与 |offset| 相同的负半边镜像
+                                    delta_n_array = np.concatenate([delta_n_half, delta_n_half[-2:0:-1]])
                                 
-                                # 计算Δk = 2π/λ_out × Δn
-                                delta_k = (np.pi * 2 / simulation.cfg.wavelength_out_um) * delta_n_array
-                                
-                                # 计算效率 η(Δk) = sinc²(Δk × L/2)
-                                efficiency = (np.sinc(delta_k * 1e4 / (2 * np.pi)))**2
-                                
-                                # 绘图
-                                fig_ang, ax = plt.subplots(figsize=(10, 6))
-                                ax.plot(angle_axis * 1000, efficiency, 'r-', linewidth=1.5)
-                                ax.set_xlabel('Angle Deviation / mrad', fontsize=12)
-                                # 根据过程类型设置纵轴标题
-                                ylabel = 'SHG Efficiency' if simulation.cfg.process_type == 'SHG' else 'SFG Efficiency'
-                                ax.set_ylabel(ylabel, fontsize=12)
-                                display_mode = selected_mode_for_bandwidth.replace('𝐗', 'X').replace('𝐘', 'Y').replace('𝐙', 'Z')
-                                ax.set_title(f'Acceptance Angle Curve for {simulation.cfg.crystal_name} ({plane} plane)\n({display_mode})', fontsize=14)
-                                ax.grid(True, alpha=0.3)
-                                
-                                # 计算FWHM
-                                half_max = 0.5
-                                indices_above_half = np.where(efficiency >= half_max)[0]
+                                    # 计算效率 η(Δk) = sinc²(Δk × L/2)，Δk = 2π/λ_out × Δn
+                                    efficiency = ncpm_simulation.conversion_efficiency(delta_n_array)
+                                angle_axis = angle_offset
                                 
-                                if len(indices_above_half) > 0:
-                                    lower_index = indices_above_half[0]
-                                    upper_index = indices_above_half[-1]
-                                    acc_ang = (angle_axis[upper_index] - angle_axis[lower_index]) * 1000  # mrad
-                                    acc_ang_deg = np.rad2deg(angle_axis[upper_index] - angle_axis[lower_index])
+                                # 绘图：上次计算已为该平面建过图时直接更新曲线数据，不再重新创建Figure
+                                previous_result = previous_angle_results.get(plane)
+                                if previous_result is not None:
+                                    fig_ang, ax, line = previous_result['fig'], previous_result['ax'], previous_result['line']
+                                    line.set_data(angle_axis * 1000, efficiency)
+                                    ax.relim()
+                                    ax.autoscale_view()
                                 else:
-                                    acc_ang = np.nan
-                                    acc_ang_deg = np.nan
+                                    fig_ang, ax = ncpm_simulation.efficiency_axes('Angle Deviation / mrad')
+                                    line, = ax.plot(angle_axis * 1000, efficiency, 'r-', linewidth=1.5)
+                                display_mode = selected_mode_for_bandwidth.translate(DISPLAY_MODE_TABLE)
+                                ax.set_title(f'Acceptance Angle Curve for {ncpm_simulation.cfg.crystal_name} ({plane} plane)\n({display_mode})', fontsize=14)
+                                
+                                # 计算FWHM（半高处线性插值，没有点≥0.5时为nan）
+                                acc_ang_rad = ncpm_simulation.fwhm(angle_axis, efficiency)
+                                acc_ang = acc_ang_rad * 1000  # mrad
+                                acc_ang_deg = np.rad2deg(acc_ang_rad)
                                 
                                 angle_results[plane] = {
                                     'fig': fig_ang,
+                                    'ax': ax,
+                                    'line': line,
+                                    'png': figure_png(fig_ang),
                                     'acc_ang': acc_ang,
                                     'acc_ang_deg': acc_ang_deg
                                 }
                             
                             # 恢复原始plane配置和对应的轴
-                            simulation.cfg.plane = original_plane
-                            simulation.key_static, simulation.key_cos, simulation.key_sin = simulation.plane_config[original_plane]
+                            ncpm_simulation.cfg.plane = original_plane
+                            ncpm_simulation.key_static, ncpm_simulation.key_cos, ncpm_simulation.key_sin = ncpm_simulation.plane_config[original_plane]
                             
                             # 保存两个平面的结果
                             st.session_state['ncpm_res_ang_results'] = angle_results
@@ -1874,10 +1714,9 @@ if st.session_state.has_run:
                         except Exception as e:
                             st.error(f"带宽计算出错: {e}")
                         finally:
-                            simulation.cfg.temperature = original_temp
-                            # 确保plane也被恢复
+                            # 确保plane被恢复
                             if 'original_plane' in locals():
-                                simulation.cfg.plane = original_plane
+                                ncpm_simulation.cfg.plane = original_plane
                 
                 # 显示所有计算结果
                 if st.session_state.get('ncpm_all_calculated', False):
@@ -1888,15 +1727,15 @@ if st.session_state.has_run:
                     col_row1_1, col_row1_2 = st.columns(2)
                     
                     with col_row1_1:
-                        if 'ncpm_res_temp_fig' in st.session_state:
-                            st.pyplot(st.session_state['ncpm_res_temp_fig'])
+                        if 'ncpm_res_temp_png' in st.session_state:
+                            st.image(st.session_state['ncpm_res_temp_png'])
                             st.metric("温度带宽 (FWHM)", 
                                     f"{st.session_state['ncpm_res_temp_val']:.4f} K·cm" 
                                     if not np.isnan(st.session_state['ncpm_res_temp_val']) else "N/A")
                     
                     with col_row1_2:
-                        if 'ncpm_res_wl_fig' in st.session_state:
-                            st.pyplot(st.session_state['ncpm_res_wl_fig'])
+                        if 'ncpm_res_wl_png' in st.session_state:
+                            st.image(st.session_state['ncpm_res_wl_png'])
                             st.metric("波长带宽 (FWHM)", 
                                     f"{st.session_state['ncpm_res_wl_val']:.4f} nm·cm" 
                                     if not np.isnan(st.session_state['ncpm_res_wl_val']) else "N/A")
@@ -1914,7 +1753,7 @@ if st.session_state.has_run:
                         with col_row2_1:
                             plane = planes[0]
                             st.markdown(f"**{plane}平面**")
-                            st.pyplot(results[plane]['fig'])
+                            st.image(results[plane]['png'])
                             
                             acc_ang = results[plane]['acc_ang']
                             acc_ang_deg = results[plane]['acc_ang_deg']
@@ -1926,7 +1765,7 @@ if st.session_state.has_run:
                         with col_row2_2:
                             plane = planes[1]
                             st.markdown(f"**{plane}平面**")
-                            st.pyplot(results[plane]['fig'])
+                            st.image(results[plane]['png'])
                             
                             acc_ang = results[plane]['acc_ang']
                             acc_ang_deg = results[plane]['acc_ang_deg']
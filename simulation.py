@@ -6,12 +6,48 @@
 
 作者：陈泓鑫
 """
+import logging
+import math
+import re
 import numpy as np
 import matplotlib.pyplot as plt
 from configuration import SimulationConfig
-from scipy.optimize import fsolve
-from matplotlib.ticker import FuncFormatter
-import plotly.graph_objects as go
+from scipy.optimize import brentq
+
+logger = logging.getLogger(__name__)
+
+# 模式字符串中的波长，如 "𝐎 (1064nm) + 𝐎 (1064nm) → 𝐄 (532nm) (Type I)" 中的 1064/1064/532
+_MODE_WAVELENGTH_RE = re.compile(r'(\d+)nm')
+
+# 接受带宽计算所用的晶体长度 L = 1 cm（单位 μm），带宽结果因此以 ·cm 为单位
+CRYSTAL_LENGTH_UM = 1e4
+
+# 模式字符串中的偏振符号 -> d_eff 匹配类型中使用的ASCII字母
+POL_ASCII = {'𝐎': 'O', '𝐄': 'E'}
+
+# 图表标题中把模式字符串的Unicode粗体字符替换为普通字符（str.translate 一次完成）
+DISPLAY_MODE_TABLE = str.maketrans({'𝐎': 'O', '𝐄': 'E', '𝐗': 'X', '𝐘': 'Y', '𝐙': 'Z'})
+
+def _ne(n_cos, n_sin, theta):
+    """E光有效折射率 n_e(θ) = √[ (n_cos² * n_sin²) / (n_cos² * cos²θ + n_sin² * sin²θ) ]（推导见 Solver.ne_func）"""
+    if isinstance(theta, float) and isinstance(n_cos, float) and isinstance(n_sin, float):
+        # 标量θ（逐点扫描时）用math函数，避免NumPy ufunc在0维输入上的调度开销
+        cos_theta, sin_theta = math.cos(theta), math.sin(theta)
+        return math.sqrt(
+            (n_cos**2 * n_sin**2) /
+            (n_cos**2 * cos_theta**2 + n_sin**2 * sin_theta**2)
+        )
+    return _ne_trig(n_cos, n_sin, np.cos(theta)**2, np.sin(theta)**2)
+
+def _ne_trig(n_cos, n_sin, cos2_theta, sin2_theta):
+    """与 _ne 相同，但直接传入 cos²θ、sin²θ：同一θ数组上有多束E光时三角函数只需计算一次"""
+    n_cos2, n_sin2 = n_cos**2, n_sin**2
+    denominator = n_cos2 * cos2_theta + n_sin2 * sin2_theta
+    if not isinstance(denominator, np.ndarray) or denominator.ndim == 0:
+        return np.sqrt((n_cos2 * n_sin2) / denominator)
+    # 除法和开方在分母数组上原地完成，不再为商和结果各分配一个数组
+    np.divide(n_cos2 * n_sin2, denominator, out=denominator)
+    return np.sqrt(denominator, out=denominator)
 
 class Solver():
     """非线性晶体相位匹配求解器
@@ -77,6 +113,7 @@ class Solver():
                 f"𝐎 ({λω}) + 𝐄 ({λω}) → 𝐄 ({λ2ω}) (Type II)",
                 f"𝐎 ({λω}) + 𝐄 ({λω}) → 𝐎 ({λ2ω}) (Type II)"
             ]
+            order = [(1, 1)] * 4
         else:
             λ1 = f"{self.cfg.wavelength1_nm:.0f}nm"
             λ2 = f"{self.cfg.wavelength2_nm:.0f}nm"
@@ -89,6 +126,20 @@ class Solver():
                 f"𝐎 ({λ1}) + 𝐄 ({λ2}) → 𝐎 ({λout}) (Type II)",
                 f"𝐎 ({λ2}) + 𝐄 ({λ1}) → 𝐎 ({λout}) (Type II)"
             ]
+            order = [(1, 2), (1, 2), (1, 2), (2, 1), (1, 2), (2, 1)]
+        
+        # 每个模式按书写顺序的波长 (输入光a, 输入光b, 输出光)，供界面直接使用，不必再解析模式字符串
+        input_wavelengths = {1: self.cfg.wavelength1_nm, 2: self.cfg.wavelength2_nm}
+        self.mode_wavelengths = {
+            mode: (input_wavelengths[a], input_wavelengths[b], self.cfg.wavelength_out_nm)
+            for mode, (a, b) in zip(self.mode_names, order)
+        }
+        # walkoff_angle 计算时填充: 模式 -> {'wavelengths', 'polarizations', 'e_beams'}
+        self.mode_meta = {}
+        # delta_n 首次遇到某个模式时填充: 模式 -> _parse_mode 的解析结果
+        self._mode_cache = {}
+        # 模式 -> _mode_polarizations 的解析结果
+        self._pol_cache = {}
         
         # 为向后兼容，保留 equations_deltan 作为 delta_n 的包装器
         # 每个模式都是一个 lambda，内部调用统一的 delta_n 函数
@@ -125,10 +176,97 @@ class Solver():
             在非线性光学中，通过改变传播方向(扫描θ)来改变E光的有效折射率，
             从而调整相位匹配条件
         """
-        return lambda theta: np.sqrt(
-            (n_cos**2 * n_sin**2) / 
-            (n_cos**2 * np.cos(theta)**2 + n_sin**2 * np.sin(theta)**2)
-        )
+        return lambda theta: _ne(n_cos, n_sin, theta)
+
+    def _mode_polarizations(self, mode_name):
+        """
+        OE表示法模式名称中按书写顺序的偏振 (pol1, pol2, pol_out)，取值 '𝐎'/'𝐄'
+        
+        只看偏振、不需要波长信息（走离角和 d_eff 也能用于调用方自行构造的模式名称），
+        结果缓存在 self._pol_cache 中；调用前需确认模式名称中有且只有一个 '→'
+        """
+        pols = self._pol_cache.get(mode_name)
+        if pols is not None:
+            return pols
+        
+        input_part, output_part = (part.strip() for part in mode_name.split('→'))
+        
+        # 提取偏振顺序
+        input_pols = []
+        if '𝐎' in input_part:
+            input_pols.append(('𝐎', input_part.index('𝐎')))
+        if '𝐄' in input_part:
+            input_pols.append(('𝐄', input_part.index('𝐄')))
+        input_pols.sort(key=lambda x: x[1])
+        pol1 = input_pols[0][0]  # 第一束光的偏振
+        pol2 = input_pols[1][0] if len(input_pols) > 1 else input_pols[0][0]  # 第二束光的偏振
+        pol_out = '𝐄' if '𝐄' in output_part.split('(')[0] else '𝐎'
+        
+        pols = (pol1, pol2, pol_out)
+        self._pol_cache[mode_name] = pols
+        return pols
+
+    def _parse_mode(self, mode_name):
+        """
+        解析模式名称中的偏振与光束顺序（结果缓存在 self._mode_cache 中，每个模式只解析一次）
+        
+        返回:
+            tuple: (is_xyz_notation, pol1, pol2, pol_out, beams_swapped)
+                XYZ表示法时 pol1/pol2/pol_out 为折射率键名 'n_x'/'n_y'/'n_z'，beams_swapped 为 False；
+                OE表示法时为 '𝐎'/'𝐄'，beams_swapped 表示模式字符串中第一束光对应配置中的 wavelength2
+        """
+        parsed = self._mode_cache.get(mode_name)
+        if parsed is not None:
+            return parsed
+        
+        parts = mode_name.split('→')
+        if len(parts) != 2:
+            raise ValueError(f"模式名称格式错误: {mode_name}")
+        
+        input_part = parts[0].strip()
+        output_part = parts[1].strip()
+        is_xyz_notation = any(c in mode_name for c in ['𝐗', '𝐘', '𝐙'])
+        
+        if is_xyz_notation:
+            def extract_xyz_pol(text):
+                for pol in ['𝐗', '𝐘', '𝐙']:
+                    if pol in text:
+                        return pol
+                return None
+            
+            input_beams = input_part.split('+')
+            pol1 = extract_xyz_pol(input_beams[0])
+            pol2 = extract_xyz_pol(input_beams[1]) if len(input_beams) > 1 else pol1
+            pol_out = extract_xyz_pol(output_part)
+            
+            xyz_to_key = {'𝐗': 'n_x', '𝐘': 'n_y', '𝐙': 'n_z'}
+            parsed = (True, xyz_to_key[pol1], xyz_to_key[pol2], xyz_to_key[pol_out], False)
+            
+        else:
+            if self.cfg.process_type == 'SHG':
+                # SHG两束输入光波长相同，不存在顺序问题，无需从模式字符串中提取波长
+                beams_swapped = False
+            else:
+                # 需要识别模式字符串中波长的顺序，匹配到正确的配置参数
+                # 提取所有波长信息 (格式: "1064nm")
+                wavelengths_in_mode = _MODE_WAVELENGTH_RE.findall(mode_name)
+                if len(wavelengths_in_mode) < 3:
+                    raise ValueError(f"无法从模式字符串中提取波长信息: {mode_name}")
+            
+                wl_beam1_str = float(wavelengths_in_mode[0])  # 第一束光波长（模式字符串中的）
+            
+                # 判断波长顺序：比较模式字符串中的波长与配置文件中的波长
+                # 如果第一个波长接近wavelength1，说明顺序一致；否则是交换的
+                # 模式字符串中的波长是配置值，扫描波长时 wl1 偏离配置值（且可能是数组），因此与配置值比较，
+                # 整条扫描曲线使用同一种光束对应关系
+                tolerance = 1.0  # 容差1nm
+                beams_swapped = not abs(wl_beam1_str - self.cfg.wavelength1_nm) < tolerance
+            
+            pol1, pol2, pol_out = self._mode_polarizations(mode_name)
+            parsed = (False, pol1, pol2, pol_out, beams_swapped)
+        
+        self._mode_cache[mode_name] = parsed
+        return parsed
 
     def delta_n(self, mode_name, theta=None, wavelength1=None, wavelength2=None, 
                 wavelength_out=None, temperature=None):
@@ -166,18 +304,18 @@ class Solver():
         返回:
             float or array: 相位失配 Δn 值
             
-        使用示例:
+        使用示例（各参数均可直接传入数组，一次调用得到整条扫描曲线）:
             # OE表示法：角度调谐
             theta_range = np.linspace(0, np.pi/2, 1000)
-            delta_n_values = [solver.delta_n("𝐎 + 𝐎 → 𝐄 (Type I)", theta=t) for t in theta_range]
+            delta_n_values = solver.delta_n("𝐎 + 𝐎 → 𝐄 (Type I)", theta=theta_range)
             
             # OE表示法：波长带宽
             wl_range = np.linspace(1000, 1100, 1000)
-            delta_n_values = [solver.delta_n("𝐎 + 𝐎 → 𝐄 (Type I)", theta=θ_c, wavelength1=w) for w in wl_range]
+            delta_n_values = solver.delta_n("𝐎 + 𝐎 → 𝐄 (Type I)", theta=θ_c, wavelength1=wl_range)
             
             # XYZ表示法：温度调谐（非临界相位匹配）
             temp_range = np.linspace(20, 200, 1000)
-            delta_n_values = [solver.delta_n("𝐗 + 𝐗 → 𝐘 (Type I)", temperature=t) for t in temp_range]
+            delta_n_values = solver.delta_n("𝐗 + 𝐗 → 𝐘 (Type I)", temperature=temp_range)
         """
         # 参数默认值填充
         wl1 = wavelength1 if wavelength1 is not None else self.cfg.wavelength1_nm
@@ -186,61 +324,31 @@ class Solver():
         temp = temperature if temperature is not None else self.cfg.temperature
         
         # 获取折射率
-        indices_w1 = self.cfg.get_indices(target_wavelength=wl1, target_temperature=temp)
-        indices_w2 = self.cfg.get_indices(target_wavelength=wl2, target_temperature=temp)
-        indices_out = self.cfg.get_indices(target_wavelength=wl_out, target_temperature=temp)
-        
-        nw1_o = indices_w1[self.key_static]
-        nw1_e_func = self.ne_func(indices_w1[self.key_cos], indices_w1[self.key_sin])
-        nw2_o = indices_w2[self.key_static]
-        nw2_e_func = self.ne_func(indices_w2[self.key_cos], indices_w2[self.key_sin])
-        nout_o = indices_out[self.key_static]
-        nout_e_func = self.ne_func(indices_out[self.key_cos], indices_out[self.key_sin])
-        
-        # 解析模式名称，支持OE和XYZ两种表示法
-        parts = mode_name.split('→')
-        if len(parts) != 2:
-            raise ValueError(f"模式名称格式错误: {mode_name}")
+        if wavelength1 is None and wavelength2 is None and wavelength_out is None and temperature is None:
+            # 波长和温度都取配置值（角度扫描、临界角求根）时直接复用 __init__ 中算好的折射率
+            indices_w1, indices_w2, indices_out = self.indices_w1, self.indices_w2, self.indices_out
+        else:
+            indices_w1 = self.cfg.get_indices(target_wavelength=wl1, target_temperature=temp)
+            # 两束输入光波长相同时（SHG，波长扫描时两者为同一个数组）折射率只需计算一次
+            if wl2 is wl1 or (np.isscalar(wl1) and np.isscalar(wl2) and wl1 == wl2):
+                indices_w2 = indices_w1
+            else:
+                indices_w2 = self.cfg.get_indices(target_wavelength=wl2, target_temperature=temp)
+            indices_out = self.cfg.get_indices(target_wavelength=wl_out, target_temperature=temp)
         
-        input_part = parts[0].strip()
-        output_part = parts[1].strip()
-        is_xyz_notation = any(c in mode_name for c in ['𝐗', '𝐘', '𝐙'])
+        # 解析模式名称（支持OE和XYZ两种表示法），结果按模式名称缓存
+        is_xyz_notation, pol1, pol2, pol_out, beams_swapped = self._parse_mode(mode_name)
         
         if is_xyz_notation:
-            # XYZ表示法：直接使用主轴折射率（非临界相位匹配）
-            def extract_xyz_pol(text):
-                for pol in ['𝐗', '𝐘', '𝐙']:
-                    if pol in text:
-                        return pol
-                return None
-            
-            input_beams = input_part.split('+')
-            pol1 = extract_xyz_pol(input_beams[0])
-            pol2 = extract_xyz_pol(input_beams[1]) if len(input_beams) > 1 else pol1
-            pol_out = extract_xyz_pol(output_part)
-            
-            xyz_to_key = {'𝐗': 'n_x', '𝐘': 'n_y', '𝐙': 'n_z'}
-            n1 = indices_w1[xyz_to_key[pol1]]
-            n2 = indices_w2[xyz_to_key[pol2]]
-            n_out = indices_out[xyz_to_key[pol_out]]
+            # XYZ表示法：直接使用主轴折射率（非临界相位匹配），pol1/pol2/pol_out 即折射率键名
+            n1 = indices_w1[pol1]
+            n2 = indices_w2[pol2]
+            n_out = indices_out[pol_out]
             
         else:
             # OE表示法：根据角度计算E光折射率
-            # 需要识别模式字符串中波长的顺序，匹配到正确的配置参数
-            import re
-            
-            # 提取所有波长信息 (格式: "1064nm")
-            wavelengths_in_mode = re.findall(r'(\d+)nm', mode_name)
-            if len(wavelengths_in_mode) < 3:
-                raise ValueError(f"无法从模式字符串中提取波长信息: {mode_name}")
-            
-            wl_beam1_str = float(wavelengths_in_mode[0])  # 第一束光波长（模式字符串中的）
-            wl_beam2_str = float(wavelengths_in_mode[1])  # 第二束光波长（模式字符串中的）
-            
-            # 判断波长顺序：比较模式字符串中的波长与配置文件中的波长
-            # 如果第一个波长接近wavelength1，说明顺序一致；否则是交换的
-            tolerance = 1.0  # 容差1nm
-            if abs(wl_beam1_str - wl1) < tolerance:
+            # 模式字符串中波长的顺序与配置相反时交换两束输入光（见 _parse_mode）
+            if not beams_swapped:
                 # 顺序一致：beam1用wl1, beam2用wl2
                 indices_beam1 = indices_w1
                 indices_beam2 = indices_w2
@@ -256,40 +364,26 @@ class Solver():
             indices_output = indices_out
             actual_wl_out = wl_out
             
-            # 提取偏振顺序
-            input_pols = []
-            if '𝐎' in input_part:
-                input_pols.append(('𝐎', input_part.index('𝐎')))
-            if '𝐄' in input_part:
-                input_pols.append(('𝐄', input_part.index('𝐄')))
-            input_pols.sort(key=lambda x: x[1])
-            pol1 = input_pols[0][0]  # 第一束光的偏振
-            pol2 = input_pols[1][0] if len(input_pols) > 1 else input_pols[0][0]  # 第二束光的偏振
-            pol_out = '𝐄' if '𝐄' in output_part.split('(')[0] else '𝐎'
-            
             if theta is None and (pol1 == '𝐄' or pol2 == '𝐄' or pol_out == '𝐄'):
                 raise ValueError("计算E光时必须提供theta参数")
             
-            # 第一束光的折射率
-            if pol1 == '𝐎':
-                n1 = indices_beam1[self.key_static]
+            # E光折射率：θ为数组时 cos²θ、sin²θ 只计算一次，供各束E光共用
+            if isinstance(theta, np.ndarray):
+                cos2_theta, sin2_theta = np.cos(theta)**2, np.sin(theta)**2
+                def ne(indices):
+                    return _ne_trig(indices[self.key_cos], indices[self.key_sin], cos2_theta, sin2_theta)
             else:
-                ne1_func = self.ne_func(indices_beam1[self.key_cos], indices_beam1[self.key_sin])
-                n1 = ne1_func(theta)
+                def ne(indices):
+                    return _ne(indices[self.key_cos], indices[self.key_sin], theta)
+            
+            # 第一束光的折射率
+            n1 = indices_beam1[self.key_static] if pol1 == '𝐎' else ne(indices_beam1)
             
             # 第二束光的折射率
-            if pol2 == '𝐎':
-                n2 = indices_beam2[self.key_static]
-            else:
-                ne2_func = self.ne_func(indices_beam2[self.key_cos], indices_beam2[self.key_sin])
-                n2 = ne2_func(theta)
+            n2 = indices_beam2[self.key_static] if pol2 == '𝐎' else ne(indices_beam2)
             
             # 输出光的折射率
-            if pol_out == '𝐎':
-                n_out = indices_output[self.key_static]
-            else:
-                ne_out_func = self.ne_func(indices_output[self.key_cos], indices_output[self.key_sin])
-                n_out = ne_out_func(theta)
+            n_out = indices_output[self.key_static] if pol_out == '𝐎' else ne(indices_output)
             
             # 根据实际波长计算正确的权重
             if self.cfg.process_type == 'SHG':
@@ -312,55 +406,104 @@ class Solver():
     def criticalangle(self):
         """计算相位匹配的临界角度，对所有模式求解Δn=0"""
         
+        # ===== 所有模式的Δn在粗网格上一次求值 =====
+        # Δn(θ) 在 [0, π/2] 上光滑，先在粗网格上找到变号区间，再用 brentq 在区间内求根
+        theta_grid = np.linspace(0, np.pi/2, 65)
+        
+        # 三束光（配置中的 λ₁、λ₂、λ_out）在网格上的O/E折射率只计算一次，各模式按偏振组合取用
+        cos2_grid, sin2_grid = np.cos(theta_grid)**2, np.sin(theta_grid)**2
+        grid_indices = {}
+        for beam, indices in ((1, self.indices_w1), (2, self.indices_w2), ('out', self.indices_out)):
+            grid_indices[beam] = {
+                '𝐎': indices[self.key_static],
+                '𝐄': _ne_trig(indices[self.key_cos], indices[self.key_sin], cos2_grid, sin2_grid)
+            }
+        # 与 delta_n 相同的权重: SHG=(0.5, 0.5)，SFG=λ_out/λ_beam
+        beam_weights = {1: self.weight1, 2: self.weight2}
+        
+        # 网格的行与下面求解循环使用同一个序列（equations_deltan 的键）：mode_names 中可能有重复的名称
+        # （SFG 两个波长格式化后相同时），按 mode_names 建行会与去重后的求解循环错位
+        delta_n_grid = np.empty((len(self.equations_deltan), len(theta_grid)))
+        for row, mode_name in enumerate(self.equations_deltan):
+            _, pol1, pol2, pol_out, beams_swapped = self._parse_mode(mode_name)
+            beam1, beam2 = (2, 1) if beams_swapped else (1, 2)
+            delta_n_grid[row] = (beam_weights[beam1] * grid_indices[beam1][pol1]
+                                 + beam_weights[beam2] * grid_indices[beam2][pol2]
+                                 - grid_indices['out'][pol_out])
+        
+        # 相邻两点Δn异号（或为0）的区间内必有根，且必然落在物理范围 [0°, 90°] 之内
+        sign_changes = delta_n_grid[:, :-1] * delta_n_grid[:, 1:] <= 0
+        
         # ===== 内部求解函数: robust_solve =====
-        def robust_solve(equation_func, guess=np.pi/4):
+        def robust_solve(equation_func, brackets, guess=np.pi/4):
             """
-            数值求解器：尝试找到方程的根，失败或无解时返回 np.nan
+            数值求解器：在变号区间内求方程的根，没有变号区间(无解)时返回 np.nan
             
             参数:
                 equation_func: 目标方程 f(θ)，当 f(θ)=0 时满足相位匹配
-                guess: 初始猜测值,默认45°(π/4弧度)，这是比较合理的起点
+                brackets: 网格上 f 变号的区间序号，区间 k 为 [theta_grid[k], theta_grid[k+1]]
+                guess: 有多个变号区间时取离该角度最近的一个，默认45°(π/4弧度)
             
             返回:
                 float: 求解得到的角度(弧度)，或 np.nan(无解)
             
-            鲁棒性保证:
-                1. fsolve 返回信息 ier=1 表示成功收敛
-                2. 解必须在物理范围 [0°, 90°] = [0, π/2] 内
-                3. 将解代回原方程验证，残差 |f(θ_solution)| < 1e-4
-                4. 严格检验防止伪收敛和数值不稳定
-            
-            参数说明:
-                - full_output=1: 让 fsolve 返回详细信息，包括收敛标志 ier
-                - ier=1: 收敛成功
-                - ier≠1: 求解失败或不收敛
+            brentq 是带区间的求根方法，不依赖初值和导数，不会伪收敛
             """
-            # 调用 scipy 的 fsolve 非线性方程求解器
-            # full_output=1 可以获得收敛信息
-            root, _, ier, _ = fsolve(equation_func, guess, full_output=1)      
-                     
-            if ier == 1:
-                theta_res = root[0]
-                # ===== 双重检查 =====
-                # 检验 1: 解必须在物理范围内 (0° 到 90°)
-                if 0 <= theta_res <= np.pi/2:
-                    # 检验 2: 把解代回方程，计算残差
-                    # 如果残差太大，说明是伪收敛，应该舍弃
-                    residual = abs(equation_func(theta_res))
-                    if residual < 1e-4:
-                        return theta_res
-            
-            # 如果求解失败或未通过检验，返回 NaN
-            return np.nan
+            if len(brackets) == 0:
+                return np.nan
+            # 取中点离初始猜测值最近的变号区间
+            centers = (theta_grid[brackets] + theta_grid[brackets + 1]) / 2
+            k = brackets[np.argmin(np.abs(centers - guess))]
+            try:
+                return brentq(lambda theta: float(equation_func(theta)), theta_grid[k], theta_grid[k + 1])
+            except (RuntimeError, ValueError):
+                # 未收敛（RuntimeError）或区间两端同号（ValueError），按无解处理
+                return np.nan
 
-        # 遍历所有模式，求解Δn=0的角度
+        # 遍历所有模式，求解Δn=0的角度（有解析解的Type I模式直接计算，其余用brentq求根）
         theta_critical_dict_results = {}
-        for mode_name, eq_func in self.equations_deltan.items():
-            theta_val = robust_solve(eq_func, guess=np.pi/4)
+        for row, (mode_name, eq_func) in enumerate(self.equations_deltan.items()):
+            theta_val = self._type1_critical_angle(mode_name)
+            if theta_val is None:
+                theta_val = robust_solve(eq_func, np.flatnonzero(sign_changes[row]), guess=np.pi/4)
             theta_deg = np.rad2deg(theta_val) if not np.isnan(theta_val) else np.nan
             theta_critical_dict_results[mode_name] = theta_deg
         return theta_critical_dict_results
 
+    def _type1_critical_angle(self, mode_name):
+        """
+        Type I 模式临界角的解析解，只有一束E光参与方程的模式适用，其余返回 None（由数值求根处理）
+        
+        适用情况:
+            - 𝐎 + 𝐎 → 𝐄: n_e,out(θ) = w1·n_o1 + w2·n_o2
+            - 𝐄 + 𝐄 → 𝐎 (SHG，两束输入光相同): n_e,ω(θ) = n_o,2ω
+        
+        由 n_e(θ) = √[ (n_cos² * n_sin²) / (n_cos² * cos²θ + n_sin² * sin²θ) ]，令 n_e(θ) = n_t 得:
+            sin²θ = n_cos² (n_t² - n_sin²) / (n_t² (n_cos² - n_sin²))
+        
+        返回:
+            float: 临界角(弧度)，sin²θ 不在 [0, 1] 内(无解)时为 np.nan；不适用时为 None
+        """
+        _, pol1, pol2, pol_out, _ = self._parse_mode(mode_name)
+        if pol1 == pol2 == '𝐎' and pol_out == '𝐄':
+            n_t = self.weight1 * self.indices_w1[self.key_static] + self.weight2 * self.indices_w2[self.key_static]
+            e_indices = self.indices_out
+        elif pol1 == pol2 == '𝐄' and pol_out == '𝐎' and self.cfg.process_type == 'SHG':
+            # 两束E光波长相同，权重之和为1
+            n_t = self.indices_out[self.key_static]
+            e_indices = self.indices_w1
+        else:
+            return None
+        
+        n_cos, n_sin = e_indices[self.key_cos], e_indices[self.key_sin]
+        if n_cos == n_sin:
+            # 该平面内E光折射率与角度无关
+            return np.nan
+        sin2_theta = n_cos**2 * (n_t**2 - n_sin**2) / (n_t**2 * (n_cos**2 - n_sin**2))
+        if not 0 <= sin2_theta <= 1:
+            return np.nan
+        return math.asin(math.sqrt(sin2_theta))
+
     def walkoff_angle(self, theta_critical_dict, phi):
         """计算走离角: ρ = θ - arctan(a²/b² * tanθ)，只有E光有走离角"""
 
@@ -378,16 +521,8 @@ class Solver():
                     walkoff_angle_results[mode_name] = "格式错误"
                     continue
                 
-                input_part, output_part = parts[0].strip(), parts[1].strip()
-                
-                input_pols = []
-                if '𝐎' in input_part:
-                    input_pols.append(('𝐎', input_part.index('𝐎')))
-                if '𝐄' in input_part:
-                    input_pols.append(('𝐄', input_part.index('𝐄')))
-                input_pols.sort(key=lambda x: x[1])
-                pol1, pol2 = input_pols[0][0], input_pols[1][0] if len(input_pols) > 1 else input_pols[0][0]
-                pol_out = '𝐄' if '𝐄' in output_part.split('(')[0] else '𝐎'
+                # 偏振顺序与 delta_n 相同，直接使用缓存的解析结果
+                pol1, pol2, pol_out = self._mode_polarizations(mode_name)
                 
                 def calc_walkoff(pol, wavelength_nm):
                     """计算指定偏振和波长的走离角"""
@@ -435,6 +570,18 @@ class Solver():
                 
                 walkoff_angle_results[mode_name] = result_str
                 
+                # 结构化结果: E光按书写顺序记录 (波长nm, 走离角°)
+                # 只为 self.mode_names 中的模式记录；调用方自行构造的模式名称没有对应的波长信息，跳过
+                mode_wavelengths = self.mode_wavelengths.get(mode_name)
+                if mode_wavelengths is not None:
+                    polarizations = (pol1, pol2, pol_out)
+                    rhos = (rho1_deg, rho2_deg, rho_out_deg)
+                    self.mode_meta[mode_name] = {
+                        'wavelengths': mode_wavelengths,
+                        'polarizations': polarizations,
+                        'e_beams': tuple((wl, rho) for wl, pol, rho in zip(mode_wavelengths, polarizations, rhos) if pol == '𝐄'),
+                    }
+                
         return walkoff_angle_results
 
     def d_eff(self, theta_critical_dict, selected_phi=None):
@@ -454,167 +601,168 @@ class Solver():
         
         # 步骤1: 识别每个模式的匹配类型
         def get_mode_type(mode_name):
-            """提取模式类型: 'OOE', 'EEO', 'OEE', 'OEO'"""
-            if '→' not in mode_name:
+            """提取模式类型: 'OOE', 'EEO', 'OEE', 'OEO'（偏振由 _mode_polarizations 解析并缓存，不再逐字符扫描模式字符串）"""
+            if mode_name.count('→') != 1:
                 return None
-            
-            parts = mode_name.split('→')
-            input_part = parts[0].strip()
-            output_part = parts[1].strip()
-            
-            # 提取偏振符号
-            input_pols = [c for c in input_part if c in ['𝐎', '𝐄']]
-            output_pol = next((c for c in output_part if c in ['𝐎', '𝐄']), None)
-            
-            if len(input_pols) < 2 or output_pol is None:
+            input_part = mode_name.split('→')[0]
+            if '𝐎' not in input_part and '𝐄' not in input_part:
                 return None
             
+            pol1, pol2, pol_out = self._mode_polarizations(mode_name)
+            
             # 返回三字符模式类型（不区分顺序，OE和EO都算OE）
-            pol1, pol2 = input_pols[0], input_pols[1]
             if pol1 == pol2:
                 # Type I
-                return f"{pol1}{pol2}{output_pol}".replace('𝐎', 'O').replace('𝐄', 'E')
+                return POL_ASCII[pol1] + POL_ASCII[pol2] + POL_ASCII[pol_out]
             else:
                 # Type II (统一为OE)
-                return f"OE{output_pol}".replace('𝐎', 'O').replace('𝐄', 'E')
-        
-        # 步骤2: 确定每个模式的theta和phi角
-        for mode_name, critical_angle_deg in theta_critical_dict.items():
-            mode_type = get_mode_type(mode_name)
-            if mode_type is None:
-                d_eff_dict[mode_name] = 0.0
-                continue
+                return "OE" + POL_ASCII[pol_out]
+        
+        if self.cfg.plane not in ("XY", "XZ", "YZ"):
+            return {mode_name: 0.0 for mode_name in theta_critical_dict}
+        
+        # 步骤2: 一次性确定所有模式的theta和phi角（数组，每个模式一个元素）
+        mode_types = [get_mode_type(mode_name) for mode_name in theta_critical_dict]
+        critical_rad = np.deg2rad(np.array(list(theta_critical_dict.values()), dtype=float))
+        if self.cfg.plane == "XY":
+            # XY平面：phi是相位匹配角，theta固定90°
+            theta_rad = np.full_like(critical_rad, np.deg2rad(90.0))
+            phi_rad = critical_rad
+        elif self.cfg.plane == "XZ":
+            # XZ平面：theta是相位匹配角，phi固定0°
+            theta_rad = critical_rad
+            phi_rad = np.full_like(critical_rad, np.deg2rad(selected_phi if selected_phi is not None else 0.0))
+        else:
+            # YZ平面：theta是相位匹配角，phi固定90°
+            theta_rad = critical_rad
+            phi_rad = np.full_like(critical_rad, np.deg2rad(selected_phi if selected_phi is not None else 90.0))
+        
+        # 步骤3: 根据晶体点群对所有模式一次算出各匹配类型的d_eff，未列出的匹配类型为0
+        formulas = {}
+        
+        if crystal_info["group"] == "4bar2m":  # BBO类晶体
+            d36 = d_tensor.get('d36', 0)
+            formulas["OOE"] = formulas["OEO"] = d36 * np.sin(theta_rad) * np.sin(2*phi_rad)
+            formulas["EEO"] = formulas["OEE"] = d36 * np.sin(2*theta_rad) * np.cos(2*phi_rad)
+        
+        elif crystal_info["group"] == "3m":  # 三方晶系
+            d31 = d_tensor.get('d31', 0)
+            d11 = d_tensor.get('d11', 0)
+            d22 = d_tensor.get('d22', 0)
+            d15 = d_tensor.get('d15', 0)
+            
+            formulas["OOE"] = d31 * np.sin(theta_rad) + (d11*np.cos(3*phi_rad) - d22*np.sin(3*phi_rad)) * np.cos(theta_rad)
+            formulas["EEO"] = d31 * np.sin(theta_rad) + (d22*np.sin(3*phi_rad) - d11*np.cos(3*phi_rad)) * np.cos(theta_rad)
+            formulas["OEE"] = (d11*np.sin(3*phi_rad) + d22*np.cos(3*phi_rad)) * np.cos(theta_rad)**2
+            formulas["OEO"] = d15 * np.sin(theta_rad) + (d11*np.cos(3*phi_rad) - d22*np.sin(3*phi_rad)) * np.cos(theta_rad)
+        
+        elif crystal_info["group"] == "mm2":  # LBO, KTP类晶体
+            d31 = d_tensor.get('d31', 0)
+            d32 = d_tensor.get('d32', 0)
+            d33 = d_tensor.get('d33', 0)
             
-            # 根据平面确定theta和phi
             if self.cfg.plane == "XY":
-                # XY平面：phi是相位匹配角，theta固定90°
-                theta_rad = np.deg2rad(90.0)
-                phi_rad = np.deg2rad(critical_angle_deg)
-            elif self.cfg.plane == "XZ":
-                # XZ平面：theta是相位匹配角，phi固定0°
-                theta_rad = np.deg2rad(critical_angle_deg)
-                phi_rad = np.deg2rad(selected_phi if selected_phi is not None else 0.0)
+                formulas["OOE"] = d31 * np.cos(phi_rad)**2 + d32 * np.sin(phi_rad)**2
+                formulas["EEO"] = np.full_like(phi_rad, d33)
+                # Type II在XY平面为0
             elif self.cfg.plane == "YZ":
-                # YZ平面：theta是相位匹配角，phi固定90°
-                theta_rad = np.deg2rad(critical_angle_deg)
-                phi_rad = np.deg2rad(selected_phi if selected_phi is not None else 90.0)
-            else:
-                d_eff_dict[mode_name] = 0.0
-                continue
-            
-            # 步骤3: 根据晶体点群和模式类型计算d_eff
-            d_value = 0.0
-            
-            if crystal_info["group"] == "4bar2m":  # BBO类晶体
-                d36 = d_tensor.get('d36', 0)
-                if mode_type == "OOE":
-                    d_value = d36 * np.sin(theta_rad) * np.sin(2*phi_rad)
-                elif mode_type == "EEO":
-                    d_value = d36 * np.sin(2*theta_rad) * np.cos(2*phi_rad)
-                elif mode_type == "OEE":
-                    d_value = d36 * np.sin(2*theta_rad) * np.cos(2*phi_rad)
-                elif mode_type == "OEO":
-                    d_value = d36 * np.sin(theta_rad) * np.sin(2*phi_rad)
-            
-            elif crystal_info["group"] == "3m":  # 三方晶系
-                d31 = d_tensor.get('d31', 0)
-                d11 = d_tensor.get('d11', 0)
-                d22 = d_tensor.get('d22', 0)
-                d15 = d_tensor.get('d15', 0)
-                
-                if mode_type == "OOE":
-                    d_value = d31 * np.sin(theta_rad) + (d11*np.cos(3*phi_rad) - d22*np.sin(3*phi_rad)) * np.cos(theta_rad)
-                elif mode_type == "EEO":
-                    d_value = d31 * np.sin(theta_rad) + (d22*np.sin(3*phi_rad) - d11*np.cos(3*phi_rad)) * np.cos(theta_rad)
-                elif mode_type == "OEE":
-                    d_value = (d11*np.sin(3*phi_rad) + d22*np.cos(3*phi_rad)) * np.cos(theta_rad)**2
-                elif mode_type == "OEO":
-                    d_value = d15 * np.sin(theta_rad) + (d11*np.cos(3*phi_rad) - d22*np.sin(3*phi_rad)) * np.cos(theta_rad)
-            
-            elif crystal_info["group"] == "mm2":  # LBO, KTP类晶体
-                d31 = d_tensor.get('d31', 0)
-                d32 = d_tensor.get('d32', 0)
-                d33 = d_tensor.get('d33', 0)
-                
-                if self.cfg.plane == "XY":
-                    if mode_type == "OOE":
-                        d_value = d31 * np.cos(phi_rad)**2 + d32 * np.sin(phi_rad)**2
-                    elif mode_type == "EEO":
-                        d_value = d33
-                    # Type II在XY平面为0
-                elif self.cfg.plane == "YZ":
-                    if mode_type == "OOE":
-                        d_value = d31 * np.cos(theta_rad)
-                    elif mode_type in ["OEE", "OEO"]:
-                        d_value = d31 * np.sin(theta_rad)
-                elif self.cfg.plane == "XZ":
-                    if mode_type == "OOE":
-                        d_value = d32 * np.cos(theta_rad)
-                    elif mode_type in ["OEE", "OEO"]:
-                        d_value = d32 * np.sin(theta_rad)
-            
-            d_eff_dict[mode_name] = abs(d_value)
+                formulas["OOE"] = d31 * np.cos(theta_rad)
+                formulas["OEE"] = formulas["OEO"] = d31 * np.sin(theta_rad)
+            elif self.cfg.plane == "XZ":
+                formulas["OOE"] = d32 * np.cos(theta_rad)
+                formulas["OEE"] = formulas["OEO"] = d32 * np.sin(theta_rad)
+        
+        for i, (mode_name, mode_type) in enumerate(zip(theta_critical_dict, mode_types)):
+            d_value = formulas.get(mode_type)
+            d_eff_dict[mode_name] = abs(float(d_value[i])) if d_value is not None else 0.0
         
         return d_eff_dict
 
-    def acceptance_angle(self, theta_critical_dict, target_mode, step=1000, res=0.1):
-        """计算相位匹配接受角：扫描临界角附近的角度范围，计算转换效率并找FWHM"""
+    def conversion_efficiency(self, delta_n_array):
+        """
+        由相位失配Δn计算归一化转换效率（各接受带宽计算共用）
+        
+        Δk = 2π/λ_out × Δn，η(Δk) = sinc²(Δk × L/2)，L = CRYSTAL_LENGTH_UM
+        """
+        # x = Δk × L/2 = π × L / λ_out × Δn，常数先合并为一个标量，数组只乘一次
+        x = np.asarray(delta_n_array * (np.pi * CRYSTAL_LENGTH_UM / self.cfg.wavelength_out_um), dtype=float)
+        # sinc²(x) = (sin(x)/x)²，在同一个数组上原地完成，不产生额外的中间数组
+        efficiency = np.sin(x, out=np.empty_like(x))
+        zero = (x == 0)
+        np.divide(efficiency, x, out=efficiency, where=~zero)
+        efficiency[zero] = 1.0  # x→0 时 sin(x)/x → 1
+        np.square(efficiency, out=efficiency)
+        return efficiency if efficiency.ndim else efficiency[()]
+
+    def efficiency_axes(self, xlabel):
+        """接受带宽曲线共用的画布：统一的尺寸、横纵轴标题和网格，调用方只需画曲线和设置标题"""
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.set_xlabel(xlabel, fontsize=12)
+        # 根据过程类型设置纵轴标题
+        ax.set_ylabel('SHG Efficiency' if self.cfg.process_type == 'SHG' else 'SFG Efficiency', fontsize=12)
+        ax.grid(True, alpha=0.3)
+        return fig, ax
+
+    def fwhm(self, axis, efficiency):
+        """
+        效率曲线的半高全宽：在最外侧两个跨过0.5的采样点之间线性插值求交点，
+        精度不再受扫描步长限制（曲线未降到0.5以下的一侧取端点）；没有点≥0.5时返回 nan
+        """
+        indices_above_half = np.flatnonzero(efficiency >= 0.5)
+        if len(indices_above_half) == 0:
+            return np.nan
+        lower_index, upper_index = indices_above_half[0], indices_above_half[-1]
+        lower = axis[lower_index]
+        if lower_index > 0:
+            # 左交点位于 (lower_index-1, lower_index) 之间
+            y0, y1 = efficiency[lower_index - 1], efficiency[lower_index]
+            lower = axis[lower_index - 1] + (0.5 - y0) / (y1 - y0) * (axis[lower_index] - axis[lower_index - 1])
+        upper = axis[upper_index]
+        if upper_index < len(axis) - 1:
+            # 右交点位于 (upper_index, upper_index+1) 之间
+            y0, y1 = efficiency[upper_index], efficiency[upper_index + 1]
+            upper = axis[upper_index] + (0.5 - y0) / (y1 - y0) * (axis[upper_index + 1] - axis[upper_index])
+        return upper - lower
+
+    def acceptance_angle(self, theta_critical_dict, target_mode, step=1000, res=0.1, plot=True):
+        """计算相位匹配接受角：扫描临界角附近的角度范围，计算转换效率并找FWHM（plot=False 时不画图，返回的 fig 为 None）"""
         # ===== 构建角度扫描数组 =====
         # 以临界角为中心，前后各扫描 step 个点
         # 单位变换: mrad × 1e-3 = rad
         theta_axis = np.deg2rad(theta_critical_dict[target_mode]) + np.arange(-step, step) * res * 1e-3 
        
         # ===== 使用统一的delta_n函数计算相位失配 =====
-        # 对每个角度计算Δn，使用当前配置的波长和温度
-        delta_n_array = np.array([self.delta_n(target_mode, theta=t) for t in theta_axis])
-        
-        # 计算Δk：Δk = 2π/λ_out × Δn
-        delta_k_angle = (np.pi * 2 / self.cfg.wavelength_out_um) * delta_n_array
+        # 对整个角度轴一次计算Δn，使用当前配置的波长和温度
+        delta_n_array = self.delta_n(target_mode, theta=theta_axis)
         
-        # 转换效率: η(Δk) = sinc²(Δk × L/2)
-        # sinc(x) = sin(x)/x
-        efficiency_angle = (np.sinc(delta_k_angle * 1e4 / (2 * np.pi)))**2
+        # 转换效率: η(Δk) = sinc²(Δk × L/2)，Δk = 2π/λ_out × Δn
+        efficiency_angle = self.conversion_efficiency(delta_n_array)
 
         # ===== 绘制接受角曲线 =====
-        fig,ax = plt.subplots(figsize=(10, 6))
-        ax.plot(theta_axis * 1000, efficiency_angle, 'r-', linewidth=1.5)
-        ax.set_xlabel('Angle Deviation / mrad', fontsize=12)  # X轴: 角度偏差(毫弧度)
-        # 根据过程类型设置纵轴标题
-        ylabel = 'SHG Efficiency' if self.cfg.process_type == 'SHG' else 'SFG Efficiency'
-        ax.set_ylabel(ylabel, fontsize=12)
-        # 替换Unicode粗体字符为普通字符以便在图表中正确显示
-        display_mode = target_mode.replace('𝐎', 'O').replace('𝐄', 'E')
-        ax.set_title(f'Acceptance Angle Curve for {self.cfg.crystal_name}\n({display_mode})', fontsize=14)
-        ax.grid(True, alpha=0.3)
+        fig = None
+        if plot:
+            fig, ax = self.efficiency_axes('Angle Deviation / mrad')  # X轴: 角度偏差(毫弧度)
+            ax.plot(theta_axis * 1000, efficiency_angle, 'r-', linewidth=1.5)
+            # 替换Unicode粗体字符为普通字符以便在图表中正确显示
+            display_mode = target_mode.translate(DISPLAY_MODE_TABLE)
+            ax.set_title(f'Acceptance Angle Curve for {self.cfg.crystal_name}\n({display_mode})', fontsize=14)
 
         # ===== 计算接受角(FWHM, 半高全宽) =====
-        # FWHM 定义: 效率降到最大值50%时的角度范围
-        half_max = 0.5
-        
-        # 找出所有效率≥50%的点
-        indices_above_half = np.where(efficiency_angle >= half_max)[0]
-        
-        acceptance_angle = np.nan  # 默认值
-        acceptance_angle_deg = np.nan  # 默认值
-        if len(indices_above_half) > 0:
-            # 最小角度对应的索引(左边界)
-            lower_index = indices_above_half[0]
-            # 最大角度对应的索引(右边界)
-            upper_index = indices_above_half[-1]
-            
-            # 计算接受角(毫弧度)
-            acceptance_angle = (theta_axis[upper_index] - theta_axis[lower_index]) * 1000
-            
-            # 转换为度数便于理解
-            acceptance_angle_deg = np.rad2deg(theta_axis[upper_index] - theta_axis[lower_index])
-
-
+        # FWHM 定义: 效率降到最大值50%时的角度范围，两侧交点由线性插值得到（没有点≥50%时为nan）
+        acceptance_width = self.fwhm(theta_axis, efficiency_angle)
+        
+        # 计算接受角(毫弧度)
+        acceptance_angle = acceptance_width * 1000
+        
+        # 转换为度数便于理解
+        acceptance_angle_deg = np.rad2deg(acceptance_width)
 
         return fig, acceptance_angle, acceptance_angle_deg
 
-    def acceptance_wavelength(self, theta_critical_dict, target_mode, step, res):
+    def acceptance_wavelength(self, theta_critical_dict, target_mode, step, res, plot=True):
         """
         计算相位匹配接受波长（波长带宽），扫描基频波长附近的范围，计算转换效率并找FWHM
+        plot=False 时不画图，返回的 fig 为 None
         
         SFG处理策略：假设λ₂是λ₁的高次谐波，当λ₁偏移时λ₂按相同比例同步偏移（ratio = λ₂/λ₁）
         这符合实际应用：激光器波长漂移时基频和谐波光同步变化
@@ -633,138 +781,118 @@ class Solver():
 
         tem_theta = np.deg2rad(theta_critical_dict[target_mode])
         
-        if self.cfg.process_type == 'SHG':
-            delta_n_array = np.array([
-                self.delta_n(target_mode, theta=tem_theta, 
-                            wavelength1=wl, wavelength2=wl,
-                            wavelength_out=wl/2)
-                for wl in wavelength1_axis
-            ])
-        else:
-            delta_n_array = np.array([
-                self.delta_n(target_mode, theta=tem_theta,
-                            wavelength1=wl1, wavelength2=wl2,
-                            wavelength_out=wl_out)
-                for wl1, wl2, wl_out in zip(wavelength1_axis, wavelength2_axis, wavelength_out_axis)
-            ])
+        # 三个波长轴逐元素对应，对整个扫描一次计算Δn
+        delta_n_array = self.delta_n(target_mode, theta=tem_theta,
+                                     wavelength1=wavelength1_axis, wavelength2=wavelength2_axis,
+                                     wavelength_out=wavelength_out_axis)
         
-        delta_k_wavelength = (np.pi * 2 / self.cfg.wavelength_out_um) * delta_n_array
-        efficiency_wavelength = (np.sinc(delta_k_wavelength * 1e4 / (2 * np.pi)))**2
+        efficiency_wavelength = self.conversion_efficiency(delta_n_array)
 
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.plot(wavelength1_axis, efficiency_wavelength, 'g-', linewidth=1.5)
-        
-        # 根据过程类型设置标签
-        if self.cfg.process_type == 'SHG':
-            ax.set_xlabel('Fundamental Wavelength Deviation / nm', fontsize=12)
-            ax.set_ylabel('SHG Efficiency', fontsize=12)
-        else:
-            ax.set_xlabel('Fundamental Wavelength Deviation / nm', fontsize=12)
-            ax.set_ylabel('SFG Efficiency', fontsize=12)
-            # 添加说明文字（使用英文避免字体问题）
-            fig.text(0.5, -0.02, 'Note: Wavelength deviations of both beams are proportionally synchronized.', 
-                    ha='center', fontsize=10, style='italic', color='gray')
-        
-        # 替换Unicode粗体字符为普通字符以便在图表中正确显示
-        display_mode = target_mode.replace('𝐎', 'O').replace('𝐄', 'E').replace('𝐗', 'X').replace('𝐘', 'Y').replace('𝐙', 'Z')
-        ax.set_title(f'Acceptance Wavelength Curve for {self.cfg.crystal_name}\n({display_mode})', fontsize=14)
-        ax.grid(True, alpha=0.3)
+        fig = None
+        if plot:
+            fig, ax = self.efficiency_axes('Fundamental Wavelength Deviation / nm')
+            ax.plot(wavelength1_axis, efficiency_wavelength, 'g-', linewidth=1.5)
+            
+            if self.cfg.process_type == 'SFG':
+                # 添加说明文字（使用英文避免字体问题）
+                fig.text(0.5, -0.02, 'Note: Wavelength deviations of both beams are proportionally synchronized.', 
+                        ha='center', fontsize=10, style='italic', color='gray')
+            
+            # 替换Unicode粗体字符为普通字符以便在图表中正确显示
+            display_mode = target_mode.translate(DISPLAY_MODE_TABLE)
+            ax.set_title(f'Acceptance Wavelength Curve for {self.cfg.crystal_name}\n({display_mode})', fontsize=14)
     
-        half_max = 0.5  
-        indices_above_half = np.where(efficiency_wavelength >= half_max)[0]
-        
-        acceptance_wavelength = np.nan
-        acceptance_bandwidth = np.nan
-        if len(indices_above_half) > 0:
-            lower_index = indices_above_half[0]
-            upper_index = indices_above_half[-1]
-            acceptance_wavelength = (wavelength1_axis[upper_index] - wavelength1_axis[lower_index])
-            acceptance_bandwidth = 299792458 / (self.cfg.wavelength1_nm**2) * acceptance_wavelength 
+        # FWHM（半高处线性插值，没有点≥50%时为nan）
+        acceptance_wavelength = self.fwhm(wavelength1_axis, efficiency_wavelength)
+        acceptance_bandwidth = 299792458 / (self.cfg.wavelength1_nm**2) * acceptance_wavelength 
 
         return fig, acceptance_wavelength, acceptance_bandwidth
 
-    def acceptance_temperature(self, theta_critical_dict ,target_mode, step, res):
-        """计算相位匹配接受温度：扫描临界温度附近的范围，计算转换效率并找FWHM"""
+    def acceptance_temperature(self, theta_critical_dict ,target_mode, step, res, plot=True):
+        """计算相位匹配接受温度：扫描临界温度附近的范围，计算转换效率并找FWHM（plot=False 时不画图，返回的 fig 为 None）"""
         
         temperature_axis = self.cfg.temperature + np.arange(-step, step) * res 
 
         tem_theta = np.deg2rad(theta_critical_dict[target_mode])
         
-        delta_n_array = np.array([
-            self.delta_n(target_mode, theta=tem_theta, temperature=temp)
-            for temp in temperature_axis
-        ])
+        # 整个温度轴一次性传入delta_n；KDP/DKDP方程不含温度项，Δn为标量，需展开为与温度轴同形状
+        delta_n_array = np.broadcast_to(
+            self.delta_n(target_mode, theta=tem_theta, temperature=temperature_axis),
+            temperature_axis.shape
+        )
         
-        delta_k_temperature = (np.pi * 2 / self.cfg.wavelength_out_um) * delta_n_array
-        efficiency_temperature = (np.sinc(delta_k_temperature * 1e4 / (2 * np.pi)))**2
+        efficiency_temperature = self.conversion_efficiency(delta_n_array)
 
         # ===== 绘制接受温度曲线 =====
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.plot(temperature_axis, efficiency_temperature, 'b-', linewidth=1.5)
-        ax.set_xlabel('Temperature Deviation / °C', fontsize=12)  # X轴: 温度偏差(°C)
-        # 根据过程类型设置纵轴标题
-        ylabel = 'SHG Efficiency' if self.cfg.process_type == 'SHG' else 'SFG Efficiency'
-        ax.set_ylabel(ylabel, fontsize=12)
-        # 替换Unicode粗体字符为普通字符以便在图表中正确显示
-        display_mode = target_mode.replace('𝐎', 'O').replace('𝐄', 'E').replace('𝐗', 'X').replace('𝐘', 'Y').replace('𝐙', 'Z')
-        ax.set_title(f'Acceptance Temperature Curve for {self.cfg.crystal_name}\n({display_mode})', fontsize=14)
-        ax.grid(True, alpha=0.3) 
+        fig = None
+        if plot:
+            fig, ax = self.efficiency_axes('Temperature Deviation / °C')  # X轴: 温度偏差(°C)
+            ax.plot(temperature_axis, efficiency_temperature, 'b-', linewidth=1.5)
+            # 替换Unicode粗体字符为普通字符以便在图表中正确显示
+            display_mode = target_mode.translate(DISPLAY_MODE_TABLE)
+            ax.set_title(f'Acceptance Temperature Curve for {self.cfg.crystal_name}\n({display_mode})', fontsize=14)
     
         # ===== 计算接受温度(FWHM, 半高全宽) =====
-        # FWHM: 效率下降到最大值50%时的温度范围
-        half_max = 0.5  
-        indices_above_half = np.where(efficiency_temperature >= half_max)[0]
-        
-        acceptance_temperature = np.nan  # 默认值
-        if len(indices_above_half) > 0:
-            lower_index = indices_above_half[0]
-            upper_index = indices_above_half[-1]
-            
-            acceptance_temperature = (temperature_axis[upper_index] - temperature_axis[lower_index])
-            print(f"\n接受温度(Acceptance Temperature (FWHM)): {acceptance_temperature:.4f} K·cm")
+        # FWHM: 效率下降到最大值50%时的温度范围，两侧交点由线性插值得到
+        acceptance_temperature = self.fwhm(temperature_axis, efficiency_temperature)
+        if not np.isnan(acceptance_temperature):
+            logger.debug("接受温度(Acceptance Temperature (FWHM)): %.4f K·cm", acceptance_temperature)
         else:
-            print("No points found above half maximum efficiency.")
+            logger.debug("No points found above half maximum efficiency.")
 
         return fig, acceptance_temperature
 
-    def temperature_phase_matching(self, target_mode, temperature_range=(20, 200), temp_step=0.1, fixed_axis='Z'):
-        """温度相位匹配计算：在固定传播轴下扫描温度，找到实现Δn=0的温度点"""
-        
-        temp_min, temp_max = temperature_range
-        temperature_axis = np.arange(temp_min, temp_max + temp_step, temp_step)
-        
-        phase_mismatch = np.array([
-            self.delta_n(target_mode, temperature=temp)
-            for temp in temperature_axis
-        ])
-        
-        matching_temperatures = []
-        tolerance = 1e-5
+    def temperature_phase_matching(self, target_mode, temperature_range=(20, 200), temp_step=0.1, fixed_axis='Z', plot=True):
+        """
+        温度相位匹配计算：在固定传播轴下扫描温度，找到实现Δn=0的温度点
         
-        for i in range(len(phase_mismatch) - 1):
-            if phase_mismatch[i] * phase_mismatch[i + 1] <= 0:
-                if abs(phase_mismatch[i+1] - phase_mismatch[i]) > 1e-10:
-                    t_exact = temperature_axis[i] - phase_mismatch[i] * (temperature_axis[i+1] - temperature_axis[i]) / (phase_mismatch[i+1] - phase_mismatch[i])
-                    matching_temperatures.append(t_exact)
+        plot=False 时只做数值计算、不创建matplotlib图（结果中 'fig' 为 None），供批量扫描参数使用
+        """
         
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.plot(temperature_axis, phase_mismatch, 'b-', linewidth=1.5, label='Phase Mismatch Δn')
-        ax.axhline(y=0, color='r', linestyle='--', alpha=0.7, label='Phase Matching Condition')
-        
-        if matching_temperatures:
-            for temp in matching_temperatures:
-                ax.axvline(x=temp, color='g', linestyle=':', alpha=0.8)
-                ax.text(temp, 0, f'{temp:.1f}°C', rotation=90, 
-                       verticalalignment='bottom', horizontalalignment='right')
-        
-        ax.set_xlabel('Temperature / °C', fontsize=12)
-        ax.set_ylabel('Phase Mismatch Δn', fontsize=12)
-        # 替换Unicode粗体字符为普通字符以便在图表中正确显示
-        display_mode = target_mode.replace('𝐎', 'O').replace('𝐄', 'E').replace('𝐗', 'X').replace('𝐘', 'Y').replace('𝐙', 'Z')
-        ax.set_title(f'Temperature Phase Matching for {self.cfg.crystal_name} ({display_mode})\n'
-                    f'Fixed axis: {fixed_axis}', fontsize=14)
-        ax.grid(True, alpha=0.3)
-        ax.legend()
+        temp_min, temp_max = temperature_range
+        # 按点数生成温度轴：首尾恰为 temp_min/temp_max，不会因浮点步长累积误差多出或少一个点
+        num_points = int(round((temp_max - temp_min) / temp_step)) + 1
+        temperature_axis = np.linspace(temp_min, temp_max, num_points)
+        
+        # 整个温度轴一次性传入delta_n（折射率方程均为逐元素运算）
+        # KDP/DKDP方程不含温度项，Δn为标量，需展开为与温度轴同形状
+        phase_mismatch = np.broadcast_to(
+            self.delta_n(target_mode, temperature=temperature_axis),
+            temperature_axis.shape
+        ).copy()
+
+        # 相邻两点Δn异号即存在过零点，在该区间内用brentq求Δn(T)=0的精确温度（精度不受temp_step限制）
+        pm_left, pm_right = phase_mismatch[:-1], phase_mismatch[1:]
+        crossing = np.where((pm_left * pm_right <= 0) & (np.abs(pm_right - pm_left) > 1e-10))[0]
+        matching_temperatures = [
+            brentq(lambda temp: float(self.delta_n(target_mode, temperature=temp)),
+                   temperature_axis[k], temperature_axis[k + 1])
+            for k in crossing
+        ]
+        
+        fig = None
+        if plot:
+            fig, ax = plt.subplots(figsize=(10, 6))
+            ax.plot(temperature_axis, phase_mismatch, 'b-', linewidth=1.5, label='Phase Mismatch Δn')
+            ax.axhline(y=0, color='r', linestyle='--', alpha=0.7, label='Phase Matching Condition')
+        
+            if matching_temperatures:
+                for temp in matching_temperatures:
+                    ax.axvline(x=temp, color='g', linestyle=':', alpha=0.8)
+                    ax.text(temp, 0, f'{temp:.1f}°C', rotation=90, 
+                           verticalalignment='bottom', horizontalalignment='right')
+        
+            ax.set_xlabel('Temperature / °C', fontsize=12)
+            ax.set_ylabel('Phase Mismatch Δn', fontsize=12)
+            # 替换Unicode粗体字符为普通字符以便在图表中正确显示
+            display_mode = target_mode.translate(DISPLAY_MODE_TABLE)
+            ax.set_title(f'Temperature Phase Matching for {self.cfg.crystal_name} ({display_mode})\n'
+                        f'Fixed axis: {fixed_axis}', fontsize=14)
+            ax.grid(True, alpha=0.3)
+            ax.legend()
+        
+        # 离Δn=0最近的采样点只求一次argmin，closest_temp 和 closest_pm 共用
+        closest_index = np.argmin(np.abs(phase_mismatch))
         
         result = {
             'matching_temperatures': matching_temperatures,
@@ -774,8 +902,8 @@ class Solver():
             'fig': fig,
             'min_phase_mismatch': phase_mismatch.min(),
             'max_phase_mismatch': phase_mismatch.max(),
-            'closest_temp': temperature_axis[np.argmin(np.abs(phase_mismatch))],
-            'closest_pm': phase_mismatch[np.argmin(np.abs(phase_mismatch))]
+            'closest_temp': temperature_axis[closest_index],
+            'closest_pm': phase_mismatch[closest_index]
         }
     
         return result
\ No newline at end of file